@@ -19,4 +19,5 @@ from .arrays import *
 from .components import *
 from .tables import *
 # from .tasks import *
+from .xltekedfexportmanifest import XLTEKEDFExportManifest
 from .xltekcdfsedfexporter import XLTEKCDFSEDFExporter
@@ -14,3 +14,5 @@ __email__ = __email__
 # Imports #
 # Local Packages #
 from .xltekcontentsframe import XLTEKContentsLeafContainer, XLTEKContentsNodeProxy, XLTEKContentsProxy
+from .xltekcontentsindex import XLTEKContentsIndex
+from .xltekfilepool import XLTEKFilePool
@@ -13,14 +13,21 @@ __email__ = __email__
 
 # Imports #
 # Standard Libraries #
+import datetime
+from decimal import Decimal
 import pathlib
 from typing import Any
 
 # Third-Party Packages #
+from baseobjects.cachingtools import timed_keyless_cache
 from cdfs.arrays import BaseTimeContentsLeafContainer, TimeContentsNodeProxy, TimeContentsProxy
+from dspobjects.dataclasses import IndexDateTime
+from dspobjects.time import Timestamp, nanostamp
+import numpy as np
 
 # Local Packages #
 from ...xltekhdf5 import XLTEKHDF5
+from .xltekfilepool import XLTEKFilePool
 
 
 # Definitions #
@@ -29,6 +36,8 @@ class XLTEKContentsLeafContainer(BaseTimeContentsLeafContainer):
     default_remain_open: bool = True
     file_type: type[XLTEKHDF5] | None = XLTEKHDF5
 
+    file_pool: XLTEKFilePool | None = None
+
     # Class Methods #
     @classmethod
     def validate_path(cls, path: pathlib.Path | str) -> bool:
@@ -48,10 +57,12 @@ class XLTEKContentsLeafContainer(BaseTimeContentsLeafContainer):
         else:
             return False
 
-    # Instance Methods #
+    # Properties #
     @property
     def file(self) -> pathlib.Path:
-        """The file object."""
+        """The file object, which is borrowed from the file pool when there is one."""
+        if self.file_pool is not None:
+            return self.file_pool.get_file(self._path, self.file_type, mode=self.mode, **self.file_kwargs)
         if self._file is None:
             self._file = self.file_type(self._path, mode=self.mode, open_=self.remain_open, **self.file_kwargs)
         return self._file
@@ -60,12 +71,186 @@ class XLTEKContentsLeafContainer(BaseTimeContentsLeafContainer):
     def file(self, value: str | pathlib.Path) -> None:
         self.set_file(value)
 
+    # Instance Methods #
+    # Constructors/Destructors
+    def construct(self, *args: Any, file_pool: XLTEKFilePool | None = None, **kwargs: Any) -> None:
+        """Constructs this object.
+
+        Args:
+            *args: Arguments for inheritance.
+            file_pool: The pool of open files to borrow the file from, None to keep the file to this leaf.
+            **kwargs: Keyword arguments for inheritance.
+        """
+        if file_pool is not None:
+            self.file_pool = file_pool
+
+        super().construct(*args, **kwargs)
+
     def _is_open(self) -> bool:
-        if self._file is not None:
+        if self.file_pool is not None:
+            return self.file_pool.is_open(self._path)
+        elif self._file is not None:
             return bool(self._file)
         else:
             return False
 
+    def open(self, mode: str | None = None, **kwargs: Any) -> "XLTEKContentsLeafContainer":
+        """Opens the file of this leaf.
+
+        Args:
+            mode: The mode to open the file in.
+            **kwargs: The keyword arguments to open the file with.
+
+        Returns:
+            This object.
+        """
+        if self.file_pool is not None:
+            self.file_pool.get_file(self._path, self.file_type, mode=self.mode, **self.file_kwargs)
+            return self
+        else:
+            return super().open(mode=mode, **kwargs)
+
+    def close(self) -> None:
+        """Closes the file of this leaf, returning it to the file pool when there is one."""
+        if self.file_pool is not None:
+            self.file_pool.release(self._path)
+        else:
+            super().close()
+
+    # Contents Metadata
+    def is_uniform(self) -> bool:
+        """Checks if the contents metadata describes evenly spaced samples, so times can be computed without the file.
+
+        The samples are evenly spaced when the time between the start and end is the number of samples minus one
+        sample periods, within half of a sample period.
+
+        Returns:
+            If the times of the samples can be computed from the contents metadata.
+        """
+        if None in (self._shape, self._sample_rate, self._start, self._end) or self._sample_rate <= 0:
+            return False
+        period = 10**9 / float(self._sample_rate)
+        return abs(self._end - self._start - (self._shape[self.axis] - 1) * period) <= period / 2
+
+    @timed_keyless_cache(lifetime=1.0, call_method="clearing_call", local=True)
+    def get_shape(self, **kwargs: Any) -> tuple[int]:
+        """Gets the shape from the contents metadata, only reading the file when the metadata does not have it.
+
+        Returns:
+            The shape of the data.
+        """
+        if self._shape is None:
+            self._shape = self._get_shape()
+        return self._shape
+
+    def get_sample_rate_decimal(self) -> Decimal | None:
+        """Gets the sample rate from the contents metadata, only reading the file when the metadata does not have it.
+
+        Returns:
+            The sample rate of the data.
+        """
+        if self._sample_rate is None:
+            self._sample_rate = self._get_sample_rate_decimal()
+        return self._sample_rate
+
+    def get_tzinfo(self) -> datetime.tzinfo | None:
+        """Gets the time zone from the contents metadata, only reading the file when the metadata does not have it.
+
+        Returns:
+            The time zone of the data.
+        """
+        if self._tzinfo is None and self.is_open:
+            self._tzinfo = self._get_tzinfo()
+        return self._tzinfo
+
+    def get_start_nanostamp(self) -> int | None:
+        """Gets the start from the contents metadata, only reading the file when the metadata does not have it.
+
+        Returns:
+            The start of the data in nanoseconds.
+        """
+        if self._start is None:
+            self._start = self._get_start_nanostamp()
+        return self._start
+
+    def get_end_nanostamp(self) -> int | None:
+        """Gets the end from the contents metadata, only reading the file when the metadata does not have it.
+
+        Returns:
+            The end of the data in nanoseconds.
+        """
+        if self._end is None:
+            self._end = self._get_end_nanostamp()
+        return self._end
+
+    def get_nanostamp(self, super_index: int) -> float:
+        """Gets the time of a sample, computing it from the contents metadata when the samples are evenly spaced.
+
+        Args:
+            super_index: The index of the sample.
+
+        Returns:
+            The time of the sample in nanoseconds.
+        """
+        if not self.is_uniform():
+            return self.time_axis.get_nanostamp(super_index)
+        length = self._shape[self.axis]
+        if super_index < 0:
+            super_index += length
+        if not 0 <= super_index < length:
+            raise IndexError("Index out of range.")
+        return self._start + round(super_index * 10**9 / float(self._sample_rate))
+
+    def get_nanostamps(self) -> np.ndarray | None:
+        """Gets the times of all samples, computing them from the contents metadata when they are evenly spaced.
+
+        Returns:
+            The times of the samples in nanoseconds.
+        """
+        if not self.is_uniform():
+            return self.time_axis.get_nanostamps()
+        offsets = np.arange(self._shape[self.axis], dtype=np.float64) * (10**9 / float(self._sample_rate))
+        return self._start + np.round(offsets).astype(np.int64)
+
+    def find_time_index(
+        self,
+        timestamp: datetime.datetime | float | int | np.dtype,
+        approx: bool = True,
+        tails: bool = False,
+    ) -> IndexDateTime:
+        """Finds the index with given time, computing it from the contents metadata when the samples are evenly spaced.
+
+        Args:
+            timestamp: The timestamp to find the index for.
+            approx: Determines if an approximate index will be given if the time is not present.
+            tails: Determines if the first or last index will be give the requested time is outside the axis.
+
+        Returns:
+            The requested closest index and the value at that index.
+        """
+        if not self.is_uniform():
+            return self.time_axis.find_time_index(timestamp=timestamp, approx=approx, tails=tails)
+
+        nano_ts = nanostamp(timestamp)
+        tz = datetime.timezone.utc if self._tzinfo is None else self._tzinfo
+        length = self._shape[self.axis]
+        if nano_ts < self._start:
+            if tails:
+                return IndexDateTime(0, Timestamp.fromnanostamp(self._start, tz=tz))
+        elif nano_ts > self._end:
+            if tails:
+                return IndexDateTime(length, Timestamp.fromnanostamp(self._end, tz=tz))
+        else:
+            index = min(int((nano_ts - self._start) * float(self._sample_rate) // 10**9), length - 1)
+            true_timestamp = self.get_nanostamp(index)
+            if true_timestamp > nano_ts:
+                index -= 1
+                true_timestamp = self.get_nanostamp(index)
+            if approx or nano_ts == true_timestamp:
+                return IndexDateTime(index, Timestamp.fromnanostamp(true_timestamp, tz=tz))
+
+        raise IndexError("Timestamp out of range.")
+
     def load(self) -> None:
         """Loads the file's information into memory."""
         self._data = self.file["data"]
@@ -113,7 +298,100 @@ class XLTEKContentsNodeProxy(TimeContentsNodeProxy):
 
 
 class XLTEKContentsProxy(XLTEKContentsNodeProxy, TimeContentsProxy):
+    """The root proxy of the XLTEK contents, whose leaves share a bounded pool of open files.
+
+    Class Attributes:
+        default_file_pool_capacity: The default number of files the leaves can have open, None for no pool.
+
+    Attributes:
+        file_pool: The pool of open files which the leaves share.
+    """
+
     node_type: type = XLTEKContentsNodeProxy
+    default_file_pool_capacity: int | None = XLTEKFilePool.default_capacity
+
+    file_pool: XLTEKFilePool | None = None
+
+    # Instance Methods #
+    # Constructors/Destructors
+    def construct(
+        self,
+        *args: Any,
+        file_pool: XLTEKFilePool | None = None,
+        file_pool_capacity: int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Constructs this object.
+
+        Args:
+            *args: Arguments for inheritance.
+            file_pool: The pool of open files for the leaves to share, created if None and there is a capacity.
+            file_pool_capacity: The number of files the leaves can have open, the default if None.
+            **kwargs: Keyword arguments for inheritance.
+        """
+        if file_pool is not None:
+            self.file_pool = file_pool
+        elif self.file_pool is None:
+            capacity = self.default_file_pool_capacity if file_pool_capacity is None else file_pool_capacity
+            if capacity is not None:
+                self.file_pool = XLTEKFilePool(capacity=capacity)
+        elif file_pool_capacity is not None:
+            self.file_pool.set_capacity(file_pool_capacity)
+
+        super().construct(*args, **kwargs)
+
+    # Proxy
+    def update_child(self, path: str | list[str], open_: bool = False, **kwargs: Any) -> None:
+        """Creates a child proxy from the given child path, giving new leaves the file pool.
+
+        Args:
+            path: The child path to create a proxy from.
+            open_: Determines if the arrays will remain open after construction.
+            **kwargs: The keyword arguments to create contained arrays.
+        """
+        super().update_child(path=path, open_=open_, **({"file_pool": self.file_pool} | kwargs))
+
+    def update_children(self, paths: list[dict], open_: bool = False, sort: bool = False, **kwargs: Any) -> None:
+        """Creates child proxies from the given child paths, giving new leaves the file pool.
+
+        Args:
+            paths: The child paths and keyword arguments to create arrays from.
+            open_: Determines if the proxies will remain open after construction.
+            sort: Determines if the proxies will be sorted after update.
+            **kwargs: The keyword arguments to create contained proxies.
+        """
+        super().update_children(paths=paths, open_=open_, sort=sort, **({"file_pool": self.file_pool} | kwargs))
+
+    def construct_proxies(self, open_=False, **kwargs: Any) -> None:
+        """Constructs the proxies from the cached contents index of the CDFS component.
+
+        Args:
+            open_: Determines if the arrays will remain open after construction.
+            **kwargs: The keyword arguments to create contained arrays.
+        """
+        if self.tzinfo is None:
+            self.get_tzinfo()
+
+        self.proxy_paths.clear()
+        index = self.cdfs_component.get_contents_index()
+        if index.last_update_id is not None and index.last_update_id > self.latest_update:
+            self.latest_update = index.last_update_id
+
+        self.update_children(paths=index.as_entries(), open_=open_, sort=True, **kwargs)
+
+    async def construct_proxies_async(self, open_=False, **kwargs: Any) -> None:
+        """Asynchronously constructs the proxies from the cached contents index of the CDFS component.
+
+        Args:
+            open_: Determines if the arrays will remain open after construction.
+            **kwargs: The keyword arguments to create contained arrays.
+        """
+        self.proxy_paths.clear()
+        index = await self.cdfs_component.get_contents_index_async()
+        if index.last_update_id is not None and index.last_update_id > self.latest_update:
+            self.latest_update = index.last_update_id
+
+        self.update_children(paths=index.as_entries(), open_=open_, sort=True, **kwargs)
 
 
 # Assign Cyclic Definition
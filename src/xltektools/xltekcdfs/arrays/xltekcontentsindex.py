@@ -0,0 +1,333 @@
+"""xltekcontentsindex.py
+An in-memory interval index over the start and end IDs of XLTEK contents.
+"""
+# Package Header #
+from ...header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from collections.abc import Iterable
+import datetime
+import os
+import pathlib
+import tempfile
+from typing import Any
+import uuid
+
+# Third-Party Packages #
+from baseobjects import BaseObject
+from dspobjects.time import Timestamp
+import numpy as np
+
+# Local Packages #
+
+
+# Definitions #
+# Classes #
+class XLTEKContentsIndex(BaseObject):
+    """An in-memory interval index over the files of an XLTEK contents table.
+
+    The columns are NumPy arrays sorted by start ID, so time window lookups are binary searches rather than scans or
+    queries. Each file covers from its start ID to one sample period past its end ID, which makes back-to-back files
+    contiguous. The index can be saved to and loaded from a NumPy archive, so it can be cached between sessions.
+
+    Class Attributes:
+        columns: The attribute name, contents column name, and dtype of each column which this index holds.
+
+    Attributes:
+        ids: The row IDs of the files.
+        start_ids: The start IDs of the files in nanoseconds.
+        end_ids: The end IDs of the files in nanoseconds.
+        starts: The start times of the files in nanoseconds.
+        ends: The end times of the files in nanoseconds.
+        sample_rates: The sample rates of the files.
+        tz_offsets: The time zone offsets of the files in seconds.
+        axes: The time axes of the data of the files.
+        shapes: The shapes of the data of the files, formatted as in the contents table.
+        paths: The paths of the files relative to the contents root.
+        update_ids: The update IDs of the files.
+        covered_end_ids: The exclusive ends of the files in nanoseconds, one sample period after their end IDs.
+        _max_end_ids: The running maximum of the covered ends, which is sorted even if files overlap.
+
+    Args:
+        rows: The rows of the contents, each with the fields of the contents columns in order.
+        init: Determines if this object will construct.
+        **kwargs: Keyword arguments for inheritance.
+    """
+
+    columns: tuple[tuple[str, str, Any], ...] = (
+        ("ids", "id", object),
+        ("start_ids", "start_id", np.int64),
+        ("end_ids", "end_id", np.int64),
+        ("starts", "start", np.int64),
+        ("ends", "end", np.int64),
+        ("sample_rates", "sample_rate", np.float64),
+        ("tz_offsets", "tz_offset", np.float64),
+        ("axes", "axis", np.int64),
+        ("shapes", "shape", object),
+        ("paths", "path", object),
+        ("update_ids", "update_id", np.int64),
+    )
+
+    # Magic Methods #
+    # Construction/Destruction
+    def __init__(self, rows: Iterable[Any] | None = None, *, init: bool = True, **kwargs: Any) -> None:
+        # New Attributes #
+        self.ids: np.ndarray = np.empty((0,), dtype=object)
+        self.start_ids: np.ndarray = np.empty((0,), dtype=np.int64)
+        self.end_ids: np.ndarray = np.empty((0,), dtype=np.int64)
+        self.starts: np.ndarray = np.empty((0,), dtype=np.int64)
+        self.ends: np.ndarray = np.empty((0,), dtype=np.int64)
+        self.sample_rates: np.ndarray = np.empty((0,), dtype=np.float64)
+        self.tz_offsets: np.ndarray = np.empty((0,), dtype=np.float64)
+        self.axes: np.ndarray = np.empty((0,), dtype=np.int64)
+        self.shapes: np.ndarray = np.empty((0,), dtype=object)
+        self.paths: np.ndarray = np.empty((0,), dtype=object)
+        self.update_ids: np.ndarray = np.empty((0,), dtype=np.int64)
+        self.covered_end_ids: np.ndarray = np.empty((0,), dtype=np.int64)
+
+        self._max_end_ids: np.ndarray = np.empty((0,), dtype=np.int64)
+
+        # Parent Attributes #
+        super().__init__(init=False, **kwargs)
+
+        # Object Construction #
+        if init:
+            self.construct(rows=rows, **kwargs)
+
+    def __len__(self) -> int:
+        """The number of files in this index."""
+        return self.start_ids.shape[0]
+
+    # Instance Methods #
+    # Constructors/Destructors
+    def construct(self, rows: Iterable[Any] | None = None, **kwargs: Any) -> None:
+        """Constructs this object.
+
+        Args:
+            rows: The rows of the contents, each with the fields of the contents columns in order.
+            **kwargs: Keyword arguments for inheritance.
+        """
+        if rows is not None:
+            self.set_rows(rows)
+
+        super().construct(**kwargs)
+
+    # Columns
+    @property
+    def sample_periods(self) -> np.ndarray:
+        """The sample periods of the files in nanoseconds, zero where there is no sample rate."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            periods = np.round(1e9 / self.sample_rates)
+        return np.nan_to_num(periods, nan=0.0, posinf=0.0).astype(np.int64)
+
+    @property
+    def last_update_id(self) -> int | None:
+        """The largest update ID in this index."""
+        return int(self.update_ids.max()) if self.update_ids.shape[0] > 0 else None
+
+    def _columns_from_rows(self, rows: Iterable[Any]) -> dict[str, np.ndarray]:
+        """Creates the columns of rows of the contents.
+
+        Args:
+            rows: The rows of the contents, each with the fields of the contents columns in order.
+
+        Returns:
+            The columns of the rows by attribute name.
+        """
+        values = list(zip(*rows)) or [()] * len(self.columns)
+        columns = {}
+        for (name, _, dtype), column in zip(self.columns, values):
+            if dtype is np.float64:
+                column = [np.nan if v is None else v for v in column]
+            columns[name] = np.array(column, dtype=dtype)
+        return columns
+
+    def set_rows(self, rows: Iterable[Any]) -> None:
+        """Sets the columns of this index from rows of the contents.
+
+        Args:
+            rows: The rows of the contents, each with the fields of the contents columns in order.
+        """
+        self.set_columns(**self._columns_from_rows(rows))
+
+    def merge_rows(self, rows: Iterable[Any]) -> None:
+        """Merges rows into this index, replacing the files which have the same IDs.
+
+        Args:
+            rows: The rows of the contents, each with the fields of the contents columns in order.
+        """
+        new = self._columns_from_rows(rows)
+        if new["ids"].shape[0] == 0:
+            return
+        new_ids = set(new["ids"])
+        keep = np.fromiter((i not in new_ids for i in self.ids), dtype=bool, count=len(self))
+        self.set_columns(**{n: np.concatenate((getattr(self, n)[keep], new[n])) for n, _, _ in self.columns})
+
+    def set_columns(self, **columns: np.ndarray) -> None:
+        """Sets the columns of this index, sorting them by start ID.
+
+        Args:
+            **columns: The columns by attribute name, see columns.
+        """
+        order = np.argsort(columns["start_ids"], kind="stable")
+        for name, _, _ in self.columns:
+            setattr(self, name, columns[name][order])
+        self.covered_end_ids = self.end_ids + self.sample_periods
+        self._max_end_ids = np.maximum.accumulate(self.covered_end_ids) if len(self) > 0 else self.covered_end_ids
+
+    def as_entries(self) -> list[dict[str, Any]]:
+        """Creates the entries of the files in the form which contents proxies are built from.
+
+        Returns:
+            The entry of each file, in start order.
+        """
+        time_zones = {o: datetime.timezone(datetime.timedelta(seconds=o)) for o in np.unique(self.tz_offsets)}
+        return [
+            {
+                "path": path,
+                "axis": int(axis),
+                "shape": tuple(int(i) for i in shape.split(", ")),
+                "tzinfo": time_zones[tz_offset],
+                "start": Timestamp.fromnanostamp(int(start), time_zones[tz_offset]),
+                "end": Timestamp.fromnanostamp(int(end), time_zones[tz_offset]),
+                "sample_rate": None if np.isnan(sample_rate) else float(sample_rate),
+            }
+            for path, axis, shape, tz_offset, start, end, sample_rate in zip(
+                self.paths, self.axes, self.shapes, self.tz_offsets, self.starts, self.ends, self.sample_rates
+            )
+        ]
+
+    # Caching
+    def save(self, path: pathlib.Path | str) -> None:
+        """Saves this index to a NumPy archive, replacing the file atomically.
+
+        The archive is written to a uniquely named temporary file first, so concurrent saves never write to the same
+        file, and the temporary file is removed if the save fails.
+
+        Args:
+            path: The path of the archive.
+        """
+        path = pathlib.Path(path)
+        arrays = {n: getattr(self, n) for n, _, dtype in self.columns if dtype is not object}
+        arrays["ids"] = np.array([i.hex for i in self.ids], dtype=str)
+        arrays["shapes"] = np.array(self.shapes, dtype=str)
+        arrays["paths"] = np.array(self.paths, dtype=str)
+        file = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False)
+        try:
+            with file:
+                np.savez(file, **arrays)
+            os.replace(file.name, path)
+        except BaseException:
+            os.remove(file.name)
+            raise
+
+    def load(self, path: pathlib.Path | str) -> None:
+        """Loads this index from a NumPy archive.
+
+        Args:
+            path: The path of the archive.
+        """
+        with np.load(pathlib.Path(path), allow_pickle=False) as archive:
+            columns = {n: archive[n] for n, _, dtype in self.columns if dtype is not object}
+            columns["ids"] = np.array([uuid.UUID(hex=i) for i in archive["ids"]], dtype=object)
+            columns["shapes"] = archive["shapes"].astype(object)
+            columns["paths"] = archive["paths"].astype(object)
+        self.set_columns(**columns)
+
+    # Lookup
+    def overlapping(self, start: int, stop: int) -> np.ndarray:
+        """Finds the files which overlap a time window.
+
+        Args:
+            start: The start of the window in nanoseconds.
+            stop: The inclusive end of the window in nanoseconds.
+
+        Returns:
+            The indices of the overlapping files, in start order.
+        """
+        first = np.searchsorted(self._max_end_ids, start, side="right")
+        last = np.searchsorted(self.start_ids, stop, side="right")
+        if first >= last:
+            return np.empty((0,), dtype=np.intp)
+        indices = np.arange(first, last)
+        return indices[self.covered_end_ids[first:last] > start]
+
+    def overlapping_paths(self, start: int, stop: int) -> np.ndarray:
+        """Finds the paths of the files which overlap a time window.
+
+        Args:
+            start: The start of the window in nanoseconds.
+            stop: The inclusive end of the window in nanoseconds.
+
+        Returns:
+            The paths of the overlapping files, in start order.
+        """
+        return self.paths[self.overlapping(start, stop)]
+
+    def find(self, nanostamp: int) -> int | None:
+        """Finds the file which contains a time.
+
+        Args:
+            nanostamp: The time to find in nanoseconds.
+
+        Returns:
+            The index of the last file which contains the time or None if no file contains it.
+        """
+        index = np.searchsorted(self.start_ids, nanostamp, side="right") - 1
+        if index >= 0 and self._max_end_ids[index] > nanostamp:
+            while self.covered_end_ids[index] <= nanostamp:
+                index -= 1
+            return int(index)
+        return None
+
+    # Coverage
+    def covered_intervals(self, tolerance: int = 0) -> np.ndarray:
+        """Merges the files into the disjoint intervals which they cover.
+
+        Args:
+            tolerance: The largest space in nanoseconds between files which is not considered a gap.
+
+        Returns:
+            The start and exclusive end in nanoseconds of each covered interval, shaped (n, 2).
+        """
+        if len(self) == 0:
+            return np.empty((0, 2), dtype=np.int64)
+        breaks = np.flatnonzero(self.start_ids[1:] > self._max_end_ids[:-1] + tolerance) + 1
+        starts = self.start_ids[np.concatenate(([0], breaks))]
+        ends = self._max_end_ids[np.concatenate((breaks - 1, [len(self) - 1]))]
+        return np.stack((starts, ends), axis=1)
+
+    def gaps(self, tolerance: int = 0) -> np.ndarray:
+        """Finds the gaps between the covered intervals.
+
+        Args:
+            tolerance: The largest space in nanoseconds between files which is not considered a gap.
+
+        Returns:
+            The start and exclusive end in nanoseconds of each gap, shaped (n, 2).
+        """
+        intervals = self.covered_intervals(tolerance=tolerance)
+        return np.stack((intervals[:-1, 1], intervals[1:, 0]), axis=1)
+
+    def covered_duration(self, start: int | None = None, stop: int | None = None) -> int:
+        """Calculates the total duration which the files cover, counting overlaps once.
+
+        Args:
+            start: The start of the window to measure within in nanoseconds, None for no limit.
+            stop: The exclusive end of the window to measure within in nanoseconds, None for no limit.
+
+        Returns:
+            The covered duration in nanoseconds.
+        """
+        intervals = self.covered_intervals()
+        if start is not None or stop is not None:
+            intervals = np.clip(intervals, start, stop)
+        return int((intervals[:, 1] - intervals[:, 0]).sum())
@@ -0,0 +1,159 @@
+"""xltekfilepool.py
+A bounded, least recently used pool of open XLTEK HDF5 files.
+"""
+# Package Header #
+from ...header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from collections import OrderedDict
+import pathlib
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects import BaseObject
+
+# Local Packages #
+from ...xltekhdf5 import XLTEKHDF5
+
+
+# Definitions #
+# Classes #
+class XLTEKFilePool(BaseObject):
+    """A bounded pool of open XLTEK HDF5 files which closes the least recently used file when it is full.
+
+    The leaves of a contents proxy share a pool, so the number of open files, and the file descriptors and chunk
+    caches they hold, stays at the capacity no matter how many files a scan touches.
+
+    Class Attributes:
+        default_capacity: The default maximum number of open files.
+
+    Attributes:
+        capacity: The maximum number of open files.
+        files: The open files by path, from least to most recently used.
+
+    Args:
+        capacity: The maximum number of open files.
+        init: Determines if this object will construct.
+        **kwargs: Keyword arguments for inheritance.
+    """
+
+    default_capacity: int = 64
+
+    # Magic Methods #
+    # Construction/Destruction
+    def __init__(self, capacity: int | None = None, *, init: bool = True, **kwargs: Any) -> None:
+        # New Attributes #
+        self.capacity: int = self.default_capacity
+        self.files: OrderedDict[pathlib.Path, XLTEKHDF5] = OrderedDict()
+
+        # Parent Attributes #
+        super().__init__(init=False, **kwargs)
+
+        # Object Construction #
+        if init:
+            self.construct(capacity=capacity, **kwargs)
+
+    def __len__(self) -> int:
+        """The number of open files in this pool."""
+        return len(self.files)
+
+    def __contains__(self, path: pathlib.Path | str) -> bool:
+        """Checks if a file is open in this pool."""
+        return self.is_open(path)
+
+    # Instance Methods #
+    # Constructors/Destructors
+    def construct(self, capacity: int | None = None, **kwargs: Any) -> None:
+        """Constructs this object.
+
+        Args:
+            capacity: The maximum number of open files.
+            **kwargs: Keyword arguments for inheritance.
+        """
+        if capacity is not None:
+            self.set_capacity(capacity)
+
+        super().construct(**kwargs)
+
+    def set_capacity(self, capacity: int) -> None:
+        """Sets the maximum number of open files, closing the least recently used files which no longer fit.
+
+        Args:
+            capacity: The maximum number of open files.
+        """
+        if capacity < 1:
+            raise ValueError("The capacity of a file pool must be at least one.")
+        self.capacity = capacity
+        self.evict()
+
+    # Files
+    def is_open(self, path: pathlib.Path | str) -> bool:
+        """Checks if a file is open in this pool.
+
+        Args:
+            path: The path of the file.
+
+        Returns:
+            If the file is open in this pool.
+        """
+        file = self.files.get(pathlib.Path(path), None)
+        return file is not None and bool(file)
+
+    def get_file(
+        self,
+        path: pathlib.Path | str,
+        file_type: type[XLTEKHDF5] = XLTEKHDF5,
+        mode: str = "r",
+        **kwargs: Any,
+    ) -> XLTEKHDF5:
+        """Gets an open file from this pool, opening it and closing the least recently used file if needed.
+
+        Args:
+            path: The path of the file.
+            file_type: The type of file to open the path with.
+            mode: The mode to open the file in.
+            **kwargs: The keyword arguments for creating the file.
+
+        Returns:
+            The open file.
+        """
+        path = pathlib.Path(path)
+        file = self.files.get(path, None)
+        if file is not None and bool(file):
+            self.files.move_to_end(path)
+            return file
+
+        self.files[path] = file = file_type(path, mode=mode, open_=True, **kwargs)
+        self.files.move_to_end(path)
+        self.evict()
+        return file
+
+    def evict(self) -> None:
+        """Closes the least recently used files until the number of open files is within the capacity."""
+        while len(self.files) > self.capacity:
+            _, file = self.files.popitem(last=False)
+            file.close()
+
+    def release(self, path: pathlib.Path | str) -> None:
+        """Closes a file and removes it from this pool.
+
+        Args:
+            path: The path of the file.
+        """
+        file = self.files.pop(pathlib.Path(path), None)
+        if file is not None:
+            file.close()
+
+    def close(self) -> None:
+        """Closes all the files in this pool."""
+        while self.files:
+            _, file = self.files.popitem(last=False)
+            file.close()
@@ -13,9 +13,11 @@ __email__ = __email__
 
 # Imports #
 # Standard Libraries #
+from collections.abc import Iterable
 from datetime import datetime
 import pathlib
 from typing import Any
+import zipfile
 
 # Third-Party Packages #
 from cdfs.components import TimeContentsCDFSComponent
@@ -25,8 +27,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Local Packages #
-from ...xltekhdf5 import XLTEKHDF5 # XLTEKHDF5WriterTask
-from ..arrays import XLTEKContentsProxy
+from ...xltekhdf5 import XLTEKHDF5, XLTEKHDF5_1, XLTEKChunkPlanner # XLTEKHDF5WriterTask
+from ..arrays import XLTEKContentsIndex, XLTEKContentsProxy
 from ..tables import BaseXLTEKContentsTable
 # from ..tasks import XLTEKContentsUpdateTask
 
@@ -40,40 +42,96 @@ class XLTEKContentsCDFSComponent(TimeContentsCDFSComponent):
 
     _table: type[BaseXLTEKContentsTable] | None = None
 
-    data_file_type: type[XLTEKHDF5] = XLTEKHDF5.get_latest_version_class()
+    data_file_type: type[XLTEKHDF5] = XLTEKHDF5_1
+    chunk_planner: XLTEKChunkPlanner | None = None
     proxy_type: type[XLTEKContentsProxy] = XLTEKContentsProxy
+    index_type: type[XLTEKContentsIndex] = XLTEKContentsIndex
+    index_cache_name: str | None = "contents_index.npz"
+
+    _contents_index: XLTEKContentsIndex | None = None
+
+    # Properties #
+    @property
+    def index_cache_path(self) -> pathlib.Path | None:
+        """The path of the file which caches the contents index, None if the index is not cached to a file."""
+        if self.index_cache_name is None:
+            return None
+        return pathlib.Path(self._composite().path) / self.index_cache_name
 
     # Instance Methods #
+    # Load
+    def load(self, *args: Any, **kwargs: Any) -> None:
+        """Loads the component, adding the columns and indexes which a contents table created by an older version lacks.
+
+        The schema is only changed when the CDFS is writable. The stat signature columns are deferred, so reads never
+        select them and a read-only table which lacks them reads as if every signature is unknown.
+        """
+        if self._composite().mode not in {"a", "w"}:
+            return
+
+        with self.create_session() as session:
+            with session.begin():
+                self.table.add_missing_columns(session=session)
+                self.table.add_missing_indexes(session=session)
+
     # Contents
     def correct_contents(
         self,
         path: pathlib.Path | None = None,
         session: Session | None = None,
         begin: bool = False,
+        workers: int | None = None,
+        incremental: bool = False,
     ) -> None:
         if path is None:
             path = self._composite().path
 
         if session is not None:
-            self.table.correct_contents(session=session, path=path, begin=begin)
+            self.table.correct_contents(
+                session=session,
+                path=path,
+                begin=begin,
+                workers=workers,
+                incremental=incremental,
+            )
         else:
             with self.create_session() as session:
-                self.table.correct_contents(session=session, path=path, begin=True)
+                self.table.correct_contents(
+                    session=session,
+                    path=path,
+                    begin=True,
+                    workers=workers,
+                    incremental=incremental,
+                )
 
     async def correct_contents_async(
         self,
         path: pathlib.Path | None = None,
         session: AsyncSession | None = None,
         begin: bool = False,
+        workers: int | None = None,
+        incremental: bool = False,
     ) -> None:
         if path is None:
             path = self._composite().path
 
         if session is not None:
-            await self.table.correct_contents_async(session=session, path=path, begin=begin)
+            await self.table.correct_contents_async(
+                session=session,
+                path=path,
+                begin=begin,
+                workers=workers,
+                incremental=incremental,
+            )
         else:
             async with self.create_async_session() as session:
-                await self.table.correct_contents_async(session=session, path=path, begin=True)
+                await self.table.correct_contents_async(
+                    session=session,
+                    path=path,
+                    begin=True,
+                    workers=workers,
+                    incremental=incremental,
+                )
 
     def get_start_end_ids(self, session: Session | None = None) -> tuple[tuple[int, int], ...]:
         if session is not None:
@@ -89,6 +147,131 @@ class XLTEKContentsCDFSComponent(TimeContentsCDFSComponent):
             async with self.create_async_session() as session:
                 return await self.table.get_start_end_ids_async(session=session)
 
+    def create_contents_index(self, session: Session | None = None) -> XLTEKContentsIndex:
+        if session is not None:
+            return self.index_type(rows=self.table.get_index_rows(session=session))
+        else:
+            with self.create_session() as session:
+                return self.index_type(rows=self.table.get_index_rows(session=session))
+
+    async def create_contents_index_async(self, session: AsyncSession | None = None) -> XLTEKContentsIndex:
+        if session is not None:
+            return self.index_type(rows=await self.table.get_index_rows_async(session=session))
+        else:
+            async with self.create_async_session() as session:
+                return self.index_type(rows=await self.table.get_index_rows_async(session=session))
+
+    def _load_contents_index(self) -> XLTEKContentsIndex:
+        """Gets the cached contents index, loading it from its cache file when it is not in memory.
+
+        A cache file which cannot be read, like one which is truncated or corrupt, is ignored, so the index is rebuilt
+        from the table.
+
+        Returns:
+            The cached contents index, which is empty if there is no cache.
+        """
+        if self._contents_index is None:
+            self._contents_index = index = self.index_type()
+            path = self.index_cache_path
+            if path is not None and path.is_file():
+                try:
+                    index.load(path)
+                except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+                    index.set_rows(())
+        return self._contents_index
+
+    def _save_contents_index(self, index: XLTEKContentsIndex) -> None:
+        """Saves the contents index to its cache file, leaving the cache stale if the file cannot be written.
+
+        Args:
+            index: The contents index to save.
+        """
+        path = self.index_cache_path
+        if path is not None:
+            try:
+                index.save(path)
+            except OSError:
+                pass
+
+    def get_contents_index(self, session: Session | None = None) -> XLTEKContentsIndex:
+        """Gets the contents index, only reading the rows which have changed since it was cached.
+
+        The cache is current when it has the same number of rows and largest update ID as the table. Otherwise, the
+        rows with newer update IDs are merged in and, if rows were removed, the index is rebuilt.
+
+        Args:
+            session: The SQLAlchemy session to use for the queries.
+
+        Returns:
+            The current contents index.
+        """
+        if session is not None:
+            index = self._load_contents_index()
+            count, update_id = self.table.get_index_state(session=session)
+            if len(index) != count or index.last_update_id != update_id:
+                if index.last_update_id is not None:
+                    index.merge_rows(self.table.get_index_rows(session=session, update_id=index.last_update_id))
+                if len(index) != count:
+                    index.set_rows(self.table.get_index_rows(session=session))
+                self._save_contents_index(index)
+            return index
+        else:
+            with self.create_session() as session:
+                return self.get_contents_index(session=session)
+
+    async def get_contents_index_async(self, session: AsyncSession | None = None) -> XLTEKContentsIndex:
+        """Asynchronously gets the contents index, only reading the rows which have changed since it was cached.
+
+        The cache is current when it has the same number of rows and largest update ID as the table. Otherwise, the
+        rows with newer update IDs are merged in and, if rows were removed, the index is rebuilt.
+
+        Args:
+            session: The SQLAlchemy async session to use for the queries.
+
+        Returns:
+            The current contents index.
+        """
+        if session is not None:
+            index = self._load_contents_index()
+            count, update_id = await self.table.get_index_state_async(session=session)
+            if len(index) != count or index.last_update_id != update_id:
+                if index.last_update_id is not None:
+                    rows = await self.table.get_index_rows_async(session=session, update_id=index.last_update_id)
+                    index.merge_rows(rows)
+                if len(index) != count:
+                    index.set_rows(await self.table.get_index_rows_async(session=session))
+                self._save_contents_index(index)
+            return index
+        else:
+            async with self.create_async_session() as session:
+                return await self.get_contents_index_async(session=session)
+
+    def bulk_upsert_entries(
+        self,
+        entries: Iterable[dict[str, Any]],
+        key: str = "start_id",
+        session: Session | None = None,
+        begin: bool = False,
+    ) -> None:
+        if session is not None:
+            self.table.bulk_upsert_entries(session=session, entries=entries, key=key, begin=begin)
+        else:
+            with self.create_session() as session:
+                self.table.bulk_upsert_entries(session=session, entries=entries, key=key, begin=True)
+
+    async def bulk_upsert_entries_async(
+        self,
+        entries: Iterable[dict[str, Any]],
+        key: str = "start_id",
+        session: AsyncSession | None = None,
+        begin: bool = False,
+    ) -> None:
+        if session is not None:
+            await self.table.bulk_upsert_entries_async(session=session, entries=entries, key=key, begin=begin)
+        else:
+            async with self.create_async_session() as session:
+                await self.table.bulk_upsert_entries_async(session=session, entries=entries, key=key, begin=True)
+
     def insert_file_contents(
         self,
         path: pathlib.Path | str,
@@ -236,23 +419,46 @@ class XLTEKContentsCDFSComponent(TimeContentsCDFSComponent):
             },
         }
 
-    def create_data_file(self, data, nanostamps, sample_rate, tzinfo=None, update_id: int = 0, open_: bool = False):
+    def create_data_file(
+        self,
+        data,
+        nanostamps,
+        sample_rate,
+        tzinfo=None,
+        update_id: int = 0,
+        open_: bool = False,
+        compression: str | None = None,
+        growth: str | None = None,
+        preallocate: int | None = None,
+        compress_workers: int | None = None,
+    ):
         start = Timestamp(nanostamps[0], tz=tzinfo)
 
         full_path, relative_path = self.generate_file_path(start=start, tzinfo=tzinfo)
+        chunks = None if self.chunk_planner is None else self.chunk_planner.plan_data_chunks(sample_rate, data.shape[1])
         f_obj = self.data_file_type(
             file=full_path,
             name=self._composite().name,
             mode="a",
             create=True,
             construct=True,
+            compression=compression,
+            chunks=chunks,
+            growth=growth,
+            compress_workers=compress_workers,
         )
         f_obj.time_axis.components["axis"].set_time_zone(tzinfo)
         f_obj.time_axis.components["axis"].sample_rate = sample_rate
-        f_obj.data.set_data(data, component_kwargs={"timeseries": {"data": nanostamps}})
+        if compress_workers is None:
+            f_obj.data.set_data(data, component_kwargs={"timeseries": {"data": nanostamps}})
+        else:
+            f_obj.append_samples(data, nanostamps)
 
         self.insert_file_contents(path=relative_path, file=f_obj, update_id=update_id, begin=True)
 
+        if preallocate is not None:
+            f_obj.reserve(preallocate)
+
         if not open_:
             f_obj.close()
 
@@ -13,18 +13,25 @@ __email__ = __email__
 
 # Imports #
 # Standard Libraries #
+import asyncio
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
 import pathlib
 from typing import Any
+import uuid
 
 # Third-Party Packages #
 from cdfs.tables import BaseTimeContentsTable
-from sqlalchemy import select, func, lambda_stmt
-from sqlalchemy.orm import Mapped, Session, mapped_column
+import numpy as np
+from sqlalchemy import Index, bindparam, delete, insert, inspect, null, select, text, update, func, lambda_stmt
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapped, Session, declared_attr, mapped_column
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.types import BigInteger
 
 # Local Packages #
-from xltektools.xltekhdf5 import XLTEKHDF5
+from xltektools.xltekhdf5 import XLTEKHDF5, XLTEKHDF5Header
 
 
 # Definitions #
@@ -33,145 +40,800 @@ class BaseXLTEKContentsTable(BaseTimeContentsTable):
     __mapper_args__ = {"polymorphic_identity": "xltekcontents"}
     start_id = mapped_column(BigInteger, primary_key=True)
     end_id = mapped_column(BigInteger)
+    file_mtime = mapped_column(BigInteger, nullable=True, deferred=True)
+    file_size = mapped_column(BigInteger, nullable=True, deferred=True)
+    file_inode = mapped_column(BigInteger, nullable=True, deferred=True)
 
     file_type: type[XLTEKHDF5] | None = XLTEKHDF5
+    bulk_lookup_size: int = 500
+    native_upsert: bool = True
+    upsert_dialects: dict[str, Any] = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+    @declared_attr.directive
+    def __table_args__(cls) -> tuple[Any, ...]:
+        """The unique index on the start ID, which lets bulk upserts resolve conflicts in the database."""
+        return (Index(f"ix_{cls.__tablename__}_start_id", "start_id", unique=True),)
 
     # Class Methods #
+    # Schema
+    @classmethod
+    def get_missing_columns(cls, session: Session) -> list[str]:
+        """Gets the nullable columns of this table which an existing database lacks, like the stat signature columns
+        of a database created before they were added.
+
+        Args:
+            session: The SQLAlchemy session to use for the inspection.
+
+        Returns:
+            The names of the missing columns.
+        """
+        inspector = inspect(session.connection())
+        table_name = cls.__table__.name
+        if not inspector.has_table(table_name):
+            return []
+
+        existing = {column["name"] for column in inspector.get_columns(table_name)}
+        return [c.name for c in cls.__table__.columns if c.name not in existing and c.nullable]
+
+    @classmethod
+    def add_missing_columns(cls, session: Session) -> list[str]:
+        """Adds the nullable columns of this table which an existing database lacks, like the stat signature columns
+        of a database created before they were added.
+
+        Args:
+            session: The SQLAlchemy session to use for the schema changes.
+
+        Returns:
+            The names of the columns which were added.
+        """
+        connection = session.connection()
+        table_name = cls.__table__.name
+        missing = cls.get_missing_columns(session=session)
+        preparer = connection.dialect.identifier_preparer
+        for name in missing:
+            column = cls.__table__.columns[name]
+            session.execute(
+                text(
+                    f"ALTER TABLE {preparer.quote(table_name)} ADD COLUMN {preparer.quote(column.name)} "
+                    f"{column.type.compile(dialect=connection.dialect)}"
+                )
+            )
+        return missing
+
+    @classmethod
+    async def add_missing_columns_async(cls, session: AsyncSession) -> list[str]:
+        """Asynchronously adds the nullable columns of this table which an existing database lacks, like the stat
+        signature columns of a database created before they were added.
+
+        Args:
+            session: The SQLAlchemy async session to use for the schema changes.
+
+        Returns:
+            The names of the columns which were added.
+        """
+        return await session.run_sync(cls.add_missing_columns)
+
+    @classmethod
+    def add_missing_indexes(cls, session: Session) -> list[str]:
+        """Adds the indexes of this table which an existing database lacks, like the unique start ID index of a
+        database created before it was added.
+
+        An index which the existing rows violate is skipped, so bulk upserts on that database keep using the
+        statements which do not need it.
+
+        Args:
+            session: The SQLAlchemy session to use for the schema changes.
+
+        Returns:
+            The names of the indexes which were added.
+        """
+        connection = session.connection()
+        inspector = inspect(connection)
+        table_name = cls.__table__.name
+        if not inspector.has_table(table_name):
+            return []
+
+        existing = {index["name"] for index in inspector.get_indexes(table_name)}
+        added = []
+        for index in cls.__table__.indexes:
+            if index.name in existing:
+                continue
+            try:
+                with session.begin_nested():
+                    index.create(connection)
+            except IntegrityError:
+                continue
+            added.append(index.name)
+        return added
+
+    @classmethod
+    async def add_missing_indexes_async(cls, session: AsyncSession) -> list[str]:
+        """Asynchronously adds the indexes of this table which an existing database lacks, like the unique start ID
+        index of a database created before it was added.
+
+        Args:
+            session: The SQLAlchemy async session to use for the schema changes.
+
+        Returns:
+            The names of the indexes which were added.
+        """
+        return await session.run_sync(cls.add_missing_indexes)
+
+    @classmethod
+    def has_unique_key(cls, session: Session, key: str = "start_id") -> bool:
+        """Checks if the database has a unique index or constraint on exactly the key column.
+
+        Args:
+            session: The SQLAlchemy session to use for the inspection.
+            key: The name of the key column.
+
+        Returns:
+            True if the key is unique in the database.
+        """
+        inspector = inspect(session.connection())
+        table_name = cls.__table__.name
+        uniques = [i["column_names"] for i in inspector.get_indexes(table_name) if i["unique"]]
+        uniques.extend(c["column_names"] for c in inspector.get_unique_constraints(table_name))
+        uniques.append(inspector.get_pk_constraint(table_name)["constrained_columns"])
+        return [key] in uniques
+
+    # Contents
+    @staticmethod
+    def stat_signature(path: pathlib.Path) -> dict[str, int] | None:
+        """Gets the stat signature of a file, which changes when the file is modified or replaced.
+
+        Args:
+            path: The path of the file.
+
+        Returns:
+            The mtime in nanoseconds, size, and inode of the file or None if the file does not exist.
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return {"file_mtime": stat.st_mtime_ns, "file_size": stat.st_size, "file_inode": stat.st_ino}
+
+    @classmethod
+    def probe_files(
+        cls,
+        paths: Iterable[pathlib.Path],
+        workers: int | None = None,
+    ) -> dict[pathlib.Path, XLTEKHDF5Header | None]:
+        """Probes the headers of files, across a process pool if more than one worker is given.
+
+        Args:
+            paths: The paths of the files to probe.
+            workers: The number of processes to probe with, None or 1 to probe in this process.
+
+        Returns:
+            The header of each file, None for files which are not valid.
+        """
+        paths = list(dict.fromkeys(paths))
+        if workers is None or workers <= 1 or len(paths) <= 1:
+            return {p: cls.file_type.probe(p) for p in paths}
+
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(paths, executor.map(cls.file_type.probe, paths, chunksize=chunksize)))
+
+    @classmethod
+    def _apply_headers(
+        cls,
+        path: pathlib.Path,
+        registered: list[tuple[pathlib.Path, Any]],
+        headers: dict[pathlib.Path, XLTEKHDF5Header | None],
+        signatures: dict[pathlib.Path, dict[str, int] | None],
+        update_id: int,
+    ) -> tuple[list[uuid.UUID], list[dict[str, Any]], list[dict[str, Any]]]:
+        """Creates the row changes of the registered and unregistered files from their probed headers.
+
+        Registered rows whose files were not probed are left as they are.
+
+        Args:
+            path: The root path of the contents.
+            registered: The full path and row of each registered entry.
+            headers: The probed header of each file.
+            signatures: The stat signature of each file.
+            update_id: The update ID to give the updated and new entries.
+
+        Returns:
+            The IDs of the rows to delete, the rows to update, and the rows to insert.
+        """
+        deletes = []
+        updates = []
+        for full_path, row in registered:
+            if full_path not in headers:
+                continue
+            header = headers[full_path]
+            if header is not None and header.start_id is not None:
+                entry = header.as_entry(root=path) | signatures[full_path] | {"update_id": update_id}
+                updates.append(cls.format_bulk_entry(entry) | {"id": row.id})
+            else:
+                deletes.append(row.id)
+
+        registered_paths = {full_path for full_path, _ in registered}
+        inserts = [
+            cls.format_bulk_entry(header.as_entry(root=path) | signatures[new_path] | {"update_id": update_id})
+            for new_path, header in headers.items()
+            if new_path not in registered_paths and header is not None and header.start_id is not None
+        ]
+        return deletes, updates, inserts
+
     @classmethod
-    def _correct_contents(cls, session: Session, path: pathlib.Path) -> None:
+    def _select_probe_paths(
+        cls,
+        registered: list[tuple[pathlib.Path, Any]],
+        new_paths: Iterable[pathlib.Path],
+        incremental: bool = False,
+    ) -> tuple[list[pathlib.Path], dict[pathlib.Path, dict[str, int] | None]]:
+        """Selects the files to probe and gets their stat signatures.
+
+        Args:
+            registered: The full path and row of each registered entry.
+            new_paths: The paths of the unregistered files.
+            incremental: Determines if registered files whose stat signature is unchanged are skipped.
+
+        Returns:
+            The paths of the files to probe and the stat signature of each of them.
+        """
+        signatures = {}
+        for full_path, row in registered:
+            signature = cls.stat_signature(full_path)
+            if (
+                not incremental
+                or signature is None
+                or signature["file_mtime"] != row.file_mtime
+                or signature["file_size"] != row.file_size
+                or signature["file_inode"] != row.file_inode
+            ):
+                signatures[full_path] = signature
+        for new_path in sorted(new_paths):
+            signatures[new_path] = cls.stat_signature(new_path)
+        return list(signatures), signatures
+
+    @classmethod
+    def _correct_contents(
+        cls,
+        session: Session,
+        path: pathlib.Path,
+        workers: int | None = None,
+        incremental: bool = False,
+    ) -> None:
         last_update_id = cls.get_last_update_id(session=session)
         update_id = 0 if last_update_id is None else last_update_id + 1
 
-        # Correct registered entries
-        registered = set()
-        for item, in cls.get_all(session=session, as_entries=False):
-            entry = item.as_entry()
-            full_path = path / entry["path"]
-            file = cls.file_type.new_validated(full_path)
-            if file is not None:
-                try:
-                    file.standardize_attributes()
-                except (KeyError, RuntimeError):
-                    pass
-                finally:
-                    item.update({
-                        "path": full_path.relative_to(path),
-                        "shape": file.data.shape,
-                        "axis": file.time_axis.components["axis"].axis,
-                        "start": file.start_datetime,
-                        "end": file.end_datetime,
-                        "sample_rate": file.sample_rate,
-                        "timezone": file.time_axis.components["axis"].tzinfo,
-                        "start_id": int(file.start_id),
-                        "end_id": int(file.end_id),
-                        "update_id": update_id,
-                    })
-                    file.close()
-            else:
-                cls.delete_item(session=session, item=item)
-            registered.add(full_path)
-
-        # Correct unregistered
-        entries = []
-        for new_path in set(path.rglob("*.h5")) - registered:
-            file = cls.file_type.new_validated(new_path)
-            if file is not None:
-                try:
-                    file.standardize_attributes()
-                except (KeyError, RuntimeError):
-                    pass
-                finally:
-                    entries.append({
-                        "path": new_path.relative_to(path),
-                        "shape": file.data.shape,
-                        "axis": file.time_axis.components["axis"].axis,
-                        "start": file.start_datetime,
-                        "end": file.end_datetime,
-                        "sample_rate": file.sample_rate,
-                        "timezone": file.time_axis.components["axis"].tzinfo,
-                        "start_id": int(file.start_id),
-                        "end_id": int(file.end_id),
-                        "update_id": update_id,
-                    })
-                    file.close()
-        if entries:
-            cls.insert_all(session=session, items=entries, as_entries=True)
-
-    @classmethod
-    def correct_contents(cls, session: Session, path: pathlib.Path, begin: bool = False) -> None:
+        registered = [(path / row.path, row) for row in session.execute(cls._create_registered_statement())]
+        new_paths = set(path.rglob("*.h5")) - {full_path for full_path, _ in registered}
+        paths, signatures = cls._select_probe_paths(registered=registered, new_paths=new_paths, incremental=incremental)
+
+        # Probe all files before modifying any entries
+        headers = cls.probe_files(paths=paths, workers=workers)
+        deletes, updates, inserts = cls._apply_headers(
+            path=path,
+            registered=registered,
+            headers=headers,
+            signatures=signatures,
+            update_id=update_id,
+        )
+
+        for statement, parameters in cls._create_bulk_statements(deletes=deletes, updates=updates, inserts=inserts):
+            session.execute(statement, parameters)
+
+    @classmethod
+    def correct_contents(
+        cls,
+        session: Session,
+        path: pathlib.Path,
+        begin: bool = False,
+        workers: int | None = None,
+        incremental: bool = False,
+    ) -> None:
         if begin:
             with session.begin():
-                cls._correct_contents(session=session, path=path)
+                cls._correct_contents(session=session, path=path, workers=workers, incremental=incremental)
         else:
-            cls._correct_contents(session=session, path=path)
+            cls._correct_contents(session=session, path=path, workers=workers, incremental=incremental)
 
     @classmethod
-    async def _correct_contents_async(cls, session: AsyncSession, path: pathlib.Path) -> None:
+    async def _correct_contents_async(
+        cls,
+        session: AsyncSession,
+        path: pathlib.Path,
+        workers: int | None = None,
+        incremental: bool = False,
+    ) -> None:
         last_update_id = await cls.get_last_update_id_async(session=session)
         update_id = 0 if last_update_id is None else last_update_id + 1
 
-        # Correct registered entries
-        registered = set()
-        for item, in await cls.get_all_async(session=session, as_entries=False):
-            entry = item.as_entry()
-            full_path = path / entry["path"]
-            file = cls.file_type.new_validated(full_path)
-            if file is not None:
-                try:
-                    file.standardize_attributes()
-                except (KeyError, RuntimeError):
-                    pass
-                finally:
-                    item.update({
-                        "path": full_path.relative_to(path),
-                        "shape": file.data.shape,
-                        "axis": file.time_axis.components["axis"].axis,
-                        "start": file.start_datetime,
-                        "end": file.end_datetime,
-                        "sample_rate": file.sample_rate,
-                        "timezone": file.time_axis.components["axis"].tzinfo,
-                        "start_id": int(file.start_id),
-                        "end_id": int(file.end_id),
-                        "update_id": update_id,
-                    })
-                    file.close()
-            else:
-                await cls.delete_item_async(session=session, item=item)
-            registered.add(full_path)
-
-        # Correct unregistered
-        entries = []
-        for new_path in set(path.rglob("*.h5")) - registered:
-            file = cls.file_type.new_validated(new_path)
-            if file is not None:
-                try:
-                    file.standardize_attributes()
-                except (KeyError, RuntimeError):
-                    pass
-                finally:
-                    entries.append({
-                        "path": new_path.relative_to(path),
-                        "shape": file.data.shape,
-                        "axis": file.time_axis.components["axis"].axis,
-                        "start": file.start_datetime,
-                        "end": file.end_datetime,
-                        "sample_rate": file.sample_rate,
-                        "timezone": file.time_axis.components["axis"].tzinfo,
-                        "start_id": int(file.start_id),
-                        "end_id": int(file.end_id),
-                        "update_id": update_id,
-                    })
-                    file.close()
-        if entries:
-            await cls.insert_all_async(session=session, items=entries, as_entries=True)
-
-    @classmethod
-    async def correct_contents_async(cls, session: AsyncSession, path: pathlib.Path, begin: bool = False,) -> None:
+        rows = await session.execute(cls._create_registered_statement())
+        registered = [(path / row.path, row) for row in rows]
+        new_paths = set(path.rglob("*.h5")) - {full_path for full_path, _ in registered}
+        paths, signatures = cls._select_probe_paths(registered=registered, new_paths=new_paths, incremental=incremental)
+
+        # Probe all files in a thread, so the event loop is not blocked while waiting on the files
+        headers = await asyncio.to_thread(cls.probe_files, paths=paths, workers=workers)
+        deletes, updates, inserts = cls._apply_headers(
+            path=path,
+            registered=registered,
+            headers=headers,
+            signatures=signatures,
+            update_id=update_id,
+        )
+
+        for statement, parameters in cls._create_bulk_statements(deletes=deletes, updates=updates, inserts=inserts):
+            await session.execute(statement, parameters)
+
+    @classmethod
+    async def correct_contents_async(
+        cls,
+        session: AsyncSession,
+        path: pathlib.Path,
+        begin: bool = False,
+        workers: int | None = None,
+        incremental: bool = False,
+    ) -> None:
+        if begin:
+            async with session.begin():
+                await cls._correct_contents_async(session=session, path=path, workers=workers, incremental=incremental)
+        else:
+            await cls._correct_contents_async(session=session, path=path, workers=workers, incremental=incremental)
+
+    # Bulk
+    @classmethod
+    def format_bulk_rows(
+        cls,
+        start_id: Iterable[int] | np.ndarray,
+        end_id: Iterable[int] | np.ndarray,
+        path: Iterable[pathlib.Path | str],
+        shape: Iterable[tuple[int, ...]] | np.ndarray,
+        sample_rate: Iterable[float] | np.ndarray | float,
+        update_id: Iterable[int] | np.ndarray | int = 0,
+        start: Iterable[int] | np.ndarray | None = None,
+        end: Iterable[int] | np.ndarray | None = None,
+        axis: Iterable[int] | np.ndarray | int = 0,
+        tz_offset: Iterable[float] | np.ndarray | float = 0,
+        **columns: Iterable[Any] | np.ndarray | Any,
+    ) -> list[dict[str, Any]]:
+        """Formats a columnar batch into the rows of the table.
+
+        Numeric columns may be arrays or scalars, which are broadcast to the length of the batch.
+
+        Args:
+            start_id: The start IDs of the rows.
+            end_id: The end IDs of the rows.
+            path: The paths of the rows, relative to the root of the contents.
+            shape: The data shapes of the rows.
+            sample_rate: The sample rates of the rows.
+            update_id: The update IDs of the rows.
+            start: The start nanostamps of the rows, the start IDs if None.
+            end: The end nanostamps of the rows, the end IDs if None.
+            axis: The time axes of the rows.
+            tz_offset: The time zone offsets in seconds of the rows.
+            **columns: Other columns of the rows.
+
+        Returns:
+            The rows of the batch.
+        """
+        start_id = np.asarray(start_id, dtype=np.int64)
+        n_rows = start_id.shape[0]
+        end_id = np.broadcast_to(np.asarray(end_id, dtype=np.int64), (n_rows,))
+        columnar = {
+            "start_id": start_id.tolist(),
+            "end_id": end_id.tolist(),
+            "path": [p.as_posix() if isinstance(p, pathlib.PurePath) else p for p in path],
+            "shape": [str(tuple(int(i) for i in s)).strip("()") for s in shape],
+            "sample_rate": np.broadcast_to(np.asarray(sample_rate, dtype=np.float64), (n_rows,)).tolist(),
+            "update_id": np.broadcast_to(np.asarray(update_id, dtype=np.int64), (n_rows,)).tolist(),
+            "start": start_id.tolist() if start is None else np.asarray(start, dtype=np.int64).tolist(),
+            "end": end_id.tolist() if end is None else np.asarray(end, dtype=np.int64).tolist(),
+            "axis": np.broadcast_to(np.asarray(axis, dtype=np.int64), (n_rows,)).tolist(),
+            "tz_offset": np.broadcast_to(np.asarray(tz_offset, dtype=np.float64), (n_rows,)).tolist(),
+        }
+        for name, values in columns.items():
+            columnar[name] = np.broadcast_to(np.asarray(values), (n_rows,)).tolist()
+
+        if any(len(values) != n_rows for values in columnar.values()):
+            raise ValueError("All columns of a bulk batch must have the same length.")
+
+        return [dict(zip(columnar, values)) for values in zip(*columnar.values())]
+
+    @classmethod
+    def format_bulk_entry(cls, entry: dict[str, Any]) -> dict[str, Any]:
+        """Formats an entry into a row of the table.
+
+        Args:
+            entry: The entry to format.
+
+        Returns:
+            The row of the entry, containing only the columns of the table.
+        """
+        columns = cls.__table__.columns
+        return {k: v for k, v in cls.format_entry_kwargs(**entry).items() if k in columns}
+
+    @classmethod
+    def _create_registered_statement(cls) -> Any:
+        """Creates the statement which selects what contents correction needs from the registered rows."""
+        return select(cls.id, cls.path, cls.file_mtime, cls.file_size, cls.file_inode)
+
+    @classmethod
+    def _create_existing_statements(cls, values: Iterable[Any], key: str = "start_id") -> list[Any]:
+        """Creates the statements which select the keys of the given values that exist in the table.
+
+        Args:
+            values: The key values to look up.
+            key: The name of the key column.
+
+        Returns:
+            The statements which select the existing keys, each looking up at most the bulk lookup size of values.
+        """
+        column = cls.__table__.c[key]
+        values = list(dict.fromkeys(values))
+        size = cls.bulk_lookup_size
+        return [select(column).where(column.in_(values[i:i + size])) for i in range(0, len(values), size)]
+
+    @classmethod
+    def _create_bulk_statements(
+        cls,
+        deletes: Iterable[uuid.UUID] = (),
+        updates: Iterable[dict[str, Any]] = (),
+        inserts: Iterable[dict[str, Any]] = (),
+        key: str = "id",
+    ) -> list[tuple[Any, list[dict[str, Any]]]]:
+        """Creates executemany statements for batches of row deletes, updates, and inserts.
+
+        Rows are grouped by their columns, so each group is a single executemany statement.
+
+        Args:
+            deletes: The IDs of the rows to delete.
+            updates: The rows to update, which must contain the key column.
+            inserts: The rows to insert.
+            key: The name of the column which identifies the rows to update.
+
+        Returns:
+            The statements and their parameters in the order they must be executed.
+        """
+        table = cls.__table__
+        statements = []
+
+        deletes = list(deletes)
+        size = cls.bulk_lookup_size
+        for i in range(0, len(deletes), size):
+            statements.append((delete(table).where(table.c.id.in_(deletes[i:i + size])), None))
+
+        b_key = f"b_{key}"
+        groups = {}
+        for row in updates:
+            parameters = {k: v for k, v in row.items() if k != key} | {b_key: row[key]}
+            groups.setdefault(frozenset(parameters), []).append(parameters)
+        for parameters in groups.values():
+            statements.append((update(table).where(table.c[key] == bindparam(b_key)), parameters))
+
+        groups = {}
+        for row in inserts:
+            parameters = {"id": uuid.uuid4()} | row
+            groups.setdefault(frozenset(parameters), []).append(parameters)
+        for parameters in groups.values():
+            statements.append((insert(table), parameters))
+
+        return statements
+
+    @classmethod
+    def _split_bulk_rows(
+        cls,
+        rows: Iterable[dict[str, Any]],
+        existing: set[Any],
+        key: str = "start_id",
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """Splits rows into the ones which update existing rows and the ones which are new.
+
+        Rows with the same key are merged into the last of them, so a batch never inserts a key twice.
+
+        Args:
+            rows: The rows to split.
+            existing: The key values which exist in the table.
+            key: The name of the key column.
+
+        Returns:
+            The rows to update and the rows to insert.
+        """
+        updates = []
+        inserts = []
+        for row in {row[key]: row for row in rows}.values():
+            (updates if row[key] in existing else inserts).append(row)
+        return updates, inserts
+
+    @classmethod
+    def _create_upsert_statements(
+        cls,
+        dialect: str,
+        rows: Iterable[dict[str, Any]],
+        key: str = "start_id",
+    ) -> list[tuple[Any, list[dict[str, Any]]]]:
+        """Creates executemany insert statements which update the existing row when the key conflicts.
+
+        Rows are grouped by their columns, so each group is a single executemany statement. Rows with the same key
+        are merged into the last of them and a conflicting row keeps its ID.
+
+        Args:
+            dialect: The name of the database dialect, which must be in the upsert dialects.
+            rows: The rows to insert or update.
+            key: The name of the key column, which must be unique in the database.
+
+        Returns:
+            The statements and their parameters in the order they must be executed.
+        """
+        groups = {}
+        for row in {row[key]: row for row in rows}.values():
+            parameters = {"id": uuid.uuid4()} | row
+            groups.setdefault(frozenset(parameters), []).append(parameters)
+
+        statements = []
+        for names, parameters in groups.items():
+            statement = cls.upsert_dialects[dialect](cls.__table__)
+            set_ = {n: statement.excluded[n] for n in names if n not in {"id", key}}
+            statements.append((statement.on_conflict_do_update(index_elements=[key], set_=set_), parameters))
+        return statements
+
+    @classmethod
+    def _is_native_upsert(cls, session: Session, key: str = "start_id") -> bool:
+        """Checks if bulk upserts can resolve key conflicts in the database.
+
+        Only SQLite and PostgreSQL have the ON CONFLICT clause, which also needs a unique index on the key. Other
+        databases, and ones created before the start ID index whose rows violate it, select the existing keys first
+        and then update and insert separately.
+
+        Args:
+            session: The SQLAlchemy session to use for the inspection.
+            key: The name of the key column.
+
+        Returns:
+            True if bulk upserts can use ON CONFLICT statements.
+        """
+        return (
+            cls.native_upsert
+            and session.get_bind().dialect.name in cls.upsert_dialects
+            and cls.has_unique_key(session=session, key=key)
+        )
+
+    @classmethod
+    def _bulk_upsert_rows(cls, session: Session, rows: list[dict[str, Any]], key: str = "start_id") -> None:
+        if cls._is_native_upsert(session=session, key=key):
+            dialect = session.get_bind().dialect.name
+            for statement, parameters in cls._create_upsert_statements(dialect=dialect, rows=rows, key=key):
+                session.execute(statement, parameters)
+            return
+
+        existing = set()
+        for statement in cls._create_existing_statements(values=(r[key] for r in rows), key=key):
+            existing.update(session.execute(statement).scalars())
+
+        updates, inserts = cls._split_bulk_rows(rows=rows, existing=existing, key=key)
+        for statement, parameters in cls._create_bulk_statements(updates=updates, inserts=inserts, key=key):
+            session.execute(statement, parameters)
+
+    @classmethod
+    async def _bulk_upsert_rows_async(
+        cls,
+        session: AsyncSession,
+        rows: list[dict[str, Any]],
+        key: str = "start_id",
+    ) -> None:
+        if await session.run_sync(cls._is_native_upsert, key=key):
+            dialect = session.get_bind().dialect.name
+            for statement, parameters in cls._create_upsert_statements(dialect=dialect, rows=rows, key=key):
+                await session.execute(statement, parameters)
+            return
+
+        existing = set()
+        for statement in cls._create_existing_statements(values=(r[key] for r in rows), key=key):
+            existing.update((await session.execute(statement)).scalars())
+
+        updates, inserts = cls._split_bulk_rows(rows=rows, existing=existing, key=key)
+        for statement, parameters in cls._create_bulk_statements(updates=updates, inserts=inserts, key=key):
+            await session.execute(statement, parameters)
+
+    @classmethod
+    def bulk_upsert(
+        cls,
+        session: Session,
+        start_id: Iterable[int] | np.ndarray,
+        end_id: Iterable[int] | np.ndarray,
+        path: Iterable[pathlib.Path | str],
+        shape: Iterable[tuple[int, ...]] | np.ndarray,
+        sample_rate: Iterable[float] | np.ndarray | float,
+        update_id: Iterable[int] | np.ndarray | int = 0,
+        key: str = "start_id",
+        begin: bool = False,
+        **columns: Iterable[Any] | np.ndarray | Any,
+    ) -> None:
+        """Inserts or updates a columnar batch of rows with executemany statements.
+
+        Rows whose key exists in the table update every row with that key, the rest are inserted. Rows with the same
+        key in a batch are merged into the last of them. The statements go straight to the table, so items already
+        loaded in the session are not refreshed.
+
+        Args:
+            session: The SQLAlchemy session to use for the operation.
+            start_id: The start IDs of the rows.
+            end_id: The end IDs of the rows.
+            path: The paths of the rows, relative to the root of the contents.
+            shape: The data shapes of the rows.
+            sample_rate: The sample rates of the rows.
+            update_id: The update IDs of the rows.
+            key: The name of the column which matches rows to existing rows.
+            begin: If True, begins a transaction for the operation.
+            **columns: Other columns of the rows, see format_bulk_rows.
+        """
+        rows = cls.format_bulk_rows(start_id, end_id, path, shape, sample_rate, update_id, **columns)
+        if begin:
+            with session.begin():
+                cls._bulk_upsert_rows(session=session, rows=rows, key=key)
+        else:
+            cls._bulk_upsert_rows(session=session, rows=rows, key=key)
+
+    @classmethod
+    async def bulk_upsert_async(
+        cls,
+        session: AsyncSession,
+        start_id: Iterable[int] | np.ndarray,
+        end_id: Iterable[int] | np.ndarray,
+        path: Iterable[pathlib.Path | str],
+        shape: Iterable[tuple[int, ...]] | np.ndarray,
+        sample_rate: Iterable[float] | np.ndarray | float,
+        update_id: Iterable[int] | np.ndarray | int = 0,
+        key: str = "start_id",
+        begin: bool = False,
+        **columns: Iterable[Any] | np.ndarray | Any,
+    ) -> None:
+        """Asynchronously inserts or updates a columnar batch of rows with executemany statements.
+
+        Args:
+            session: The SQLAlchemy async session to use for the operation.
+            start_id: The start IDs of the rows.
+            end_id: The end IDs of the rows.
+            path: The paths of the rows, relative to the root of the contents.
+            shape: The data shapes of the rows.
+            sample_rate: The sample rates of the rows.
+            update_id: The update IDs of the rows.
+            key: The name of the column which matches rows to existing rows.
+            begin: If True, begins a transaction for the operation.
+            **columns: Other columns of the rows, see format_bulk_rows.
+        """
+        rows = cls.format_bulk_rows(start_id, end_id, path, shape, sample_rate, update_id, **columns)
         if begin:
             async with session.begin():
-                await cls._correct_contents_async(session=session, path=path)
+                await cls._bulk_upsert_rows_async(session=session, rows=rows, key=key)
         else:
-            await cls._correct_contents_async(session=session, path=path)
+            await cls._bulk_upsert_rows_async(session=session, rows=rows, key=key)
+
+    @classmethod
+    def bulk_upsert_entries(
+        cls,
+        session: Session,
+        entries: Iterable[dict[str, Any]],
+        key: str = "start_id",
+        begin: bool = False,
+    ) -> None:
+        """Inserts or updates entries with executemany statements.
+
+        Args:
+            session: The SQLAlchemy session to use for the operation.
+            entries: The entries to insert or update.
+            key: The name of the column which matches entries to existing rows.
+            begin: If True, begins a transaction for the operation.
+        """
+        rows = [cls.format_bulk_entry(e) for e in entries]
+        if begin:
+            with session.begin():
+                cls._bulk_upsert_rows(session=session, rows=rows, key=key)
+        else:
+            cls._bulk_upsert_rows(session=session, rows=rows, key=key)
+
+    @classmethod
+    async def bulk_upsert_entries_async(
+        cls,
+        session: AsyncSession,
+        entries: Iterable[dict[str, Any]],
+        key: str = "start_id",
+        begin: bool = False,
+    ) -> None:
+        """Asynchronously inserts or updates entries with executemany statements.
+
+        Args:
+            session: The SQLAlchemy async session to use for the operation.
+            entries: The entries to insert or update.
+            key: The name of the column which matches entries to existing rows.
+            begin: If True, begins a transaction for the operation.
+        """
+        rows = [cls.format_bulk_entry(e) for e in entries]
+        if begin:
+            async with session.begin():
+                await cls._bulk_upsert_rows_async(session=session, rows=rows, key=key)
+        else:
+            await cls._bulk_upsert_rows_async(session=session, rows=rows, key=key)
+
+    @classmethod
+    def _create_index_statement(cls, update_id: int | None = None) -> Any:
+        """Creates a statement which selects the rows an XLTEKContentsIndex is built from, ordered by start ID.
+
+        Args:
+            update_id: The update ID which the selected rows must be newer than, None to select every row.
+
+        Returns:
+            The select statement.
+        """
+        statement = lambda_stmt(
+            lambda: select(
+                cls.id,
+                cls.start_id,
+                cls.end_id,
+                cls.start,
+                cls.end,
+                cls.sample_rate,
+                cls.tz_offset,
+                cls.axis,
+                cls.shape,
+                cls.path,
+                cls.update_id,
+            )
+        )
+        if update_id is not None:
+            statement += lambda s: s.where(cls.update_id > update_id)
+        return statement + (lambda s: s.order_by(cls.start_id))
+
+    @classmethod
+    def get_index_rows(cls, session: Session, update_id: int | None = None) -> list[Any]:
+        """Gets the rows which an XLTEKContentsIndex is built from, ordered by start ID.
+
+        Args:
+            session: The SQLAlchemy session to use for the query.
+            update_id: The update ID which the rows must be newer than, None to get every row.
+
+        Returns:
+            The index columns of the rows, see XLTEKContentsIndex.columns.
+        """
+        return list(session.execute(cls._create_index_statement(update_id=update_id)))
+
+    @classmethod
+    async def get_index_rows_async(cls, session: AsyncSession, update_id: int | None = None) -> list[Any]:
+        """Asynchronously gets the rows which an XLTEKContentsIndex is built from, ordered by start ID.
+
+        Args:
+            session: The SQLAlchemy async session to use for the query.
+            update_id: The update ID which the rows must be newer than, None to get every row.
+
+        Returns:
+            The index columns of the rows, see XLTEKContentsIndex.columns.
+        """
+        return list(await session.execute(cls._create_index_statement(update_id=update_id)))
+
+    @classmethod
+    def get_index_state(cls, session: Session) -> tuple[int, int | None]:
+        """Gets the number of rows and the largest update ID, which together tell if a cached index is current.
+
+        Args:
+            session: The SQLAlchemy session to use for the query.
+
+        Returns:
+            The number of rows and the largest update ID.
+        """
+        statement = lambda_stmt(lambda: select(func.count(cls.id), func.max(cls.update_id)))
+        return tuple(session.execute(statement).one())
+
+    @classmethod
+    async def get_index_state_async(cls, session: AsyncSession) -> tuple[int, int | None]:
+        """Asynchronously gets the number of rows and the largest update ID, which together tell if a cached index is
+        current.
+
+        Args:
+            session: The SQLAlchemy async session to use for the query.
+
+        Returns:
+            The number of rows and the largest update ID.
+        """
+        statement = lambda_stmt(lambda: select(func.count(cls.id), func.max(cls.update_id)))
+        return tuple((await session.execute(statement)).one())
 
     @classmethod
     def get_start_end_ids(cls, session: Session) -> tuple[tuple[int, int], ...]:
@@ -190,4 +852,10 @@ class BaseXLTEKContentsTable(BaseTimeContentsTable):
             self.start_id = start_id
         if (end_id := dict_.get("end_id", None)) is not None:
             self.end_id = end_id
+        if (file_mtime := dict_.get("file_mtime", None)) is not None:
+            self.file_mtime = file_mtime
+        if (file_size := dict_.get("file_size", None)) is not None:
+            self.file_size = file_size
+        if (file_inode := dict_.get("file_inode", None)) is not None:
+            self.file_inode = file_inode
         super().update(dict_)
@@ -13,19 +13,21 @@ __email__ = __email__
 
 # Imports #
 # Standard Libraries #
-from asyncio import sleep
 from queue import Empty
+import time
 from typing import Any
 
 # Third-Party Packages #
 from cdfs import BaseCDFS
-from cdfs.components import TimeContentsCDFSComponent
 from taskblocks import AsyncEvent
 from taskblocks import AsyncQueue
 from taskblocks import AsyncQueueInterface
 from taskblocks import TaskBlock
 
 # Local Packages #
+from ...xltektaskmetrics import XLTEKTaskMetrics
+from ...xltekthreadedget import XLTEKThreadedGet
+from ..components import XLTEKContentsCDFSComponent
 
 
 # Definitions #
@@ -43,10 +45,12 @@ class XLTEKContentsUpdateTask(TaskBlock):
     # Attributes #
     cdfs: BaseCDFS | None = None
     component_name: str = "contents"
-    cdfs_component: TimeContentsCDFSComponent | None = None
+    cdfs_component: XLTEKContentsCDFSComponent | None = None
     was_open: bool = False
     update_key: str = "start_id"
     contents_update_id: int = 0
+    wait_timeout: float = 0.1
+    commit_interval: float = 1.0
 
     # Magic Methods #
     # Construction/Destruction
@@ -54,6 +58,7 @@ class XLTEKContentsUpdateTask(TaskBlock):
         self,
         cdfs: BaseCDFS | None = None,
         component_name: str | None = None,
+        metrics_interval: float | None = None,
         name: str = "",
         sets_up: bool = True,
         tears_down: bool = True,
@@ -65,6 +70,11 @@ class XLTEKContentsUpdateTask(TaskBlock):
         init: bool = True,
         **kwargs: Any,
     ) -> None:
+        # New Attributes #
+        self.metrics: XLTEKTaskMetrics = XLTEKTaskMetrics(name=self.__class__.__name__)
+        self._pending: dict[Any, dict[str, Any]] = {}
+        self._pending_start: float = 0.0
+        self._entry_get: XLTEKThreadedGet = XLTEKThreadedGet()
 
         # Parent Attributes #
         super().__init__(*args, init=False, **kwargs)
@@ -74,6 +84,7 @@ class XLTEKContentsUpdateTask(TaskBlock):
             self.construct(
                 cdfs=cdfs,
                 component_name=component_name,
+                metrics_interval=metrics_interval,
                 name=name,
                 sets_up=sets_up,
                 tears_down=tears_down,
@@ -98,6 +109,7 @@ class XLTEKContentsUpdateTask(TaskBlock):
         self,
         cdfs: BaseCDFS | None = None,
         component_name: str | None = None,
+        metrics_interval: float | None = None,
         name: str | None = None,
         sets_up: bool | None = None,
         tears_down: bool | None = None,
@@ -113,6 +125,7 @@ class XLTEKContentsUpdateTask(TaskBlock):
         Args:
             cdfs: The CDFS object to use.
             component_name: The name of the CDFS component to use.
+            metrics_interval: The time in seconds between logged snapshots of the metrics, None to not log them.
             name: Name of this object.
             sets_up: Determines if setup will be run.
             tears_down: Determines if teardown will be run.
@@ -129,6 +142,9 @@ class XLTEKContentsUpdateTask(TaskBlock):
         if component_name is not None:
             self.component_name = component_name
 
+        if metrics_interval is not None:
+            self.metrics.log_interval = metrics_interval
+
         # Construct Parent #
         super().construct(
             name=name,
@@ -149,20 +165,77 @@ class XLTEKContentsUpdateTask(TaskBlock):
         self.inputs.events["entries_done"] = AsyncEvent()
         self.outputs.events["done"] = AsyncEvent()
 
-    async def entry_queue_get(self, interval: float = 0.0) -> list[dict[str, Any]] | None:
-        items = []
+    async def entry_queue_get(self) -> list[dict[str, Any]] | None:
+        """Waits for entries on the contents entry queue and gets all the entries which are queued with them.
+
+        The wait blocks in a worker thread for at most wait_timeout seconds at a time, so the task does not use the CPU
+        while idle, but still notices entries_done and when the pending entries are due to be committed. An entry which
+        the worker thread takes after the task is cancelled is returned by the next call, so it is not lost.
+
+        Returns:
+            The queued entries, an empty list when the pending entries are due, or None when the entries are done.
+        """
+        queue = self.contents_entry_queue
         while self.loop_event.is_set():
+            timeout = self.wait_timeout
+            if self._pending:
+                remaining = self.commit_interval - (time.perf_counter() - self._pending_start)
+                if remaining <= 0:
+                    return []
+                timeout = min(timeout, remaining)
+
             try:
-                items.append(self.contents_entry_queue.get(block=False))
+                items = [await self._entry_get.get(queue, timeout=timeout)]
             except Empty:
-                if items:
-                    return items
-                elif self.inputs.events["entries_done"].is_set():
+                if not self.inputs.events["entries_done"].is_set():
+                    continue
+                try:
+                    items = [queue.get(block=False)]
+                except Empty:
                     self.loop_event.clear()
-                    self.outputs.events["done"].set()
                     return None
-                else:
-                    await sleep(interval)
+
+            while True:
+                try:
+                    items.append(queue.get(block=False))
+                except Empty:
+                    return items
+
+        return None
+
+    # Updating
+    def coalesce(self, entries: list[dict[str, Any]]) -> None:
+        """Adds entries to the pending entries, keeping only the latest entry of each file.
+
+        The writer sends the whole entry of its file after every append, so the latest entry with the same update key
+        holds the latest end and shape of that file.
+
+        Args:
+            entries: The entries to add.
+        """
+        if not self._pending:
+            self._pending_start = time.perf_counter()
+        for entry in entries:
+            self._pending[entry[self.update_key]] = entry
+        self.metrics.count("entries", len(entries))
+
+    async def commit_pending(self) -> None:
+        """Upserts the pending entries in one transaction as one update."""
+        if not self._pending:
+            return
+
+        entries = list(self._pending.values())
+        self._pending.clear()
+        update_id = self.contents_update_id
+        for entry in entries:
+            entry["update_id"] = update_id
+        self.contents_update_id += 1
+
+        self.metrics.record("batch_size", len(entries), minimum=1)
+        commit_start = time.perf_counter()
+        await self.cdfs_component.bulk_upsert_entries_async(entries=entries, key=self.update_key, begin=True)
+        self.metrics.record("commit", time.perf_counter() - commit_start)
+        self.metrics.count("commits")
 
     # Setup
     async def setup(self, *args: Any, **kwargs: Any) -> None:
@@ -171,28 +244,27 @@ class XLTEKContentsUpdateTask(TaskBlock):
             self.cdfs.open()
         self.cdfs_component = self.cdfs.components[self.component_name]
         update_id = await self.cdfs_component.get_last_update_id_async()
-        self.contents_update_id = 0 if update_id is None else update_id
+        self.contents_update_id = 0 if update_id is None else update_id + 1
 
     # TaskBlock
     async def task(self, *args: Any, **kwargs: Any) -> None:
         """The main method to execute."""
         entries = await self.entry_queue_get()
         if entries is None:
+            await self.commit_pending()
+            self.outputs.events["done"].set()
             return
 
-        update_id = self.contents_update_id
-        for entry in entries:
-            entry["update_id"] = update_id
-        self.contents_update_id += 1
-
-        await self.cdfs_component.update_entries_async(
-                entries=entries,
-                key=self.update_key,
-                begin=True,
-            )
+        self.coalesce(entries)
+        if time.perf_counter() - self._pending_start >= self.commit_interval:
+            await self.commit_pending()
 
     # Teardown
     async def teardown(self, *args: Any, **kwargs: Any) -> None:
         """The method to run after executing task."""
+        await self.commit_pending()
         if not self.was_open:
             await self.cdfs.close_async()
+
+        if self.metrics.log_interval is not None:
+            self.metrics.log()
@@ -14,15 +14,19 @@ __email__ = __email__
 # Imports #
 # Standard Libraries #
 from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
 from copy import deepcopy
 import datetime
 import gc
+import math
 from pathlib import Path
 import traceback
 from typing import Any
 
 # Third-Party Packages #
 from baseobjects import BaseObject
+from dspobjects.time import Timestamp
 from proxyarrays import BlankTimeProxy
 import numpy as np
 from pyedflib import FILETYPE_BDFPLUS
@@ -32,12 +36,24 @@ from pyedflib.highlevel import make_header
 from pyedflib.highlevel import make_signal_headers
 
 # Local Packages #
+from ..xltekhdf5 import XLTEKRolloverPolicy
 from ..xltekcdfs import XLTEKCDFS
+from .xltekedfexportmanifest import XLTEKEDFExportManifest
 
 
 # Definitions #
 # Classes #
 class XLTEKCDFSEDFExporter(BaseObject):
+    # Class Attributes #
+    default_records_per_block: int = 60
+    manifest_suffix: str = "_export-manifest.json"
+    default_physical_min: float = -1000000.0
+    default_physical_max: float = 320000.0
+    digital_ranges: dict[int, tuple[int, int]] = {
+        FILETYPE_EDFPLUS: (-32768, 32767),
+        FILETYPE_BDFPLUS: (-8388608, 8388607),
+    }
+
     # Magic Methods #
     # Construction/Destruction
     def __init__(
@@ -45,6 +61,9 @@ class XLTEKCDFSEDFExporter(BaseObject):
         cdfs: None = None,
         new_name: str | None = None,
         channel_names: Iterable[str, ...] | None = None,
+        records_per_block: int | None = None,
+        scale_digital: bool | None = None,
+        file_suffix: str | None = None,
         *,
         init: bool = True,
         **kwargs: Any,
@@ -55,6 +74,12 @@ class XLTEKCDFSEDFExporter(BaseObject):
 
         self.channel_names: list = []
         self.fill_value: float = -1000000.0
+        self.records_per_block: int = self.default_records_per_block
+        self.scale_digital: bool = False
+        self.file_suffix: str = ".edf"
+
+        self._block_buffer: np.ndarray | None = None
+        self._record_buffer: np.ndarray | None = None
 
         # Parent Attributes #
         super().__init__(init=False, **kwargs)
@@ -65,6 +90,9 @@ class XLTEKCDFSEDFExporter(BaseObject):
                 cdfs=cdfs,
                 new_name=new_name,
                 channel_names=channel_names,
+                records_per_block=records_per_block,
+                scale_digital=scale_digital,
+                file_suffix=file_suffix,
                 **kwargs,
             )
 
@@ -75,12 +103,21 @@ class XLTEKCDFSEDFExporter(BaseObject):
         cdfs: None = None,
         new_name: str | None = None,
         channel_names: Iterable[str, ...] | None = None,
+        records_per_block: int | None = None,
+        scale_digital: bool | None = None,
+        file_suffix: str | None = None,
         **kwargs: Any,
     ) -> None:
         """Constructs this object.
 
         Args:
-
+            cdfs: The CDFS to export.
+            new_name: The name of the subject in the exported files.
+            channel_names: The names of the channels to export.
+            records_per_block: The number of EDF records to read from the CDFS at once.
+            scale_digital: Determines if files are exported as digital samples scaled to the range of each channel.
+            file_suffix: The suffix of the exported files, ".edf" for 16-bit EDF or ".bdf" for 24-bit BDF.
+            **kwargs: Keyword arguments for inheritance.
         """
         if cdfs is not None:
             self.cdfs = cdfs
@@ -92,26 +129,191 @@ class XLTEKCDFSEDFExporter(BaseObject):
             self.channel_names.clear()
             self.channel_names.extend(channel_names)
 
+        if records_per_block is not None:
+            self.records_per_block = records_per_block
+
+        if scale_digital is not None:
+            self.scale_digital = scale_digital
+
+        if file_suffix is not None:
+            self.file_suffix = file_suffix
+
         super().construct(**kwargs)
 
-    def _write_proxy_samples(self, writer, data, start=None, stop=None, digital=False):
-        """ """
-        samples_step = writer.get_smp_per_record(0)
-        dtype = np.int32 if digital else np.float64
+    def _get_block_buffers(
+        self,
+        samples_per_record: int,
+        n_channels: int,
+        read_dtype: np.dtype,
+        write_dtype: np.dtype,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Gets the buffers which records are read and written through, reusing them when their layout matches.
 
-        for record in data.islices(samples_step, slice(start, stop), dtype=dtype, proxy=False):
-            if record.shape[0] < samples_step:
-                old_record = record
-                record = np.zeros(shape=(samples_step, old_record.shape[1]), dtype=dtype)
-                record[: old_record.shape[0], :] = old_record
+        Both buffers hold a block of records, each record channel-major like the writer takes it. When the samples are
+        read as the dtype they are written as, both are the same buffer.
 
-            if digital:
-                success = writer.blockWriteDigitalSamples(record.T.flatten())
-            else:
-                success = writer.blockWritePhysicalSamples(record.T.flatten())
+        Args:
+            samples_per_record: The number of samples of each channel in a record.
+            n_channels: The number of channels.
+            read_dtype: The dtype to read the samples as.
+            write_dtype: The dtype the writer takes the samples as.
+
+        Returns:
+            The block buffer which the samples are read into and the block buffer which records are written from.
+        """
+        shape = (self.records_per_block, n_channels, samples_per_record)
+        record = self._record_buffer
+        if record is None or record.shape != shape or record.dtype != write_dtype:
+            self._record_buffer = np.empty(shape, dtype=write_dtype)
+        if read_dtype == write_dtype:
+            return self._record_buffer, self._record_buffer
+
+        block = self._block_buffer
+        if block is None or block.shape != shape or block.dtype != read_dtype:
+            self._block_buffer = np.empty(shape, dtype=read_dtype)
+        return self._block_buffer, self._record_buffer
 
-            if success < 0:
-                raise OSError(f"Unknown error while calling blockWriteSamples: {success}")
+    @staticmethod
+    def _fill_records(data: Any, block: np.ndarray, start: int, n_samples: int, pad: float = 0) -> int:
+        """Fills the records of a block buffer with the samples of a proxy.
+
+        Each record is filled through its transposed view, so the samples are stored channel-major as they are read
+        rather than transposed afterwards. The rest of the last record is set to the pad value.
+
+        Args:
+            data: The proxy to read the samples from.
+            block: The block buffer, which holds records of shape (channels, samples).
+            start: The first sample to read.
+            n_samples: The number of samples to read, at most the size of the block.
+            pad: The value to pad the last record with.
+
+        Returns:
+            The number of records which were filled.
+        """
+        samples_per_record = block.shape[2]
+        n_records = -(-n_samples // samples_per_record)
+        for i in range(n_records):
+            record_start = start + i * samples_per_record
+            n = min(samples_per_record, start + n_samples - record_start)
+            data.fill_slices_array(
+                data_array=block[i].T,
+                array_slices=[slice(0, n), slice(None)],
+                slices=[slice(record_start, record_start + n), slice(None)],
+            )
+            block[i, :, n:] = pad
+        return n_records
+
+    @staticmethod
+    def fit_physical_limit(value: float, up: bool = False) -> float:
+        """Rounds a physical limit outward to the closest number which fits in the eight characters of an EDF header.
+
+        Args:
+            value: The physical limit.
+            up: Determines if the limit is rounded up, as a maximum, rather than down, as a minimum.
+
+        Returns:
+            The rounded limit, which the header stores exactly.
+        """
+        round_outward = math.ceil if up else math.floor
+        for decimals in range(7, -1, -1):
+            number = round_outward(value * 10**decimals) / 10**decimals
+            text = f"{number:.{decimals}f}".rstrip("0").rstrip(".") if decimals else f"{number:.0f}"
+            if len(text) <= 8:
+                return float(text)
+        raise ValueError(f"The physical limit {value} does not fit in an EDF header.")
+
+    def compute_physical_ranges(
+        self,
+        data: Any,
+        start: int | None = None,
+        stop: int | None = None,
+        samples_per_record: int = 1,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Finds the physical range of each channel of the samples to export, ignoring the fill value.
+
+        The samples are read in blocks through the same buffer as the export. Channels without valid samples get the
+        default range and constant channels are widened by one, so every range can be scaled.
+
+        Args:
+            data: The proxy to find the ranges of.
+            start: The first sample to find the ranges of.
+            stop: The sample to stop finding the ranges at.
+            samples_per_record: The number of samples of each channel in a record.
+
+        Returns:
+            The physical minimums and maximums of the channels, which fit in the EDF header.
+        """
+        start = 0 if start is None else int(start)
+        stop = data.shape[0] if stop is None else int(stop)
+        n_channels = data.shape[1]
+        float64 = np.dtype(np.float64)
+        block, _ = self._get_block_buffers(samples_per_record, n_channels, float64, float64)
+        block_samples = block.shape[0] * samples_per_record
+
+        minimums = np.full(n_channels, np.inf)
+        maximums = np.full(n_channels, -np.inf)
+        for block_start in range(start, stop, block_samples):
+            n_samples = min(block_samples, stop - block_start)
+            n_records = self._fill_records(data, block, block_start, n_samples, pad=self.fill_value)
+            samples = block[:n_records]
+            valid = samples != self.fill_value
+            np.minimum(minimums, samples.min(axis=(0, 2), where=valid, initial=np.inf), out=minimums)
+            np.maximum(maximums, samples.max(axis=(0, 2), where=valid, initial=-np.inf), out=maximums)
+
+        empty = minimums > maximums
+        minimums[empty] = self.default_physical_min
+        maximums[empty] = self.default_physical_max
+        maximums[minimums == maximums] += 1
+        minimums = np.fromiter((self.fit_physical_limit(m) for m in minimums), dtype=np.float64, count=n_channels)
+        maximums = np.fromiter((self.fit_physical_limit(m, True) for m in maximums), dtype=np.float64, count=n_channels)
+        return minimums, maximums
+
+    def _write_proxy_samples(self, writer, data, start=None, stop=None, digital=False, scaling=None):
+        """Writes the samples of a proxy to an EDF writer, reading many records at once into reused buffers.
+
+        Each block of records is read into a buffer whose records are channel-major, so every record is handed to the
+        writer as a view without a copy. Physical samples are read as float64, which the writer takes, so samples
+        stored as float64 keep their precision. When scaling is given, the physical samples of the whole block are
+        scaled to digital samples in place, cast into the digital block buffer at once, and written as digital
+        samples, so the writer does not rescale them one at a time. The last record is padded with zeros.
+
+        Scaling is the physical minimums and maximums and the digital minimum and maximum of the channels. Scaling is
+        done in float32 for 16-bit samples, which it represents exactly, and in float64 for 24-bit samples.
+        """
+        samples_step = writer.get_smp_per_record(0)
+        digital = digital or scaling is not None
+        write_dtype = np.dtype(np.int32 if digital else np.float64)
+        read_dtype = write_dtype
+        if scaling is not None:
+            physical_min, physical_max, digital_min, digital_max = scaling
+            read_dtype = np.dtype(np.float32 if digital_max - digital_min < 2**16 else np.float64)
+            gain = ((digital_max - digital_min) / (physical_max - physical_min)).astype(read_dtype)
+            offset = (digital_min - physical_min * gain).astype(read_dtype)
+            gain, offset = gain[:, np.newaxis], offset[:, np.newaxis]
+        write_record = writer.blockWriteDigitalSamples if digital else writer.blockWritePhysicalSamples
+
+        start = 0 if start is None else int(start)
+        stop = data.shape[0] if stop is None else int(stop)
+        block, records = self._get_block_buffers(samples_step, data.shape[1], read_dtype, write_dtype)
+        block_samples = block.shape[0] * samples_step
+
+        for block_start in range(start, stop, block_samples):
+            n_samples = min(block_samples, stop - block_start)
+            n_records = self._fill_records(data, block, block_start, n_samples)
+
+            # Scale Physical to Digital Samples
+            if scaling is not None:
+                samples = block[:n_records]
+                samples *= gain
+                samples += offset
+                np.rint(samples, out=samples)
+                np.clip(samples, digital_min, digital_max, out=samples)
+                np.copyto(records[:n_records], samples, casting="unsafe")
+
+            for record in records[:n_records]:
+                success = write_record(record.reshape(-1))
+                if success < 0:
+                    raise OSError(f"Unknown error while calling blockWriteSamples: {success}")
 
     def write_edf_proxy(
         self,
@@ -123,8 +325,22 @@ class XLTEKCDFSEDFExporter(BaseObject):
         stop: Any = None,
         digital: bool = False,
         file_type: str | None = None,
+        scale: bool = False,
     ):
-        """ """
+        """Writes the samples of a proxy to an EDF or BDF file.
+
+        Args:
+            path: The path of the file, which determines the file type when it is not given.
+            signals: The proxy to write the samples of.
+            signal_headers: The headers of the channels.
+            header: The header of the file.
+            start: The first sample to write.
+            stop: The sample to stop writing at.
+            digital: Determines if the samples are already digital.
+            file_type: The type of the file, EDF or BDF.
+            scale: Determines if the physical samples are scaled to the digital range of the file type, with the
+                physical range of each channel found from its samples. Fill samples are clipped to the digital minimum.
+        """
         assert len(signal_headers) == signals.shape[1], "signals and signal_headers must be same length"
 
         header = make_header() | ({} if header is None else header)
@@ -150,7 +366,28 @@ class XLTEKCDFSEDFExporter(BaseObject):
         with EdfWriter(path.as_posix(), n_channels=signals.shape[1], file_type=file_type) as f:
             f.setSignalHeaders(signal_headers)
             f.setHeader(header)
-            self._write_proxy_samples(writer=f, data=signals, start=start, stop=stop, digital=digital)
+
+            # Find the Physical Ranges to Scale Digital Samples to
+            scaling = None
+            if scale:
+                physical_min, physical_max = self.compute_physical_ranges(
+                    signals,
+                    start=start,
+                    stop=stop,
+                    samples_per_record=f.get_smp_per_record(0),
+                )
+                digital_min, digital_max = self.digital_ranges[file_type]
+                for signal_header, p_min, p_max in zip(signal_headers, physical_min, physical_max):
+                    signal_header.update(
+                        physical_min=p_min,
+                        physical_max=p_max,
+                        digital_min=digital_min,
+                        digital_max=digital_max,
+                    )
+                f.setSignalHeaders(signal_headers)
+                scaling = (physical_min, physical_max, digital_min, digital_max)
+
+            self._write_proxy_samples(writer=f, data=signals, start=start, stop=stop, digital=digital, scaling=scaling)
             for annotation in annotations:
                 f.writeAnnotation(*annotation)
         del f
@@ -183,67 +420,23 @@ class XLTEKCDFSEDFExporter(BaseObject):
             equipment="Natus: XLTEK",
         )
 
-    def export_as_hours(self, path, name: str | None, fill: bool = True):
-        name = self.new_name if name is None else name
-        edf_header = self.create_header()
-        flat_data = self.cdfs.data.as_flattened()
-        if fill:
-            flat_data.time_tolerance = flat_data.sample_period
-            flat_data.insert_missing(fill_method="full", fill_kwargs={"fill_value": -1000000.0})
-        change_indices = flat_data.where_shapes_change()
-        proxy_ranges = zip((0, *change_indices), (*change_indices, len(flat_data.proxies)))
-        hours = set()
-        copy_number = 0
-        for s, e in proxy_ranges:
-            proxies = flat_data.proxies[s:e]
-            if proxies:
-                p = flat_data.create_proxy()
-                p.proxies.extend(proxies)
-                if p.shape[1] == len(self.channel_names):
-                    n_hours = int((p.end_datetime - p.start_datetime).total_seconds() // 3600) + 1
-                    first_hour = p.start_datetime.replace(minute=0, second=0, microsecond=0, nanosecond=0)
-                    signal_headers = make_signal_headers(
-                        self.channel_names,
-                        sample_frequency=p.sample_rate,
-                        physical_min=-1000000.0,
-                        physical_max=320000.0,
-                    )
-                    for h in range(n_hours):
-                        hour = first_hour + datetime.timedelta(hours=h)
-                        if hour in hours:
-                            copy_number += 1
-                        else:
-                            hours.add(first_hour + datetime.timedelta(days=h))
-                            copy_number = 0
-                        day_data = p.find_data_range(
-                            start=first_hour + datetime.timedelta(days=h),
-                            stop=first_hour + datetime.timedelta(days=h + 1),
-                            approx=True,
-                            tails=True,
-                        )
-
-                        path = path / f"{name}_task-hour{len(hours)}{'' if copy_number == 0 else f'_{copy_number}'}.edf"
-                        edf_header["startdate"] = day_data.data.start_datetime
-                        self.formated_save_edf(
-                            path=path,
-                            signals=day_data.data.data.T,
-                            signal_headers=signal_headers,
-                            header=edf_header,
-                        )
-
-    def export_as_days(self, path: Path, name: str | None = None, fill: bool = True) -> None:
-        # Get Name and Create Header
-        name = self.new_name if name is None else name
-        edf_header = self.create_header()
+    def create_segments(self, fill: bool = True) -> list:
+        """Flattens the data of the CDFS into segments of proxies which have the same channels as the export.
+
+        Args:
+            fill: Determines if missing data is filled with the fill value.
 
+        Returns:
+            The segments to export, empty if the data cannot be exported.
+        """
         # Flatten Data
-        proxy = self.cdfs.components["contents"].create_contents_proxy()
-        flat_data = proxy.as_flattened()
         if not self.cdfs:
             print(
                 f"self.cdfs is not defined when it should be. export cannot be performed. self.cdsf value: {self.cdfs}"
             )
-            return
+            return []
+        proxy = self.cdfs.components["contents"].create_contents_proxy()
+        flat_data = proxy.as_flattened()
         try:
             sample_frequency = 1 / flat_data.sample_period
             print(f"sample frequency: {sample_frequency}")
@@ -251,7 +444,7 @@ class XLTEKCDFSEDFExporter(BaseObject):
             print("The following index error was raised:")
             traceback.print_exc()
             print(f"Unable to access sample period, export cannot be performed. flat_data value: {flat_data}")
-            return
+            return []
 
         # Fill Missing Data
         if fill:
@@ -262,9 +455,8 @@ class XLTEKCDFSEDFExporter(BaseObject):
         change_indices = flat_data.where_shapes_change()
         proxy_ranges = zip((0, *change_indices), (*change_indices, len(flat_data.proxies)))
 
-        # Loop Over Proxy Ranges
-        days = set()
-        copy_number = 0
+        # Only Export Proxy Ranges that Match the Channels
+        segments = []
         for s, e in proxy_ranges:
             proxies = flat_data.proxies[s:e]
             if proxies:
@@ -277,69 +469,364 @@ class XLTEKCDFSEDFExporter(BaseObject):
                     print(f"proxy length: {proxy_segment.shape[1]}")
                     print(f"channel length: {len(self.channel_names)}")
                     continue
-                # Only Export Proxy Ranges that Match the Channels
-                if proxy_segment.shape[1] == len(self.channel_names):
-                    # Create Signal Headers
-                    signal_headers = make_signal_headers(
-                        self.channel_names,
-                        sample_frequency=proxy_segment.sample_rate,
-                        physical_min=-1000000.0,
-                        physical_max=320000.0,
-                    )
+                segments.append(proxy_segment)
+
+        return segments
+
+    @staticmethod
+    def find_sample_indices(proxy_segment: Any, nanostamps: np.ndarray) -> np.ndarray:
+        """Finds the first sample at or after each of many times in a segment, in one pass over its proxies.
+
+        The index of each time is found from the start time and length of the proxy which contains it and the sample
+        rate, so no time axis is read. Times in a gap between proxies get the first sample of the next proxy.
+
+        Args:
+            proxy_segment: The segment to find the samples in.
+            nanostamps: The sorted times in nanoseconds.
+
+        Returns:
+            The indices of the samples.
+        """
+        proxies = proxy_segment.proxies
+        n_proxies = len(proxies)
+        starts = np.fromiter((int(p.start_nanostamp) for p in proxies), dtype=np.int64, count=n_proxies)
+        lengths = np.fromiter((p.shape[0] for p in proxies), dtype=np.int64, count=n_proxies)
+        start_indices = np.asarray(proxy_segment.proxy_start_indices, dtype=np.int64)
+
+        containing = np.clip(np.searchsorted(starts, nanostamps, side="right") - 1, 0, n_proxies - 1)
+        offsets = np.ceil((nanostamps - starts[containing]) * (proxy_segment.sample_rate / 10**9) - 1e-6)
+        return start_indices[containing] + np.clip(offsets, 0, lengths[containing]).astype(np.int64)
+
+    def plan_periods(
+        self,
+        segments: list,
+        path: Path,
+        name: str | None = None,
+        fill: bool = True,
+        duration: float | None = None,
+        label: str = "day",
+    ) -> list[dict]:
+        """Plans the files of an export by day or by a fixed duration, with the data range, headers, and annotations.
+
+        Periods are aligned to the local time of the data and never cross midnight, so hourly files start on the hour
+        and days start at midnight. The samples where the periods start are found for all the periods of a segment at
+        once. Files are numbered by period and periods which are in more than one segment get a copy number.
+
+        Args:
+            segments: The segments to export, from create_segments.
+            path: The directory to export to.
+            name: The name of the subject in the file names.
+            fill: Determines if missing data was filled, which is annotated as invalid time.
+            duration: The duration of the periods in seconds, None for days.
+            label: The name of the periods in the file names.
+
+        Returns:
+            The plans of the files, which write_period exports.
+        """
+        # Get Name and Create Header
+        name = self.new_name if name is None else name
+        edf_header = self.create_header()
+        policy = XLTEKRolloverPolicy(duration=duration, day=True)
+
+        plans = []
+        periods = set()
+        copy_number = 0
+        for segment_index, proxy_segment in enumerate(segments):
+            # Create Signal Headers
+            signal_headers = make_signal_headers(
+                self.channel_names,
+                sample_frequency=proxy_segment.sample_rate,
+                physical_min=self.default_physical_min,
+                physical_max=self.default_physical_max,
+            )
+
+            # Get Ranges of Blank/Fill Data
+            blank_indices = np.where(tuple(isinstance(proxy, BlankTimeProxy) for proxy in proxy_segment))[0]
+            blank_starts = np.fromiter((proxy_segment.proxy_start_indices[i] for i in blank_indices), dtype=int)
+            blank_lengths = np.fromiter((proxy_segment.proxies[i].shape[0] for i in blank_indices), dtype=int)
+            blank_stops = blank_starts + blank_lengths
+
+            # Find the Boundaries of the Periods and the Samples where they Start
+            tzinfo = proxy_segment.start_datetime.tzinfo
+            start, end = int(proxy_segment.start_nanostamp), int(proxy_segment.end_nanostamp)
+            period_starts = [policy.file_start(start, tzinfo)]
+            while (boundary := policy.next_boundary(period_starts[-1], tzinfo)) <= end:
+                period_starts.append(boundary)
+            indices = self.find_sample_indices(proxy_segment, np.array(period_starts[1:], dtype=np.int64))
+            start_indices = np.concatenate(([0], indices))
+            stop_indices = np.concatenate((indices, [proxy_segment.shape[0]]))
+
+            # Loop Over and Plan Periods
+            for period_start, start_index, stop_index in zip(period_starts, start_indices, stop_indices):
+                # Generate File path
+                if period_start in periods:
+                    copy_number += 1
+                else:
+                    periods.add(period_start)
+                    copy_number = 0
+
+                # Only Plan Periods with Data
+                if start_index >= stop_index:
+                    continue
+
+                file_name = f"{name}_task-{label}{len(periods)}_ieeg{'' if copy_number == 0 else f'_{copy_number}'}"
+                file_path = path / f"{file_name}{self.file_suffix}"
+
+                start_time = int(proxy_segment.get_nanostamp(int(start_index)))
+                if stop_index == proxy_segment.shape[0]:
+                    stop_time = end
+                else:
+                    stop_time = int(proxy_segment.get_nanostamp(int(stop_index)))
+                start_datetime = Timestamp(start_time, tz=tzinfo)
+                header = deepcopy(edf_header)
+                header["startdate"] = start_datetime
+
+                # Create Annotations with Blank/Fill Information, Clipped to the Period
+                if fill:
+                    valid_blanks = (blank_starts < stop_index) & (start_index < blank_stops)
+                    annotations = []
+                    for index in blank_indices[valid_blanks]:
+                        proxy = proxy_segment.proxies[index]
+                        invalid_start = max(int(proxy.start_nanostamp), start_time)
+                        invalid_stop = min(int(proxy.end_nanostamp), stop_time)
+                        invalid_onset = (invalid_start - start_time) / 10**9
+                        annotations.append((invalid_onset, (invalid_stop - invalid_start) / 10**9, "Invalid Time"))
+
+                    header["annotations"] = annotations
+
+                plans.append(
+                    {
+                        "path": file_path,
+                        "segment": segment_index,
+                        "start": int(start_index),
+                        "stop": int(stop_index),
+                        "start_time": start_datetime.isoformat(),
+                        "stop_time": Timestamp(stop_time, tz=tzinfo).isoformat(),
+                        "signal_headers": signal_headers,
+                        "header": header,
+                        "scale": self.scale_digital,
+                    }
+                )
+
+        return plans
+
+    def plan_days(self, segments: list, path: Path, name: str | None = None, fill: bool = True) -> list[dict]:
+        """Plans the day files of an export, with the data range, headers, and annotations of each.
+
+        Args:
+            segments: The segments to export, from create_segments.
+            path: The directory to export to.
+            name: The name of the subject in the file names.
+            fill: Determines if missing data was filled, which is annotated as invalid time.
+
+        Returns:
+            The plans of the days, which write_period exports.
+        """
+        return self.plan_periods(segments, path=path, name=name, fill=fill)
+
+    def write_period(self, proxy_segment, plan: dict) -> Path:
+        """Writes the EDF file of a planned period, to a partial file which is renamed into place once it is complete.
+
+        Args:
+            proxy_segment: The segment which the period is in.
+            plan: The plan of the period, from plan_periods.
+
+        Returns:
+            The path of the EDF file.
+        """
+        path = plan["path"]
+        partial_path = path.with_name(f"{path.stem}.partial{path.suffix}")
+        self.write_edf_proxy(
+            path=partial_path,
+            signals=proxy_segment,
+            signal_headers=plan["signal_headers"],
+            start=plan["start"],
+            stop=plan["stop"],
+            header=plan["header"],
+            scale=plan["scale"],
+        )
+        partial_path.replace(path)
+        return path
+
+    def get_source_state(self, name: str, fill: bool, duration: float | None = None) -> dict[str, Any]:
+        """Gets the state of the contents of the CDFS and the settings of an export, which tell if it is current.
+
+        Args:
+            name: The name of the subject in the file names.
+            fill: Determines if missing data is filled.
+            duration: The duration of the periods in seconds, None for days.
+
+        Returns:
+            The number of rows and largest update ID of the contents and the settings of the export.
+        """
+        contents = self.cdfs.components["contents"]
+        with contents.create_session() as session:
+            count, update_id = contents.table.get_index_state(session=session)
+        settings = {
+            "name": name,
+            "channel_names": self.channel_names,
+            "fill": fill,
+            "fill_value": self.fill_value,
+            "scale_digital": self.scale_digital,
+            "file_suffix": self.file_suffix,
+            "duration": duration,
+        }
+        return {"contents": {"count": count, "update_id": update_id}, "settings": settings}
+
+    def export_as_periods(
+        self,
+        path: Path,
+        name: str | None = None,
+        fill: bool = True,
+        duration: float | None = None,
+        label: str = "day",
+        workers: int | None = None,
+        verify: bool = False,
+    ) -> None:
+        """Exports the data of the CDFS as an EDF file per day or per fixed duration, resuming a previous export.
+
+        All the periods are planned up front and recorded in a manifest next to the files. Periods which the manifest
+        has as complete are skipped and the rest are written in order or, when workers is more than one, by a pool of
+        processes which each open the CDFS read-only on their own. Each period is marked complete in the manifest as
+        soon as it is written, so an interrupted export resumes at the first period which was not finished. If the
+        CDFS and settings have not changed since every period was completed, the export returns without reading the
+        CDFS.
+
+        Args:
+            path: The directory to export to.
+            name: The name of the subject in the file names.
+            fill: Determines if missing data is filled with the fill value and annotated as invalid time.
+            duration: The duration of the periods in seconds, None for days.
+            label: The name of the periods in the file names.
+            workers: The number of processes which write periods, None or one writes them in this process.
+            verify: Determines if periods are checksummed and complete periods are checked against their checksum rather
+                than only their size.
+        """
+        name = self.new_name if name is None else name
+        source = self.get_source_state(name=name, fill=fill, duration=duration)
+        manifest_path = path / f"{name}_task-{label}{self.manifest_suffix}"
+        manifest = XLTEKEDFExportManifest(path=manifest_path, verify=verify)
+        if manifest.is_finished(source):
+            print(f"Every {label} is already exported to {path}.")
+            return
+
+        segments = self.create_segments(fill=fill)
+        plans = self.plan_periods(segments, path=path, name=name, fill=fill, duration=duration, label=label)
+        plans = manifest.set_plans(plans, source)
+
+        if workers is None or workers <= 1:
+            for plan in plans:
+                print(f"Exporting {plan['path'].name}...")
+                proxy_segment = segments[plan["segment"]]
+                exported = self.write_period(proxy_segment, plan)
+                manifest.mark_complete(exported.name, XLTEKEDFExportManifest.file_record(exported, checksum=verify))
+                proxy_segment.clear_all_caches()
+                gc.collect()
+            return
+
+        # The segments hold open files, so each worker creates its own from the CDFS.
+        del segments
+        initargs = (self.cdfs.path, self.channel_names, fill, self.fill_value, self.records_per_block)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_period_worker, initargs=initargs) as executor:
+            futures = [executor.submit(_write_period_in_worker, plan, verify) for plan in plans]
+            for future in as_completed(futures):
+                exported, record = future.result()
+                manifest.mark_complete(exported.name, record)
+                print(f"Exported {exported.name}")
+
+    def export_as_days(
+        self,
+        path: Path,
+        name: str | None = None,
+        fill: bool = True,
+        workers: int | None = None,
+        verify: bool = False,
+    ) -> None:
+        """Exports the data of the CDFS as an EDF file per day, resuming from the manifest of a previous export.
+
+        Args:
+            path: The directory to export to.
+            name: The name of the subject in the file names.
+            fill: Determines if missing data is filled with the fill value and annotated as invalid time.
+            workers: The number of processes which write days, None or one writes them in this process.
+            verify: Determines if days are checksummed and complete days are checked against their checksum rather than
+                only their size.
+        """
+        self.export_as_periods(path=path, name=name, fill=fill, workers=workers, verify=verify)
+
+    def export_as_hours(
+        self,
+        path: Path,
+        name: str | None = None,
+        fill: bool = True,
+        hours: float = 1,
+        workers: int | None = None,
+        verify: bool = False,
+    ) -> None:
+        """Exports the data of the CDFS as an EDF file per hour, resuming from the manifest of a previous export.
+
+        Args:
+            path: The directory to export to.
+            name: The name of the subject in the file names.
+            fill: Determines if missing data is filled with the fill value and annotated as invalid time.
+            hours: The number of hours in each file.
+            workers: The number of processes which write hours, None or one writes them in this process.
+            verify: Determines if hours are checksummed and complete hours are checked against their checksum rather
+                than only their size.
+        """
+        self.export_as_periods(
+            path=path,
+            name=name,
+            fill=fill,
+            duration=hours * 3600,
+            label="hour",
+            workers=workers,
+            verify=verify,
+        )
+
 
-                    # Get Starts of Blank/Fill Data
-                    blank_indices = np.where(tuple(isinstance(proxy, BlankTimeProxy) for proxy in proxy_segment))[0]
-                    blank_starts = np.fromiter((proxy_segment.proxy_start_indices[i] for i in blank_indices), dtype=int)
-
-                    # Loop Over and Export Days
-                    n_days = (proxy_segment.end_date - proxy_segment.start_date).days + 1
-                    first_date = proxy_segment.start_datetime.date()
-                    for d in range(n_days):
-                        print(f"Exporting day {d + 1}...")
-                        # Generate Date and File path
-                        date = first_date + datetime.timedelta(days=d)
-                        if date in days:
-                            copy_number += 1
-                        else:
-                            days.add(first_date + datetime.timedelta(days=d))
-                            copy_number = 0
-
-                        file_name = (
-                            f"{name}_task-day{len(days)}_ieeg{'' if copy_number == 0 else f'_{copy_number}'}.edf"
-                        )
-                        file_path = path / file_name
-
-                        # Export to Non-Existing Files
-                        if not file_path.is_file():
-                            # Get Data Slices Indices
-                            start_index, stop_index, _ = proxy_segment.find_time_index_slice(
-                                start=first_date + datetime.timedelta(days=d),
-                                stop=first_date + datetime.timedelta(days=d + 1),
-                                approx=True,
-                                tails=True,
-                            )
-                            edf_header["startdate"] = start_index.datetime
-
-                            # Create Annotations with Blank/Fill Information
-                            if fill:
-                                valid_blanks = (start_index[0] < blank_starts) == (blank_starts < stop_index[0])
-                                annotations = []
-                                for index in blank_indices[valid_blanks]:
-                                    proxy = proxy_segment.proxies[index]
-                                    invalid_start = proxy.start_timestamp - start_index.datetime.timestamp()
-                                    invalid_duration = proxy.end_timestamp - proxy.start_timestamp
-                                    annotations.append((invalid_start, invalid_duration, "Invalid Time"))
-
-                                edf_header["annotations"] = annotations
-
-                            # Save and Clear
-                            self.write_edf_proxy(
-                                path=file_path,
-                                signals=proxy_segment,
-                                signal_headers=signal_headers,
-                                start=start_index[0],
-                                stop=stop_index[0],
-                                header=edf_header,
-                            )
-                            proxy_segment.clear_all_caches()
-                            gc.collect()
+# Functions #
+_period_worker: tuple[XLTEKCDFSEDFExporter, list] | None = None
+
+
+def _init_period_worker(
+    cdfs_path: Path,
+    channel_names: list[str],
+    fill: bool,
+    fill_value: float,
+    records_per_block: int,
+) -> None:
+    """Opens the CDFS read-only and creates the segments to export in a worker process of a period export.
+
+    Args:
+        cdfs_path: The path to the CDFS.
+        channel_names: The names of the channels to export.
+        fill: Determines if missing data is filled with the fill value.
+        fill_value: The value to fill missing data with.
+        records_per_block: The number of EDF records to read from the CDFS at once.
+    """
+    global _period_worker
+    exporter = XLTEKCDFSEDFExporter(
+        cdfs=XLTEKCDFS(path=cdfs_path, mode="r"),
+        channel_names=channel_names,
+        records_per_block=records_per_block,
+    )
+    exporter.fill_value = fill_value
+    _period_worker = exporter, exporter.create_segments(fill=fill)
+
+
+def _write_period_in_worker(plan: dict, checksum: bool = False) -> tuple[Path, dict[str, Any]]:
+    """Writes the EDF file of a planned period in a worker process of a period export.
+
+    Args:
+        plan: The plan of the period, from plan_periods.
+        checksum: Determines if the checksum of the EDF file is computed for the manifest.
+
+    Returns:
+        The path of the EDF file and its record for the manifest.
+    """
+    exporter, segments = _period_worker
+    proxy_segment = segments[plan["segment"]]
+    path = exporter.write_period(proxy_segment, plan)
+    proxy_segment.clear_all_caches()
+    return path, XLTEKEDFExportManifest.file_record(path, checksum=checksum)
@@ -0,0 +1,251 @@
+"""xltekedfexportmanifest.py
+A manifest of the files of an EDF export, which lets an interrupted export resume.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import hashlib
+import json
+import pathlib
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects import BaseObject
+
+# Local Packages #
+
+
+# Definitions #
+# Classes #
+class XLTEKEDFExportManifest(BaseObject):
+    """A manifest of the files of an EDF export, which lets an interrupted export resume where it stopped.
+
+    The manifest is a JSON file next to the exported files. It records the state of the source and the settings of the
+    export, and for each planned file its source range, whether it is complete, and its size and modification time. The
+    checksum of a file is only computed and recorded when verifying, so unverified exports never read their files back.
+    A file is only marked complete after it is fully written and renamed into place, so a file cut short by a crash is
+    never taken as complete. When the source and settings have not changed since every file was completed, the export
+    can be skipped without reading the source. When only the contents of the source have changed, planned files with the
+    same source range as their recorded entries are still taken as complete, so only new or changed files are exported.
+    When the settings have changed, every file is exported again.
+
+    Class Attributes:
+        version: The version of the manifest format.
+        chunk_size: The number of bytes read at once when checksumming a file.
+        range_keys: The keys of a plan which are its source range.
+
+    Attributes:
+        path: The path of the manifest file.
+        verify: Determines if files are checksummed and complete files are checked against their checksum rather than
+            only their size.
+        source: The state of the contents of the source and the settings of the export.
+        files: The entries of the planned files by file name.
+
+    Args:
+        path: The path of the manifest file.
+        verify: Determines if files are checksummed and complete files are checked against their checksum rather than
+            only their size.
+        load: Determines if the manifest is loaded from its file if it exists.
+        init: Determines if this object will construct.
+        **kwargs: Keyword arguments for inheritance.
+    """
+
+    version: int = 1
+    chunk_size: int = 2**24
+    range_keys: tuple[str, ...] = ("segment", "start", "stop", "start_time", "stop_time")
+
+    # Magic Methods #
+    # Construction/Destruction
+    def __init__(
+        self,
+        path: pathlib.Path | str | None = None,
+        verify: bool | None = None,
+        load: bool = True,
+        *,
+        init: bool = True,
+        **kwargs: Any,
+    ) -> None:
+        # New Attributes #
+        self.path: pathlib.Path | None = None
+        self.verify: bool = False
+        self.source: dict[str, Any] = {}
+        self.files: dict[str, dict[str, Any]] = {}
+
+        # Parent Attributes #
+        super().__init__(init=False, **kwargs)
+
+        # Object Construction #
+        if init:
+            self.construct(path=path, verify=verify, load=load, **kwargs)
+
+    # Instance Methods #
+    # Constructors/Destructors
+    def construct(
+        self,
+        path: pathlib.Path | str | None = None,
+        verify: bool | None = None,
+        load: bool = True,
+        **kwargs: Any,
+    ) -> None:
+        """Constructs this object.
+
+        Args:
+            path: The path of the manifest file.
+            verify: Determines if files are checksummed and complete files are checked against their checksum rather
+                than only their size.
+            load: Determines if the manifest is loaded from its file if it exists.
+            **kwargs: Keyword arguments for inheritance.
+        """
+        if path is not None:
+            self.path = pathlib.Path(path)
+
+        if verify is not None:
+            self.verify = verify
+
+        super().construct(**kwargs)
+
+        if load and self.path is not None and self.path.is_file():
+            self.load()
+
+    # File
+    def load(self) -> None:
+        """Loads the manifest from its file, starting empty if the file cannot be read."""
+        try:
+            with self.path.open("r") as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            manifest = {}
+
+        if manifest.get("version", None) == self.version:
+            self.source = manifest["source"]
+            self.files = manifest["files"]
+        else:
+            self.source = {}
+            self.files = {}
+
+    def save(self) -> None:
+        """Saves the manifest to its file, replacing the file atomically."""
+        temp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with temp_path.open("w") as file:
+            json.dump({"version": self.version, "source": self.source, "files": self.files}, file, indent=2)
+        temp_path.replace(self.path)
+
+    # Files
+    @classmethod
+    def file_checksum(cls, path: pathlib.Path) -> str:
+        """Computes the checksum of a file, reading it in chunks.
+
+        Args:
+            path: The path of the file.
+
+        Returns:
+            The SHA-256 checksum of the file.
+        """
+        checksum = hashlib.sha256()
+        with path.open("rb") as file:
+            while chunk := file.read(cls.chunk_size):
+                checksum.update(chunk)
+        return checksum.hexdigest()
+
+    @classmethod
+    def file_record(cls, path: pathlib.Path, checksum: bool = False) -> dict[str, Any]:
+        """Creates the record of a written file, which is its size, modification time, and optionally its checksum.
+
+        Args:
+            path: The path of the file.
+            checksum: Determines if the checksum of the file is computed, which reads the whole file.
+
+        Returns:
+            The size, modification time in nanoseconds, and SHA-256 checksum of the file, None if not computed.
+        """
+        stat = path.stat()
+        return {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": cls.file_checksum(path) if checksum else None,
+        }
+
+    def is_complete(self, name: str, plan: dict[str, Any] | None = None) -> bool:
+        """Checks if a file is complete, with the same source range as a plan when one is given.
+
+        Args:
+            name: The name of the file.
+            plan: The plan of the file, from plan_days.
+
+        Returns:
+            If the file is complete and matches its record.
+        """
+        entry = self.files.get(name, None)
+        if entry is None or not entry["complete"]:
+            return False
+        if plan is not None and any(entry[k] != plan[k] for k in self.range_keys):
+            return False
+
+        path = self.path.parent / name
+        if not path.is_file():
+            return False
+        stat = path.stat()
+        if stat.st_size != entry["size"]:
+            return False
+        if not self.verify:
+            return True
+        if entry["sha256"] is None:  # Recorded without verifying, so only a changed modification time is detectable.
+            return stat.st_mtime_ns == entry.get("mtime_ns", None)
+        return self.file_checksum(path) == entry["sha256"]
+
+    def is_finished(self, source: dict[str, Any]) -> bool:
+        """Checks if every file of an export is complete and the source and settings have not changed since.
+
+        Args:
+            source: The current state of the contents of the source and settings of the export.
+
+        Returns:
+            If the export does not need to run.
+        """
+        return bool(self.files) and self.source == source and all(self.is_complete(name) for name in self.files)
+
+    def set_plans(self, plans: list[dict[str, Any]], source: dict[str, Any]) -> list[dict[str, Any]]:
+        """Records the plans of an export, keeping the complete files which have the same source range.
+
+        Args:
+            plans: The plans of the files, from plan_days.
+            source: The current state of the contents of the source and settings of the export.
+
+        Returns:
+            The plans of the files which are not complete.
+        """
+        same_settings = self.source.get("settings", None) == source["settings"]
+        files = {}
+        remaining = []
+        for plan in plans:
+            name = plan["path"].name
+            if same_settings and self.is_complete(name, plan):
+                files[name] = self.files[name]
+            else:
+                record = {"complete": False, "size": None, "mtime_ns": None, "sha256": None}
+                files[name] = {k: plan[k] for k in self.range_keys} | record
+                remaining.append(plan)
+
+        self.source = source
+        self.files = files
+        self.save()
+        return remaining
+
+    def mark_complete(self, name: str, record: dict[str, Any]) -> None:
+        """Marks a file as complete and saves the manifest.
+
+        Args:
+            name: The name of the file.
+            record: The size, modification time, and checksum of the file, from file_record.
+        """
+        self.files[name].update(record, complete=True)
+        self.save()
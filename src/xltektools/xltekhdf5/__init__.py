@@ -13,7 +13,14 @@ __email__ = __email__
 
 # Imports #
 # Local Packages #
-from .xltekhdf5 import XLTEKHDF5
+from .xltekhdf5 import XLTEKHDF5, XLTEKHDF5Header
+from .xltekchunkplanner import XLTEKChunkPlanner
+from .xltekchunkcompressor import XLTEKChunkCompressor
 from .xltekhdf5_0 import HDF5XLTEK_0
 from .xltekhdf5_1 import XLTEKHDF5_1
+from .xltekhdf5_2 import XLTEKHDF5_2
+from .xltekimplicittimeaxis import XLTEKImplicitTimeAxis, XLTEKImplicitTimeSeriesComponent
+from .xltekringbuffer import XLTEKSharedRingBuffer
+from .xltekrolloverpolicy import XLTEKRolloverPolicy
+from .xltekbackpressure import XLTEKBackpressurePolicy
 # from .tasks import *
@@ -13,15 +13,20 @@ __email__ = __email__
 
 # Imports #
 # Standard Libraries #
-from asyncio import sleep
+from asyncio import wrap_future
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+import pathlib
 from queue import Empty
 import time
 from typing import Any
+from typing import Callable
 from typing import NamedTuple
 from typing import Optional
 
 # Third-Party Packages #
 from dspobjects.time import Timestamp
+import numpy as np
 from taskblocks import ArrayQueue
 from taskblocks import AsyncEvent
 from taskblocks import AsyncQueue
@@ -30,7 +35,14 @@ from taskblocks import AsyncQueueManager
 from taskblocks import TaskBlock
 
 # Local Packages #
+from xltektools.xltektaskmetrics import XLTEKTaskMetrics
+from xltektools.xltekthreadedget import XLTEKThreadedGet
 from xltektools.xltekhdf5.xltekhdf5 import XLTEKHDF5
+from xltektools.xltekhdf5.xltekhdf5_1 import XLTEKHDF5_1
+from xltektools.xltekhdf5.xltekbackpressure import XLTEKBackpressurePolicy
+from xltektools.xltekhdf5.xltekchunkplanner import XLTEKChunkPlanner
+from xltektools.xltekhdf5.xltekringbuffer import XLTEKSharedRingBuffer
+from xltektools.xltekhdf5.xltekrolloverpolicy import XLTEKRolloverPolicy
 
 
 # Definitions #
@@ -38,23 +50,120 @@ from xltektools.xltekhdf5.xltekhdf5 import XLTEKHDF5
 
 
 class XLTEKHDF5WriterTask(TaskBlock):
-    """
+    """A task which writes the data from a queue to XLTEK HDF5 files.
+
+    By default, every block from the queue is appended and flushed on its own. When batch_samples is set, blocks are
+    copied into a preallocated buffer which is appended and flushed once it holds batch_samples samples or its oldest
+    sample has waited batch_interval seconds. The contents info of buffered blocks is only sent after their flush, so
+    SWMR readers and the contents never refer to samples which are not in the file yet. Likewise, done is only set after
+    the final flush has sent the contents info of every block. When growth is set, the files are preallocated by that
+    growth mode rather than resized for every append, and trimmed when they are closed. When compress_workers is set,
+    the chunks of the files are compressed by that many threads and written directly.
+
+    When a shared buffer is given, producers put the samples and nanostamps of each block into the shared buffer and
+    only send the position and length of the block in place of the data and nanostamps. The block is then written
+    from the shared memory and released, so blocks are not copied between processes. Shared blocks only hold the
+    samples which have not been sent before.
+
+    When a rollover policy is given, the writer decides which file each sample goes to rather than the producer. Blocks
+    must then only hold new samples, and each block is split where the policy ends a file. The file entries are made by
+    the entry factory, such as generate_file_entry_kwargs of the contents component, and the contents info of a block
+    is built from the entry of its file, with the info of the block only providing the sample rate, time zone, and
+    update id. When files end at time boundaries, the file which starts at the next boundary is opened in the
+    background ahead of time and the previous file is closed in the background, so rollovers do not stall writing.
+    Files ended by size cannot be opened ahead of time, because their start is not known until they are full, so they
+    are named after their first sample.
+
+    The metrics count the samples and bytes written and rollovers, gauge the depths of the write queue, shared buffer,
+    and batch buffer, and time each append, flush, and rollover. They are logged every metrics_interval seconds.
+
+    When a backpressure policy is given, producers put blocks with put_block, which keeps the queued bytes within the
+    budget of the policy by blocking, spilling blocks to disk, or dropping them, and the writer releases the bytes of
+    each block once it is written. Producers which spill should drain the policy with wait before writing_done is set.
+    The shared buffer already bounds its memory, so the policy only applies to blocks sent through the queue.
 
     Class Attributes:
+        default_type: The default type of file to save the data as.
+        default_batch_samples: The default number of samples to buffer before writing, zero writes every block.
+        default_batch_interval: The default longest time in seconds to buffer samples before writing.
+        default_wait_timeout: The default longest time in seconds to block on the write queue before checking events.
 
     Attributes:
+        file_type: The type of file to save the data as.
+        file: The file being written to.
+        file_kwargs: The keyword arguments the file being written to was created with.
+        chunk_planner: The planner which determines the chunk shapes and chunk cache of new files, None keeps the
+            default layout. Planned chunks suit batched writing, where each write spans a chunk row or more.
+        batch_samples: The number of samples to buffer before writing, zero writes every block.
+        batch_interval: The longest time in seconds to buffer samples before writing.
+        growth: The growth mode which preallocates the files, None resizes the files for every append.
+        wait_timeout: The longest time in seconds to block on the write queue before checking events.
+        shared_buffer: The shared memory buffer which producers put blocks in, None to send them through the queue.
+        compress_workers: The number of threads which compress the chunks of the files, None to let HDF5 compress.
+        rollover: The policy which decides when to start a new file, None to write to the files the producer gives.
+        entry_factory: The function which makes the file kwargs and contents insert of a file for the rollover policy.
+        metrics: The throughput, queue depth, and latency metrics of this task.
+        backpressure: The policy which keeps the queued blocks within a memory budget, None to only bound the queue.
+        _write_get: The get from the write queue, which keeps its block when the task is cancelled while waiting.
+        _file_contents: The contents insert of the file being written to when rolling over.
+        _file_boundary: The time where the file being written to ends when rolling over, None for no time limit.
+        _next_file: The future of the file which is being opened ahead of time and its entry.
+        _next_start: The time where the file which is being opened ahead of time starts.
+        _closing: The futures of the files which are being closed in the background.
+        _executor: The thread which opens and closes files in the background, created when first needed.
+        _buffer: The preallocated buffer of the data which has not been written.
+        _buffer_nanostamps: The preallocated buffer of the nanostamps which have not been written.
+        _buffer_length: The number of samples in the buffers.
+        _buffer_infos: The contents info of the buffered blocks, sent after the buffers are written.
+        _buffer_start: The time when the first sample of the buffers was added.
 
     Args:
-
+        file_type: The type of file to save the data as.
+        chunk_planner: The planner which determines the chunk shapes and chunk cache of new files, None keeps the
+            default layout. Planned chunks suit batched writing, where each write spans a chunk row or more.
+        batch_samples: The number of samples to buffer before writing, zero writes every block.
+        batch_interval: The longest time in seconds to buffer samples before writing.
+        growth: The growth mode which preallocates the files, None resizes the files for every append.
+        wait_timeout: The longest time in seconds to block on the write queue before checking events.
+        shared_buffer: The shared memory buffer which producers put blocks in, None to send them through the queue.
+        compress_workers: The number of threads which compress the chunks of the files, None to let HDF5 compress.
+        rollover: The policy which decides when to start a new file, None to write to the files the producer gives.
+        entry_factory: The function which makes the file kwargs and contents insert of a file for the rollover policy.
+        metrics_interval: The time in seconds between logged snapshots of the metrics, None to not log them.
+        backpressure: The policy which keeps the queued blocks within a memory budget, None to only bound the queue.
+        name: Name of this object.
+        sets_up: Determines if setup will be run.
+        tears_down: Determines if teardown will be run.
+        is_process: Determines if this task will run in another process.
+        s_kwargs: Contains the keyword arguments to be used in the setup method.
+        t_kwargs: Contains the keyword arguments to be used in the task method.
+        d_kwargs: Contains the keyword arguments to be used in the teardown method.
+        *args: Arguments for inheritance.
+        init: Determines if this object will construct.
+        **kwargs: Keyword arguments for inheritance.
     """
 
-    default_type = XLTEKHDF5.get_latest_version_class()
+    default_type = XLTEKHDF5_1
+    default_batch_samples: int = 0
+    default_batch_interval: float = 1.0
+    default_wait_timeout: float = 0.1
 
     # Magic Methods #
     # Construction/Destruction
     def __init__(
         self,
         file_type: type | None = None,
+        chunk_planner: XLTEKChunkPlanner | None = None,
+        batch_samples: int | None = None,
+        batch_interval: float | None = None,
+        growth: str | None = None,
+        wait_timeout: float | None = None,
+        shared_buffer: XLTEKSharedRingBuffer | None = None,
+        compress_workers: int | None = None,
+        rollover: XLTEKRolloverPolicy | None = None,
+        entry_factory: Callable[..., dict[str, Any]] | None = None,
+        metrics_interval: float | None = None,
+        backpressure: XLTEKBackpressurePolicy | None = None,
         name: str = "",
         sets_up: bool = True,
         tears_down: bool = True,
@@ -71,6 +180,30 @@ class XLTEKHDF5WriterTask(TaskBlock):
 
         self.file = None
         self.file_kwargs: dict[str, Any] = {"file": ""}
+        self.chunk_planner: XLTEKChunkPlanner | None = None
+
+        self.batch_samples: int = self.default_batch_samples
+        self.batch_interval: float = self.default_batch_interval
+        self.growth: str | None = None
+        self.wait_timeout: float = self.default_wait_timeout
+        self.shared_buffer: XLTEKSharedRingBuffer | None = None
+        self.compress_workers: int | None = None
+        self.rollover: XLTEKRolloverPolicy | None = None
+        self.entry_factory: Callable[..., dict[str, Any]] | None = None
+        self.metrics: XLTEKTaskMetrics = XLTEKTaskMetrics(name=self.__class__.__name__)
+        self.backpressure: XLTEKBackpressurePolicy | None = None
+        self._write_get: XLTEKThreadedGet = XLTEKThreadedGet()
+        self._file_contents: dict[str, Any] = {}
+        self._file_boundary: int | None = None
+        self._next_file: Future | None = None
+        self._next_start: int | None = None
+        self._closing: list[Future] = []
+        self._executor: ThreadPoolExecutor | None = None
+        self._buffer: np.ndarray | None = None
+        self._buffer_nanostamps: np.ndarray | None = None
+        self._buffer_length: int = 0
+        self._buffer_infos: list[dict[str, Any]] = []
+        self._buffer_start: float = 0.0
 
         # Parent Attributes #
         super().__init__(*args, init=False, **kwargs)
@@ -79,6 +212,17 @@ class XLTEKHDF5WriterTask(TaskBlock):
         if init:
             self.construct(
                 file_type=file_type,
+                chunk_planner=chunk_planner,
+                batch_samples=batch_samples,
+                batch_interval=batch_interval,
+                growth=growth,
+                wait_timeout=wait_timeout,
+                shared_buffer=shared_buffer,
+                compress_workers=compress_workers,
+                rollover=rollover,
+                entry_factory=entry_factory,
+                metrics_interval=metrics_interval,
+                backpressure=backpressure,
                 name=name,
                 sets_up=sets_up,
                 tears_down=tears_down,
@@ -111,6 +255,17 @@ class XLTEKHDF5WriterTask(TaskBlock):
     def construct(
         self,
         file_type: type | None = None,
+        chunk_planner: XLTEKChunkPlanner | None = None,
+        batch_samples: int | None = None,
+        batch_interval: float | None = None,
+        growth: str | None = None,
+        wait_timeout: float | None = None,
+        shared_buffer: XLTEKSharedRingBuffer | None = None,
+        compress_workers: int | None = None,
+        rollover: XLTEKRolloverPolicy | None = None,
+        entry_factory: Callable[..., dict[str, Any]] | None = None,
+        metrics_interval: float | None = None,
+        backpressure: XLTEKBackpressurePolicy | None = None,
         name: str | None = None,
         sets_up: bool | None = None,
         tears_down: bool | None = None,
@@ -125,6 +280,17 @@ class XLTEKHDF5WriterTask(TaskBlock):
 
         Args:
             file_type: The type of file to save the data as.
+            chunk_planner: The planner which determines the chunk shapes and chunk cache of new files.
+            batch_samples: The number of samples to buffer before writing, zero writes every block.
+            batch_interval: The longest time in seconds to buffer samples before writing.
+            growth: The growth mode which preallocates the files, None resizes the files for every append.
+            wait_timeout: The longest time in seconds to block on the write queue before checking events.
+            shared_buffer: The shared memory buffer which producers put blocks in, None to send them through the queue.
+            compress_workers: The number of threads which compress the chunks of the files, None to let HDF5 compress.
+            rollover: The policy which decides when to start a new file, None to write to the files the producer gives.
+            entry_factory: The function which makes the file kwargs and contents insert of a file for the rollover.
+            metrics_interval: The time in seconds between logged snapshots of the metrics, None to not log them.
+            backpressure: The policy which keeps the queued blocks within a memory budget, None to only bound the queue.
             name: Name of this object.
             sets_up: Determines if setup will be run.
             tears_down: Determines if teardown will be run.
@@ -138,6 +304,42 @@ class XLTEKHDF5WriterTask(TaskBlock):
         if file_type is not None:
             self.file_type = file_type
 
+        if chunk_planner is not None:
+            self.chunk_planner = chunk_planner
+
+        if batch_samples is not None:
+            self.batch_samples = batch_samples
+
+        if batch_interval is not None:
+            self.batch_interval = batch_interval
+
+        if growth is not None:
+            self.growth = growth
+
+        if wait_timeout is not None:
+            self.wait_timeout = wait_timeout
+
+        if shared_buffer is not None:
+            self.shared_buffer = shared_buffer
+
+        if compress_workers is not None:
+            self.compress_workers = compress_workers
+
+        if rollover is not None:
+            self.rollover = rollover
+
+        if entry_factory is not None:
+            self.entry_factory = entry_factory
+
+        if self.rollover is not None and self.entry_factory is None:
+            raise ValueError("A rollover policy needs an entry factory to make the entries of its files.")
+
+        if metrics_interval is not None:
+            self.metrics.log_interval = metrics_interval
+
+        if backpressure is not None:
+            self.backpressure = backpressure
+
         # Construct Parent #
         super().construct(
             name=name,
@@ -154,22 +356,421 @@ class XLTEKHDF5WriterTask(TaskBlock):
     # IO
     def construct_io(self) -> None:
         """Abstract method that constructs the io for this object."""
-        self.inputs.queues["write_queue"] = ArrayQueue(bytes_wait=True, maxbytes=int(6e9))
+        if self.shared_buffer is None:
+            # The policy keeps the queue within its budget plus one block, so the queue limit is only a safeguard.
+            maxbytes = int(6e9) if self.backpressure is None else 2 * self.backpressure.max_bytes
+            self.inputs.queues["write_queue"] = ArrayQueue(bytes_wait=True, maxbytes=maxbytes)
+        else:
+            self.inputs.queues["write_queue"] = AsyncQueue()
 
         self.outputs.queues["contents_info"] = AsyncQueue()
         self.outputs.events["done"] = AsyncEvent()
 
-    async def write_queue_get(self, interval: float = 0.0) -> Any:
+    async def write_queue_get(self) -> Any:
+        """Waits for the next item of the write queue, flushing the buffers when their oldest sample is due.
+
+        The wait blocks in a worker thread for at most wait_timeout seconds at a time, so the task does not use the CPU
+        while idle, but still notices writing_done and the batch interval. A block which the worker thread takes after
+        the task is cancelled is returned by the next call, so it is not lost.
+
+        Returns:
+            The data, nanostamps, and info of the next block or three Nones when writing is done.
+        """
         while self.loop_event.is_set():
+            timeout = self.wait_timeout
+            if self._buffer_length > 0:
+                remaining = self.batch_interval - (time.perf_counter() - self._buffer_start)
+                if remaining <= 0:
+                    await self.flush_buffer()
+                    continue
+                timeout = min(timeout, remaining)
+
             try:
-                return self.write_queue.get(block=False)
+                return await self._write_get.get(self.write_queue, timeout=timeout)
             except Empty:
                 if self.inputs.events["writing_done"].is_set():
-                    self.loop_event.clear()
-                    self.outputs.events["done"].set()
-                    return None, None, None
+                    try:
+                        return self.write_queue.get(block=False)
+                    except Empty:
+                        self.loop_event.clear()
+
+        return None, None, None
+
+    def put_block(self, data: np.ndarray, nanostamps: np.ndarray, info: dict[str, Any]) -> bool:
+        """Puts a block on the write queue for producers, through the backpressure policy when there is one.
+
+        Args:
+            data: The data of the block.
+            nanostamps: The nanostamps of the block.
+            info: The contents info of the block.
+
+        Returns:
+            If the block was queued or spilled, False if the backpressure policy dropped it.
+        """
+        if self.backpressure is None:
+            self.write_queue.put((data, nanostamps, info))
+            return True
+        else:
+            return self.backpressure.put(self.write_queue, data, nanostamps, info)
+
+    def queue_depth(self) -> int | None:
+        """Gets the number of items in the write queue, None if the platform cannot count them."""
+        try:
+            return self.write_queue.qsize()
+        except NotImplementedError:
+            return None
+
+    def gauge_depths(self) -> None:
+        """Gauges the depths of the write queue, shared buffer, and batch buffer, which grow under backpressure."""
+        depth = self.queue_depth()
+        if depth is not None:
+            self.metrics.gauge("write_queue_depth", depth)
+        if self.shared_buffer is not None:
+            self.metrics.gauge("shared_buffer_samples", len(self.shared_buffer))
+        self.metrics.gauge("buffered_samples", self._buffer_length)
+        if self.backpressure is not None:
+            for name, value in self.backpressure.snapshot().items():
+                self.metrics.gauge(name, value)
+
+    # Writing
+    @property
+    def appends_samples(self) -> bool:
+        """Determines if blocks are appended by the file, which preallocates and compresses them, or by its data."""
+        return self.file.growth is not None or self.file.compressor is not None
+
+    def append_block(self, data: np.ndarray, nanostamps: np.ndarray) -> None:
+        """Appends a block to the file, through its preallocation and compressor when it has them.
+
+        Args:
+            data: The data of the block.
+            nanostamps: The nanostamps of the block.
+        """
+        with self.metrics.time("append"):
+            if not self.appends_samples:
+                self.file.data.append(data, component_kwargs={"timeseries": {"data": nanostamps}})
+            else:
+                self.file.append_samples(data, nanostamps)
+        self.metrics.count("samples", data.shape[0])
+        self.metrics.count("bytes", data.nbytes)
+
+    def flush_file(self) -> None:
+        """Flushes the file, so SWMR readers see the appended samples."""
+        with self.metrics.time("flush"):
+            self.file.flush()
+
+    def close_file(self, file: XLTEKHDF5 | None = None) -> None:
+        """Trims the preallocation of a file and closes it.
+
+        Args:
+            file: The file to close, None for the file being written to.
+        """
+        if file is None:
+            file = self.file
+        if file.growth is not None or file.compressor is not None:
+            file.trim()
+        file.close()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """The thread which opens and closes files in the background."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="xltek-rollover")
+        return self._executor
+
+    def open_file(self, file_kwargs: dict[str, Any], contents: dict[str, Any], n_channels: int) -> XLTEKHDF5:
+        """Creates a file for writing and starts SWMR writing on it.
+
+        Args:
+            file_kwargs: The keyword arguments to create the file with.
+            contents: The contents insert of the file.
+            n_channels: The number of channels of the data.
+
+        Returns:
+            The file which was created.
+        """
+        if self.chunk_planner is not None:
+            if "chunks" not in file_kwargs:
+                file_kwargs["chunks"] = self.chunk_planner.plan_data_chunks(contents["sample_rate"], n_channels)
+            cache_bytes = self.chunk_planner.plan_cache_bytes(contents["sample_rate"], n_channels)
+            file_kwargs.setdefault("rdcc_nbytes", cache_bytes)
+
+        if self.growth is not None:
+            file_kwargs.setdefault("growth", self.growth)
+
+        if self.compress_workers is not None:
+            file_kwargs.setdefault("compress_workers", self.compress_workers)
+
+        try:
+            file = self.file_type(mode="a", create=True, construct=True, **file_kwargs)
+        except OSError:
+            file_kwargs["file"].unlink(missing_ok=True)
+            file = self.file_type(mode="a", create=True, construct=True, **file_kwargs)
+
+        file.time_axis.components["axis"].set_time_zone(contents["timezone"])
+        file.time_axis.components["axis"].sample_rate = contents["sample_rate"]
+        file.attributes["start_id"] = contents["start_id"]
+        if file.growth is not None or file.compressor is not None:
+            file.reserve(0)  # Attributes cannot be created once SWMR writing starts.
+        file.swmr_mode = True
+        return file
+
+    # Rollover
+    def create_entry(
+        self,
+        start: int,
+        info: dict[str, Any],
+        n_channels: int,
+        start_id: int | None = None,
+    ) -> dict[str, Any]:
+        """Makes the file kwargs and contents insert of a file which starts at a time.
+
+        Args:
+            start: The time in nanoseconds where the file starts.
+            info: The contents info of a block, which provides the sample rate, time zone, and update id.
+            n_channels: The number of channels of the data.
+            start_id: The time in nanoseconds of the first sample of the file, None to use the start of the file.
+
+        Returns:
+            The file kwargs and contents insert of the file.
+        """
+        tzinfo = info["timezone"]
+        return self.entry_factory(
+            shape=(0, n_channels),
+            sample_rate=info["sample_rate"],
+            start=Timestamp.fromnanostamp(start, tz=tzinfo),
+            tzinfo=tzinfo,
+            start_id=start if start_id is None else start_id,
+            update_id=info["update_id"],
+        )
+
+    def open_entry(self, entry: dict[str, Any], n_channels: int) -> tuple[XLTEKHDF5, dict[str, Any]]:
+        """Opens the file of an entry, which can be run in the background.
 
-                await sleep(interval)
+        Args:
+            entry: The file kwargs and contents insert of the file.
+            n_channels: The number of channels of the data.
+
+        Returns:
+            The file and its entry.
+        """
+        return self.open_file(entry["file"], entry["contents_insert"], n_channels), entry
+
+    def discard_file(self, future: Future) -> None:
+        """Closes and deletes a file which was opened ahead of time but is not used.
+
+        Args:
+            future: The future of the file and its entry.
+        """
+        file, entry = future.result()
+        file.close()
+        file.set_mode("r")  # Closing reopens a writable file to standardize its attributes, which would recreate it.
+        pathlib.Path(entry["file"]["file"]).unlink(missing_ok=True)
+
+    def discard_next_file(self) -> None:
+        """Discards the file which is being opened ahead of time in the background."""
+        if self._next_file is not None:
+            self._closing.append(self.executor.submit(self.discard_file, self._next_file))
+            self._next_file = None
+            self._next_start = None
+
+    def file_size(self) -> int:
+        """Gets the size in bytes of the file being written to, including its buffered samples."""
+        size = pathlib.Path(self.file_kwargs["file"]).stat().st_size
+        return size + (0 if self._buffer is None else self._buffer_length * self._buffer[0].nbytes)
+
+    async def roll_file(self, start: int, info: dict[str, Any], n_channels: int) -> None:
+        """Ends the file being written to and starts the file which a sample is written to.
+
+        The previous file is closed in the background. When the file which was opened ahead of time starts at the same
+        boundary as the sample, it is used, otherwise a new file is opened and the one opened ahead of time is
+        discarded. Afterwards, the file which starts at the next time boundary is opened in the background unless it
+        already is. A file is named after its boundary, but its start id is the time of its first sample, which the
+        file opened ahead of time only knows once it is used. A file which starts because the previous one reached
+        max_bytes before the boundary is named after and starts at its first sample instead, so it does not reuse the
+        name of the previous file, and the file opened ahead of time is kept for the boundary.
+
+        Args:
+            start: The time in nanoseconds of the first sample of the new file.
+            info: The contents info of the block of the sample.
+            n_channels: The number of channels of the data.
+        """
+        roll_start = time.perf_counter()
+        by_size = self.file is not None and (self._file_boundary is None or start < self._file_boundary)
+        if self.file is not None:
+            await self.flush_buffer()
+            self._closing.append(self.executor.submit(self.close_file, self.file))
+            self.file = None
+            self.metrics.count("rollovers")
+
+        tzinfo = info["timezone"]
+        file_start = self.rollover.file_start(start, tzinfo)
+        if by_size:
+            entry = self.create_entry(start, info, n_channels)
+            self.file = self.open_file(entry["file"], entry["contents_insert"], n_channels)
+        elif self._next_file is not None and self._next_start == file_start:
+            self.file, entry = await wrap_future(self._next_file)
+            self._next_file = None
+            self._next_start = None
+            self.file.attributes.modify("start_id", start)  # The attribute exists, so it can change during SWMR.
+        else:
+            self.discard_next_file()
+            entry = self.create_entry(file_start, info, n_channels, start_id=start)
+            self.file = self.open_file(entry["file"], entry["contents_insert"], n_channels)
+
+        self.file_kwargs = entry["file"]
+        self._file_contents = entry["contents_insert"] | {
+            "start": Timestamp.fromnanostamp(start, tz=tzinfo),
+            "start_id": start,
+        }
+        self._file_boundary = self.rollover.next_boundary(start, tzinfo)
+        self._closing = [future for future in self._closing if not future.done()]
+
+        if self._file_boundary is not None and self._next_start != self._file_boundary:
+            self.discard_next_file()
+            next_entry = self.create_entry(self._file_boundary, info, n_channels)
+            self._next_file = self.executor.submit(self.open_entry, next_entry, n_channels)
+            self._next_start = self._file_boundary
+        self.metrics.record("rollover", time.perf_counter() - roll_start)
+
+    def file_contents(self, nanostamps: np.ndarray, n_channels: int) -> dict[str, Any]:
+        """Creates the contents info of the file after a block is written to it.
+
+        Args:
+            nanostamps: The nanostamps of the block.
+            n_channels: The number of channels of the data.
+
+        Returns:
+            The contents info of the file.
+        """
+        length = self.file.get_length() + self._buffer_length + nanostamps.shape[0]
+        end = int(nanostamps[-1])
+        return self._file_contents | {
+            "shape": (length, n_channels),
+            "end": Timestamp.fromnanostamp(end, tz=self._file_contents["timezone"]),
+            "end_id": end,
+        }
+
+    async def write_rollover(self, data: np.ndarray, nanostamps: np.ndarray, info: dict[str, Any]) -> None:
+        """Writes a block of new samples, splitting it across the files where the rollover policy ends them.
+
+        Args:
+            data: The data of the block.
+            nanostamps: The nanostamps of the block.
+            info: The contents info of the block.
+        """
+        n_channels = data.shape[1]
+        while data.shape[0] > 0:
+            if self.file is None or self.rollover.should_roll(
+                int(nanostamps[0]),
+                self._file_boundary,
+                self.file_size() if self.rollover.max_bytes is not None else 0,
+            ):
+                await self.roll_file(int(nanostamps[0]), info, n_channels)
+
+            n = self.rollover.split_index(nanostamps, self._file_boundary)
+            block, block_nanostamps = data[:n], nanostamps[:n]
+            await self.write_block(block, block_nanostamps, self.file_contents(block_nanostamps, n_channels))
+            data, nanostamps = data[n:], nanostamps[n:]
+
+    def release_shared(self, position: tuple[int, int] | None) -> None:
+        """Releases a block of the shared buffer once it is written or copied.
+
+        Args:
+            position: The position and length of the block in the shared buffer, None if it was not shared.
+        """
+        if position is not None:
+            self.shared_buffer.release(*position)
+
+    def release_queued(self, n_bytes: int) -> None:
+        """Releases the bytes of a queued block from the backpressure budget once it is written or copied.
+
+        Args:
+            n_bytes: The number of bytes of the block, zero if it was not counted by a backpressure policy.
+        """
+        if n_bytes > 0:
+            self.backpressure.release(n_bytes)
+
+    # Buffering
+    def write_buffer(self) -> list[dict[str, Any]]:
+        """Appends the buffered samples to the file and flushes it.
+
+        Returns:
+            The contents info of the blocks which were written.
+        """
+        infos = self._buffer_infos
+        if self._buffer_length > 0:
+            n = self._buffer_length
+            self.append_block(self._buffer[:n], self._buffer_nanostamps[:n])
+            self.flush_file()
+        self._buffer_length = 0
+        self._buffer_infos = []
+        return infos
+
+    async def flush_buffer(self) -> None:
+        """Writes the buffered samples to the file and sends their contents info."""
+        for info in self.write_buffer():
+            await self.contents_info_queue.put_async(info)
+
+    def buffer_fits(self, data: np.ndarray) -> bool:
+        """Checks if a block fits in the remaining space of the buffers.
+
+        Args:
+            data: The data of the block.
+
+        Returns:
+            If the block fits in the buffers.
+        """
+        return (
+            self._buffer is not None
+            and self._buffer.shape[1:] == data.shape[1:]
+            and self._buffer.dtype == data.dtype
+            and self._buffer.shape[0] - self._buffer_length >= data.shape[0]
+        )
+
+    def buffer_block(self, data: np.ndarray, nanostamps: np.ndarray, info: dict[str, Any]) -> None:
+        """Copies a block into the buffers, allocating them for the shape of the data if the buffers are empty.
+
+        Args:
+            data: The data of the block.
+            nanostamps: The nanostamps of the block.
+            info: The contents info of the block.
+        """
+        if not self.buffer_fits(data):
+            if self._buffer_length > 0:
+                raise ValueError("The buffers must be written before they are reallocated.")
+            shape = (max(self.batch_samples, data.shape[0]), *data.shape[1:])
+            self._buffer = np.empty(shape, dtype=data.dtype)
+            self._buffer_nanostamps = np.empty(shape[:1], dtype=nanostamps.dtype)
+
+        if self._buffer_length == 0:
+            self._buffer_start = time.perf_counter()
+        n = self._buffer_length
+        self._buffer[n:n + data.shape[0]] = data
+        self._buffer_nanostamps[n:n + data.shape[0]] = nanostamps
+        self._buffer_length += data.shape[0]
+        self._buffer_infos.append(info)
+
+    async def write_block(self, data: np.ndarray, nanostamps: np.ndarray, info: dict[str, Any]) -> None:
+        """Writes a block of new samples to the file, through the buffers when batching.
+
+        Args:
+            data: The data of the block.
+            nanostamps: The nanostamps of the block.
+            info: The contents info of the file after the block is written.
+        """
+        if self.batch_samples > 0:
+            if self._buffer_length > 0 and not self.buffer_fits(data):
+                await self.flush_buffer()
+            self.buffer_block(data, nanostamps, info)
+            if (
+                self._buffer_length >= self.batch_samples
+                or time.perf_counter() - self._buffer_start >= self.batch_interval
+            ):
+                await self.flush_buffer()
+        else:
+            self.append_block(data, nanostamps)
+            self.flush_file()
+            await self.contents_info_queue.put_async(info)
 
     # Setup
     def setup(self, *args: Any, **kwargs: Any) -> None:
@@ -181,40 +782,64 @@ class XLTEKHDF5WriterTask(TaskBlock):
         """The main method to execute."""
         data, nanostamps, info = await self.write_queue_get()
         if data is None:
+            await self.flush_buffer()
+            self.outputs.events["done"].set()
             return
 
+        self.gauge_depths()
+        position = None
+        queued_bytes = 0
+        if self.shared_buffer is not None:
+            position = data, nanostamps
+            data, nanostamps = self.shared_buffer.get(*position)
+        elif self.backpressure is not None:
+            queued_bytes = data.nbytes + nanostamps.nbytes
+
         file_kwargs = info.pop("file")
 
+        if self.rollover is not None:
+            await self.write_rollover(data, nanostamps, info["contents_insert"])
+            del data, nanostamps
+            self.release_shared(position)
+            self.release_queued(queued_bytes)
+            return
+
         if file_kwargs["file"] != self.file_kwargs["file"]:
             if self.file is not None:
-                self.file.close()
+                await self.flush_buffer()
+                self.close_file()
 
-            try:
-                self.file = self.file_type(mode="a", create=True, construct=True, **file_kwargs)
-            except OSError:
-                file_kwargs["file"].unlink(missing_ok=True)
-                self.file = self.file_type(mode="a", create=True, construct=True, **file_kwargs)
-
-            self.file.time_axis.components["axis"].set_time_zone(info["contents_insert"]["timezone"])
-            self.file.time_axis.components["axis"].sample_rate = info["contents_insert"]["sample_rate"]
-            self.file.attributes["start_id"] = info["contents_insert"]["start_id"]
-            self.file.swmr_mode = True
+            self.file = self.open_file(file_kwargs, info["contents_insert"], data.shape[1])
             self.file_kwargs.update(file_kwargs)
 
-        dataset = self.file.data
-        d_slicing = [slice(None, i) for i in data.shape]
-        d_slicing[0] = slice(dataset.shape[0], data.shape[0])
-        d_slicing = tuple(d_slicing)
-        n_slicing = slice(self.file.time_axis.shape[0], data.shape[0])
-
-        dataset.append(data[d_slicing], component_kwargs={"timeseries": {"data": nanostamps[n_slicing]}})
-        self.file.flush()
+        if self.shared_buffer is None:
+            written = self.file.get_length() + self._buffer_length
+            d_slicing = [slice(None, i) for i in data.shape]
+            d_slicing[0] = slice(written, data.shape[0])
+            block = data[tuple(d_slicing)]
+            block_nanostamps = nanostamps[written:data.shape[0]]
+        else:
+            block, block_nanostamps = data, nanostamps
 
-        del data, nanostamps
-        await self.contents_info_queue.put_async(info["contents_insert"])
+        await self.write_block(block, block_nanostamps, info["contents_insert"])
+        del data, nanostamps, block, block_nanostamps
+        self.release_shared(position)
+        self.release_queued(queued_bytes)
 
     # Teardown
     def teardown(self, *args: Any, **kwargs: Any) -> None:
         """The method to run after executing task."""
         if self.file is not None:
-            self.file.close()
+            for info in self.write_buffer():
+                self.contents_info_queue.put(info)
+            self.close_file()
+            self.file = None
+
+        if self._executor is not None:
+            self.discard_next_file()
+            self._executor.shutdown()
+            self._executor = None
+            self._closing = []
+
+        if self.metrics.log_interval is not None:
+            self.metrics.log()
@@ -0,0 +1,295 @@
+"""xltekbackpressure.py
+Keeps the blocks queued for an XLTEK HDF5 writer within a memory budget.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from collections import deque
+import multiprocessing
+import pathlib
+import pickle
+import tempfile
+from typing import Any
+from typing import Callable
+
+# Third-Party Packages #
+from baseobjects import BaseObject
+import numpy as np
+
+# Local Packages #
+
+
+# Definitions #
+# Classes #
+class XLTEKBackpressurePolicy(BaseObject):
+    """Keeps the blocks queued for a writer within a memory budget by blocking, spilling, or dropping new blocks.
+
+    Producers put blocks through this policy and the writer releases the bytes of each block once it is written, so
+    the policy knows how many bytes are queued across processes. When a block would exceed the budget, the policy
+    either waits for the writer, spills the block to a temporary file on disk, or drops it. Spilled blocks are put on
+    the queue in order as the writer frees space, and every block after a spilled one is spilled until the spill is
+    empty, so the writer still gets the blocks in order. A block is always accepted when nothing is queued, so blocks
+    larger than the budget do not stall.
+
+    The queued bytes and the drop and spill counts are shared between processes, so any process can read them. The
+    high watermark callback is called in the producer with the queued bytes when they rise above the high watermark,
+    and again only after they fall back below it.
+
+    Class Attributes:
+        modes: The names of the backpressure modes.
+        default_max_bytes: The default number of bytes which can be queued.
+        counter_names: The names of the shared counters.
+
+    Attributes:
+        mode: The backpressure mode, which is block, spill, or drop.
+        max_bytes: The number of bytes which can be queued.
+        high_watermark: The number of queued bytes which the callback is called above.
+        on_high_watermark: The function called with the queued bytes when they rise above the high watermark.
+        spill_dir: The directory to spill blocks to, None for the temporary directory.
+        timeout: The longest time in seconds to wait for space in block mode, None to wait indefinitely.
+        _counters: The shared counts of the queued bytes, dropped blocks and samples, and spilled blocks.
+        _condition: The condition which producers wait on until the writer releases bytes.
+        _spill: The paths and sizes of the spilled blocks which are not queued yet.
+        _above: Determines if the queued bytes were above the high watermark when last checked.
+
+    Args:
+        mode: The backpressure mode, which is block, spill, or drop.
+        max_bytes: The number of bytes which can be queued.
+        high_watermark: The number of queued bytes which the callback is called above, None for 80% of max_bytes.
+        on_high_watermark: The function called with the queued bytes when they rise above the high watermark.
+        spill_dir: The directory to spill blocks to, None for the temporary directory.
+        timeout: The longest time in seconds to wait for space in block mode, None to wait indefinitely.
+        init: Determines if this object will construct.
+        **kwargs: Keyword arguments for inheritance.
+    """
+
+    modes: tuple[str, ...] = ("block", "spill", "drop")
+    default_max_bytes: int = int(6e9)
+    counter_names: tuple[str, ...] = ("queued_bytes", "dropped_blocks", "dropped_samples", "spilled_blocks")
+
+    # Magic Methods #
+    # Construction/Destruction
+    def __init__(
+        self,
+        mode: str | None = None,
+        max_bytes: int | None = None,
+        high_watermark: int | None = None,
+        on_high_watermark: Callable[[int], Any] | None = None,
+        spill_dir: pathlib.Path | str | None = None,
+        timeout: float | None = None,
+        *,
+        init: bool = True,
+        **kwargs: Any,
+    ) -> None:
+        # New Attributes #
+        self.mode: str = "block"
+        self.max_bytes: int = self.default_max_bytes
+        self.high_watermark: int | None = None
+        self.on_high_watermark: Callable[[int], Any] | None = None
+        self.spill_dir: pathlib.Path | None = None
+        self.timeout: float | None = None
+
+        self._counters: Any = multiprocessing.Array("q", len(self.counter_names), lock=False)
+        self._condition: Any = multiprocessing.Condition()
+        self._spill: deque[tuple[pathlib.Path, int]] = deque()
+        self._above: bool = False
+
+        # Parent Attributes #
+        super().__init__(init=False, **kwargs)
+
+        # Object Construction #
+        if init:
+            self.construct(
+                mode=mode,
+                max_bytes=max_bytes,
+                high_watermark=high_watermark,
+                on_high_watermark=on_high_watermark,
+                spill_dir=spill_dir,
+                timeout=timeout,
+                **kwargs,
+            )
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Creates the state of this object without the callback, which only the producer calls."""
+        state = self.__dict__.copy()
+        state["on_high_watermark"] = None
+        return state
+
+    # Instance Methods #
+    # Constructors/Destructors
+    def construct(
+        self,
+        mode: str | None = None,
+        max_bytes: int | None = None,
+        high_watermark: int | None = None,
+        on_high_watermark: Callable[[int], Any] | None = None,
+        spill_dir: pathlib.Path | str | None = None,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Constructs this object.
+
+        Args:
+            mode: The backpressure mode, which is block, spill, or drop.
+            max_bytes: The number of bytes which can be queued.
+            high_watermark: The number of queued bytes which the callback is called above, None for 80% of max_bytes.
+            on_high_watermark: The function called with the queued bytes when they rise above the high watermark.
+            spill_dir: The directory to spill blocks to, None for the temporary directory.
+            timeout: The longest time in seconds to wait for space in block mode, None to wait indefinitely.
+            **kwargs: Keyword arguments for inheritance.
+        """
+        if mode is not None:
+            if mode not in self.modes:
+                raise ValueError(f"{mode} is not a backpressure mode, choose from {self.modes}.")
+            self.mode = mode
+
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+
+        if high_watermark is not None:
+            self.high_watermark = high_watermark
+
+        if on_high_watermark is not None:
+            self.on_high_watermark = on_high_watermark
+
+        if spill_dir is not None:
+            self.spill_dir = pathlib.Path(spill_dir)
+
+        if timeout is not None:
+            self.timeout = timeout
+
+        super().construct(**kwargs)
+
+    # Accounting
+    @property
+    def queued_bytes(self) -> int:
+        """The number of bytes which are queued and not released by the writer."""
+        return self._counters[0]
+
+    @property
+    def pending_spills(self) -> int:
+        """The number of blocks which are spilled to disk and not queued yet."""
+        return len(self._spill)
+
+    def snapshot(self) -> dict[str, int]:
+        """Gets the shared counts of the queued bytes, dropped blocks and samples, and spilled blocks.
+
+        Returns:
+            The counts by name.
+        """
+        return dict(zip(self.counter_names, self._counters[:]))
+
+    def has_space(self, n_bytes: int) -> bool:
+        """Checks if a number of bytes fits in the budget, which is always true when nothing is queued.
+
+        Args:
+            n_bytes: The number of bytes to fit.
+
+        Returns:
+            If the bytes fit.
+        """
+        queued = self._counters[0]
+        return queued == 0 or queued + n_bytes <= self.max_bytes
+
+    def check_watermark(self) -> None:
+        """Calls the high watermark callback if the queued bytes rose above the high watermark."""
+        watermark = int(self.max_bytes * 0.8) if self.high_watermark is None else self.high_watermark
+        queued = self._counters[0]
+        above = queued > watermark
+        if above and not self._above and self.on_high_watermark is not None:
+            self.on_high_watermark(queued)
+        self._above = above
+
+    # Queueing
+    def put(self, queue: Any, data: np.ndarray, nanostamps: np.ndarray, info: dict[str, Any]) -> bool:
+        """Puts a block on the write queue, applying the backpressure mode if it does not fit in the budget.
+
+        Args:
+            queue: The write queue of the writer.
+            data: The data of the block.
+            nanostamps: The nanostamps of the block.
+            info: The contents info of the block.
+
+        Returns:
+            If the block was queued or spilled, False if it was dropped.
+        """
+        self.drain(queue)
+        n_bytes = data.nbytes + nanostamps.nbytes
+        if self._spill:
+            self.spill(data, nanostamps, info)
+            return True
+
+        with self._condition:
+            if not self.has_space(n_bytes):
+                if self.mode == "drop":
+                    self._counters[1] += 1
+                    self._counters[2] += data.shape[0]
+                    return False
+                elif self.mode == "spill":
+                    self.spill(data, nanostamps, info)
+                    return True
+                elif not self._condition.wait_for(lambda: self.has_space(n_bytes), self.timeout):
+                    raise TimeoutError("The write queue did not have space for the block before the timeout.")
+            self._counters[0] += n_bytes
+
+        queue.put((data, nanostamps, info))
+        self.check_watermark()
+        return True
+
+    def release(self, n_bytes: int) -> None:
+        """Releases the bytes of a block which the writer has written, waking producers which wait for space.
+
+        Args:
+            n_bytes: The number of bytes of the block.
+        """
+        with self._condition:
+            self._counters[0] -= n_bytes
+            self._condition.notify_all()
+
+    # Spilling
+    def spill(self, data: np.ndarray, nanostamps: np.ndarray, info: dict[str, Any]) -> None:
+        """Writes a block to a temporary file on disk to be queued later.
+
+        Args:
+            data: The data of the block.
+            nanostamps: The nanostamps of the block.
+            info: The contents info of the block.
+        """
+        with tempfile.NamedTemporaryFile(dir=self.spill_dir, prefix="xltek-", suffix=".spill", delete=False) as file:
+            pickle.dump((data, nanostamps, info), file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._spill.append((pathlib.Path(file.name), data.nbytes + nanostamps.nbytes))
+        self._counters[3] += 1
+
+    def drain(self, queue: Any, wait: bool = False) -> None:
+        """Puts the spilled blocks on the write queue in order while they fit in the budget.
+
+        Args:
+            queue: The write queue of the writer.
+            wait: Determines if this waits for space until every spilled block is queued.
+        """
+        while self._spill:
+            path, n_bytes = self._spill[0]
+            with self._condition:
+                if not self.has_space(n_bytes):
+                    if not wait:
+                        return
+                    self._condition.wait_for(lambda: self.has_space(n_bytes), self.timeout)
+                    if not self.has_space(n_bytes):
+                        raise TimeoutError("The write queue did not have space for the spill before the timeout.")
+                self._counters[0] += n_bytes
+
+            with path.open("rb") as file:
+                block = pickle.load(file)
+            queue.put(block)
+            path.unlink()
+            self._spill.popleft()
+            self.check_watermark()
@@ -0,0 +1,172 @@
+"""xltekchunkcompressor.py
+Compresses the chunks of XLTEK HDF5 data in parallel and writes them directly to the file.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from concurrent.futures import ThreadPoolExecutor
+import os
+from typing import Any
+import zlib
+
+# Third-Party Packages #
+from baseobjects import BaseObject
+import h5py
+import numpy as np
+
+# Local Packages #
+
+
+# Definitions #
+# Classes #
+class XLTEKChunkCompressor(BaseObject):
+    """Compresses the chunks of a dataset in a thread pool and writes them with direct chunk writes.
+
+    HDF5 compresses chunks one at a time in the thread which writes them, so with slow filters like gzip-9, writing is
+    bound by a single core. This compressor applies the same shuffle and deflate filters as HDF5 in a thread pool,
+    where zlib releases the GIL, and writes the compressed chunks as they are, so the file is identical to one
+    written through the filters. Chunks which are only partly written are read back and rewritten whole when the rest
+    of their samples are written. Datasets with other filters are written normally.
+
+    Class Attributes:
+        default_workers: The default number of threads which compress chunks.
+
+    Attributes:
+        workers: The number of threads which compress chunks.
+        _executor: The thread pool which compresses chunks, created when first needed.
+
+    Args:
+        workers: The number of threads which compress chunks.
+        init: Determines if this object will construct.
+        **kwargs: Keyword arguments for inheritance.
+    """
+
+    default_workers: int = os.cpu_count() or 1
+
+    # Magic Methods #
+    # Construction/Destruction
+    def __init__(self, workers: int | None = None, *, init: bool = True, **kwargs: Any) -> None:
+        # New Attributes #
+        self.workers: int = self.default_workers
+
+        self._executor: ThreadPoolExecutor | None = None
+
+        # Parent Attributes #
+        super().__init__(init=False, **kwargs)
+
+        # Object Construction #
+        if init:
+            self.construct(workers=workers, **kwargs)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Creates the state of this object without its thread pool."""
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
+
+    # Instance Methods #
+    # Constructors/Destructors
+    def construct(self, workers: int | None = None, **kwargs: Any) -> None:
+        """Constructs this object.
+
+        Args:
+            workers: The number of threads which compress chunks.
+            **kwargs: Keyword arguments for inheritance.
+        """
+        if workers is not None:
+            if workers < 1:
+                raise ValueError("The chunk compressor must have at least one worker.")
+            self.workers = workers
+
+        super().construct(**kwargs)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """The thread pool which compresses chunks."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="xltek-compress")
+        return self._executor
+
+    def close(self) -> None:
+        """Shuts down the thread pool."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    # Compression
+    @staticmethod
+    def supports(dataset: h5py.Dataset) -> bool:
+        """Checks if the chunks of a dataset can be compressed by this object.
+
+        Args:
+            dataset: The dataset to check.
+
+        Returns:
+            If the dataset is chunked and only has the shuffle and deflate filters.
+        """
+        return (
+            dataset.chunks is not None
+            and dataset.compression == "gzip"
+            and not dataset.fletcher32
+            and dataset.scaleoffset is None
+        )
+
+    @staticmethod
+    def compress_chunk(chunk: np.ndarray, level: int, shuffle: bool) -> bytes:
+        """Compresses a chunk the same way as the HDF5 shuffle and deflate filters.
+
+        Args:
+            chunk: The chunk to compress, in the dtype of the dataset.
+            level: The deflate level.
+            shuffle: Determines if the bytes of the elements are shuffled before compression.
+
+        Returns:
+            The compressed chunk.
+        """
+        if shuffle and chunk.itemsize > 1:
+            chunk = chunk.reshape(-1).view(np.uint8).reshape(-1, chunk.itemsize).T
+        return zlib.compress(np.ascontiguousarray(chunk).tobytes(), level)
+
+    def write(self, dataset: h5py.Dataset, data: np.ndarray, start: int) -> None:
+        """Writes samples into a dataset along its first axis, which must already be sized to fit them.
+
+        Args:
+            dataset: The dataset to write to.
+            data: The samples to write.
+            start: The index of the first sample to write.
+        """
+        if not self.supports(dataset):
+            dataset[start:start + data.shape[0]] = data
+            return
+
+        rows, columns = dataset.chunks
+        first = start - start % rows
+        data = np.asarray(data, dtype=dataset.dtype)
+        if first < start:
+            data = np.concatenate((dataset[first:start], data))
+        n_samples, n_channels = data.shape
+        level = dataset.compression_opts
+        shuffle = dataset.shuffle
+
+        futures = []
+        for row in range(0, n_samples, rows):
+            for column in range(0, n_channels, columns):
+                chunk = data[row:row + rows, column:column + columns]
+                if chunk.shape != (rows, columns):
+                    padded = np.zeros((rows, columns), dtype=dataset.dtype)
+                    padded[:chunk.shape[0], :chunk.shape[1]] = chunk
+                    chunk = padded
+                future = self.executor.submit(self.compress_chunk, chunk, level, shuffle)
+                futures.append(((first + row, column), future))
+
+        for offset, future in futures:
+            dataset.id.write_direct_chunk(offset, future.result())
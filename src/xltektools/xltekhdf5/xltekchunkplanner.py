@@ -0,0 +1,351 @@
+"""xltekchunkplanner.py
+Plans time aligned chunk layouts for the datasets of XLTEK HDF5 files.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import math
+import pathlib
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects import BaseObject
+import h5py
+import numpy as np
+
+# Local Packages #
+
+
+# Definitions #
+# Constants #
+SCALE_ATTRIBUTES: set[str] = {"DIMENSION_LIST", "REFERENCE_LIST", "CLASS", "NAME"}
+H5PY_CACHE_BYTES: int = 2**20
+
+
+# Classes #
+class XLTEKChunkPlanner(BaseObject):
+    """Plans chunk shapes for XLTEK data so time windows decompress whole, time aligned chunks.
+
+    A data chunk spans a fixed duration of samples and either all channels or a block of channels. When no channel
+    block is given, channels are split into evenly sized blocks which keep each chunk under the maximum chunk size.
+    The time axis is chunked with the same number of samples as the data.
+
+    A file written with planned chunks needs a chunk cache which holds a whole row of chunks, the chunks of every
+    channel over one time span, otherwise each write decompresses and recompresses whole chunks. The duration of the
+    chunks is capped so a row fits in the maximum cache size, and plan_cache_bytes gives the cache size to open the
+    file with. Every flush still compresses the whole row being written, so planned chunks suit files which are
+    written a chunk row or more at a time, or rechunked after they are written, rather than written and flushed in
+    small packets.
+
+    Class Attributes:
+        default_seconds: The default duration of data each chunk spans.
+        default_max_chunk_bytes: The default maximum size of a data chunk.
+        default_max_cache_bytes: The default maximum size of the chunk cache of a dataset.
+        default_copy_bytes: The default size of the blocks copied when rechunking a file.
+        cache_headroom: The factor of a chunk row which the chunk cache is sized to.
+
+    Attributes:
+        seconds: The duration of data each chunk spans.
+        channel_block: The number of channels each chunk spans, None to plan blocks from the maximum chunk size.
+        max_chunk_bytes: The maximum size of a data chunk.
+        max_cache_bytes: The maximum size of the chunk cache of a dataset, which a row of chunks must fit in.
+        copy_bytes: The size of the blocks copied when rechunking a file.
+
+    Args:
+        seconds: The duration of data each chunk spans.
+        channel_block: The number of channels each chunk spans, None to plan blocks from the maximum chunk size.
+        max_chunk_bytes: The maximum size of a data chunk.
+        max_cache_bytes: The maximum size of the chunk cache of a dataset, which a row of chunks must fit in.
+        init: Determines if this object will construct.
+        **kwargs: Keyword arguments for inheritance.
+    """
+
+    default_seconds: float = 10.0
+    default_max_chunk_bytes: int = 4 * 2**20
+    default_max_cache_bytes: int = 64 * 2**20
+    default_copy_bytes: int = 256 * 2**20
+    cache_headroom: float = 1.25
+
+    # Magic Methods #
+    # Construction/Destruction
+    def __init__(
+        self,
+        seconds: float | None = None,
+        channel_block: int | None = None,
+        max_chunk_bytes: int | None = None,
+        max_cache_bytes: int | None = None,
+        *,
+        init: bool = True,
+        **kwargs: Any,
+    ) -> None:
+        # New Attributes #
+        self.seconds: float = self.default_seconds
+        self.channel_block: int | None = None
+        self.max_chunk_bytes: int = self.default_max_chunk_bytes
+        self.max_cache_bytes: int = self.default_max_cache_bytes
+        self.copy_bytes: int = self.default_copy_bytes
+
+        # Parent Attributes #
+        super().__init__(init=False, **kwargs)
+
+        # Object Construction #
+        if init:
+            self.construct(
+                seconds=seconds,
+                channel_block=channel_block,
+                max_chunk_bytes=max_chunk_bytes,
+                max_cache_bytes=max_cache_bytes,
+                **kwargs,
+            )
+
+    # Instance Methods #
+    # Constructors/Destructors
+    def construct(
+        self,
+        seconds: float | None = None,
+        channel_block: int | None = None,
+        max_chunk_bytes: int | None = None,
+        max_cache_bytes: int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Constructs this object.
+
+        Args:
+            seconds: The duration of data each chunk spans.
+            channel_block: The number of channels each chunk spans, None to plan blocks from the maximum chunk size.
+            max_chunk_bytes: The maximum size of a data chunk.
+            max_cache_bytes: The maximum size of the chunk cache of a dataset, which a row of chunks must fit in.
+            **kwargs: Keyword arguments for inheritance.
+        """
+        if seconds is not None:
+            self.seconds = seconds
+
+        if channel_block is not None:
+            self.channel_block = channel_block
+
+        if max_chunk_bytes is not None:
+            self.max_chunk_bytes = max_chunk_bytes
+
+        if max_cache_bytes is not None:
+            self.max_cache_bytes = max_cache_bytes
+
+        super().construct(**kwargs)
+
+    # Planning
+    def plan_time_chunks(
+        self,
+        sample_rate: float | int,
+        itemsize: int = 4,
+        n_channels: int | None = None,
+    ) -> tuple[int]:
+        """Plans the chunk shape of the time axis, short enough that a row of data chunks fits in the chunk cache.
+
+        Args:
+            sample_rate: The sample rate of the data.
+            itemsize: The size in bytes of one data sample of one channel.
+            n_channels: The number of channels in the data, None if not known yet.
+
+        Returns:
+            The chunk shape of the time axis.
+        """
+        n_samples = min(max(1, round(self.seconds * float(sample_rate))), max(1, self.max_chunk_bytes // itemsize))
+        if n_channels is not None and n_channels > 0:
+            row_samples = int(self.max_cache_bytes / self.cache_headroom) // (n_channels * itemsize)
+            n_samples = min(n_samples, max(1, row_samples))
+        return (n_samples,)
+
+    def plan_data_chunks(
+        self,
+        sample_rate: float | int,
+        n_channels: int | None = None,
+        itemsize: int = 4,
+    ) -> tuple[int, int]:
+        """Plans the chunk shape of the data.
+
+        Args:
+            sample_rate: The sample rate of the data.
+            n_channels: The number of channels in the data, None if not known yet.
+            itemsize: The size in bytes of one data sample of one channel.
+
+        Returns:
+            The chunk shape of the data.
+        """
+        n_samples = self.plan_time_chunks(sample_rate=sample_rate, itemsize=itemsize, n_channels=n_channels)[0]
+        if self.channel_block is not None:
+            block = self.channel_block
+        else:
+            block = max(1, self.max_chunk_bytes // (n_samples * itemsize))
+            if n_channels is not None:
+                # Even out the blocks, so the last block is not a small remainder.
+                block = math.ceil(n_channels / math.ceil(n_channels / block))
+
+        if n_channels is not None and n_channels > 0:
+            block = min(block, n_channels)
+
+        return n_samples, block
+
+    def plan(
+        self,
+        sample_rate: float | int,
+        n_channels: int | None = None,
+        itemsize: int = 4,
+    ) -> dict[str, tuple[int, ...]]:
+        """Plans the chunk shapes of the data and the time axis.
+
+        Args:
+            sample_rate: The sample rate of the data.
+            n_channels: The number of channels in the data, None if not known yet.
+            itemsize: The size in bytes of one data sample of one channel.
+
+        Returns:
+            The chunk shapes of the data and the time axis.
+        """
+        data_chunks = self.plan_data_chunks(sample_rate=sample_rate, n_channels=n_channels, itemsize=itemsize)
+        return {"data": data_chunks, "time_axis": data_chunks[:1]}
+
+    def plan_cache_bytes(self, sample_rate: float | int, n_channels: int, itemsize: int = 4) -> int:
+        """Plans the size of the chunk cache to open a file with, which holds a row of the planned data chunks.
+
+        Args:
+            sample_rate: The sample rate of the data.
+            n_channels: The number of channels in the data.
+            itemsize: The size in bytes of one data sample of one channel.
+
+        Returns:
+            The size of the chunk cache in bytes, at least the h5py default.
+        """
+        n_samples = self.plan_time_chunks(sample_rate=sample_rate, itemsize=itemsize, n_channels=n_channels)[0]
+        return max(H5PY_CACHE_BYTES, math.ceil(n_samples * max(1, n_channels) * itemsize * self.cache_headroom))
+
+    # Rechunking
+    def _copy_rechunked(
+        self,
+        source: h5py.Dataset,
+        destination: h5py.Group,
+        chunks: tuple[int, ...],
+    ) -> h5py.Dataset:
+        """Copies a dataset into a new dataset with a different chunk shape, keeping its type and filters.
+
+        Args:
+            source: The dataset to copy.
+            destination: The group to create the new dataset in.
+            chunks: The chunk shape of the new dataset.
+
+        Returns:
+            The new dataset.
+        """
+        chunks = tuple(c if m is None else max(1, min(c, m)) for c, m in zip(chunks, source.maxshape))
+        maxshape = tuple(h5py.h5s.UNLIMITED if m is None else m for m in source.maxshape)
+
+        dcpl = source.id.get_create_plist()
+        dcpl.set_chunk(chunks)
+        space = h5py.h5s.create_simple(source.shape, maxshape)
+        dataset_id = h5py.h5d.create(destination.id, source.name.encode(), source.id.get_type(), space, dcpl=dcpl)
+        dataset = h5py.Dataset(dataset_id)
+
+        row_bytes = max(1, source.dtype.itemsize * math.prod(source.shape[1:]))
+        step = max(chunks[0], (self.copy_bytes // row_bytes) // chunks[0] * chunks[0])
+        for start in range(0, source.shape[0], step):
+            dataset[start:start + step] = source[start:start + step]
+
+        return dataset
+
+    def rechunk(
+        self,
+        path: pathlib.Path | str,
+        sample_rate: float | int | None = None,
+        sample_rate_name: str = "sample_rate",
+    ) -> None:
+        """Rewrites an existing XLTEK HDF5 file with the planned chunk layout.
+
+        Every dataset with dimension scales is treated as data and the scales on its first dimension as its time
+        axes. All other objects, attributes, filters, and scale attachments are copied as they are. The file is
+        written with the same library version bounds to a temporary file which then replaces the original, and the
+        temporary file is removed if rechunking fails.
+
+        Args:
+            path: The path to the file to rechunk.
+            sample_rate: The sample rate of the data, read from the time axis attributes if None.
+            sample_rate_name: The name of the time axis attribute which contains the sample rate.
+        """
+        path = pathlib.Path(path)
+        temp_path = path.with_name(f".{path.name}.rechunk")
+
+        try:
+            self._rechunk_file(path, temp_path, sample_rate=sample_rate, sample_rate_name=sample_rate_name)
+            temp_path.replace(path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+    def _rechunk_file(
+        self,
+        path: pathlib.Path,
+        temp_path: pathlib.Path,
+        sample_rate: float | int | None = None,
+        sample_rate_name: str = "sample_rate",
+    ) -> None:
+        """Writes a copy of an XLTEK HDF5 file with the planned chunk layout.
+
+        Args:
+            path: The path to the file to rechunk.
+            temp_path: The path to write the copy to.
+            sample_rate: The sample rate of the data, read from the time axis attributes if None.
+            sample_rate_name: The name of the time axis attribute which contains the sample rate.
+        """
+        with h5py.File(path, "r") as source, h5py.File(temp_path, "w", libver=source.libver) as destination:
+            # Find the data and their time axes
+            members = {}
+            source.visititems(lambda name, obj: members.__setitem__(name, obj))
+            datasets = [o for o in members.values() if isinstance(o, h5py.Dataset) and "DIMENSION_LIST" in o.attrs]
+            time_axes = {d.name: [s.name for s in d.dims[0].values()] for d in datasets}
+
+            # Plan the chunks
+            chunks = {}
+            for dataset in datasets:
+                rate = sample_rate
+                for obj in (dataset, *(source[name] for name in time_axes[dataset.name])):
+                    if rate is None:
+                        rate = obj.attrs.get(sample_rate_name, None)
+                if rate is None:
+                    raise ValueError(f"The sample rate of {dataset.name} could not be found in {path}.")
+
+                n_channels = dataset.shape[1] if dataset.ndim > 1 else None
+                plan = self.plan(sample_rate=rate, n_channels=n_channels, itemsize=dataset.dtype.itemsize)
+                chunks[dataset.name] = plan["data"] + (1,) * (dataset.ndim - 2)
+                for name in time_axes[dataset.name]:
+                    axis = source[name]
+                    chunks[name] = plan["time_axis"] + tuple(max(1, s) for s in axis.shape[1:])
+
+            # Copy the objects
+            for name, obj in members.items():
+                if isinstance(obj, h5py.Group):
+                    destination.require_group(name)
+                elif obj.name in chunks:
+                    self._copy_rechunked(source=obj, destination=destination, chunks=chunks[obj.name])
+                else:
+                    source.copy(obj, destination, name=name, without_attrs=True)
+
+            # Copy the attributes
+            for name, obj in (("/", source), *members.items()):
+                new_attributes = destination[name].attrs
+                for key, value in obj.attrs.items():
+                    if key not in SCALE_ATTRIBUTES:
+                        new_attributes[key] = value
+
+            # Restore the dimension scales
+            for name, obj in members.items():
+                if isinstance(obj, h5py.Dataset) and obj.attrs.get("CLASS", None) == b"DIMENSION_SCALE":
+                    destination[name].make_scale(np.bytes_(obj.attrs.get("NAME", b"")).decode())
+            for dataset in datasets:
+                for i, dim in enumerate(dataset.dims):
+                    for scale in dim.values():
+                        destination[dataset.name].dims[i].attach_scale(destination[scale.name])
@@ -13,29 +13,141 @@ __email__ = __email__
 
 # Imports #
 # Standard Libraries #
+import datetime
+import math
 import pathlib
 from typing import Any
+from typing import ClassVar
+from typing import NamedTuple
 from typing import Union
+import zoneinfo
 
 # Third-Party Packages #
 from baseobjects.functions import singlekwargdispatch
 from classversioning import VersionType, Version, TriNumberVersion
+from dspobjects.time import Timestamp, nanostamp
 import h5py
 from hdf5objects.dataset import ElectricalSeriesMap, TimeAxisMap, LabelAxisMap, CoordinateAxisMap
 from hdf5objects.fileobjects import HDF5EEGMap, HDF5EEG
 from hdf5objects.hdf5bases import HDF5File, HDF5Map
+import numpy as np
+
+try:
+    import hdf5plugin
+except ImportError:
+    hdf5plugin = None
 
 # Local Packages #
+from .xltekchunkcompressor import XLTEKChunkCompressor
 
 
 # Definitions #
+# Constants #
+COMPRESSION_KEYS: tuple[str, ...] = ("compression", "compression_opts", "shuffle")
+
+COMPRESSION_PROFILES: dict[str, dict[str, Any]] = {
+    "none": {},
+    "lzf": {"compression": "lzf"},
+    **{f"gzip-{level}": {"compression": "gzip", "compression_opts": level} for level in range(1, 10)},
+    "shuffle-gzip": {"shuffle": True, "compression": "gzip", "compression_opts": 4},
+    "shuffle-lzf": {"shuffle": True, "compression": "lzf"},
+}
+
+# Filters that are only available when the HDF5 plugins are installed.
+if hdf5plugin is not None:
+    COMPRESSION_PROFILES |= {
+        "blosc-lz4": dict(hdf5plugin.Blosc(cname="lz4", clevel=5, shuffle=hdf5plugin.Blosc.SHUFFLE)),
+        "blosc-zstd": dict(hdf5plugin.Blosc(cname="zstd", clevel=5, shuffle=hdf5plugin.Blosc.SHUFFLE)),
+        "zstd": dict(hdf5plugin.Zstd(clevel=3)),
+    }
+
+
+# Functions #
+def _attribute_value(attributes: h5py.AttributeManager, name: str) -> Any:
+    """Gets the value of an HDF5 attribute, None if it does not exist or is empty."""
+    value = attributes.get(name, None)
+    return None if isinstance(value, h5py.Empty) else value
+
+
+def _read_time_zone(attributes: h5py.AttributeManager) -> datetime.tzinfo | None:
+    """Reads the time zone from the attributes of a time axis."""
+    tz_name = _attribute_value(attributes, "time_zone")
+    tz_offset = _attribute_value(attributes, "time_zone_offset")
+    if tz_name:
+        try:
+            return zoneinfo.ZoneInfo(tz_name)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            pass
+    return None if tz_offset is None else datetime.timezone(datetime.timedelta(seconds=float(tz_offset)))
+
+
 # Classes #
+class XLTEKHDF5Header(NamedTuple):
+    """The metadata of an XLTEK HDF5 file, read without constructing the file object.
+
+    Attributes:
+        path: The path to the file.
+        version: The version of the file.
+        start_id: The start ID of the file.
+        end_id: The end ID of the file.
+        start: The start datetime of the data.
+        end: The end datetime of the data.
+        sample_rate: The sample rate of the data.
+        shape: The shape of the data.
+        axis: The time axis of the data.
+        timezone: The time zone of the data.
+    """
+
+    path: pathlib.Path | None
+    version: Version
+    start_id: int | None
+    end_id: int | None
+    start: Timestamp | None
+    end: Timestamp | None
+    sample_rate: float | None
+    shape: tuple[int, ...]
+    axis: int
+    timezone: datetime.tzinfo | None
+
+    def as_entry(self, root: pathlib.Path | None = None) -> dict[str, Any]:
+        """Creates a contents entry from this header.
+
+        Files without a time zone are entered in UTC, which is the time zone their start and end are read in. Files
+        without samples have no start or end, so they are entered with their IDs as their start and end.
+
+        Args:
+            root: The root path to make the path of the entry relative to.
+
+        Returns:
+            The contents entry of the file.
+        """
+        tz = datetime.timezone.utc if self.timezone is None else self.timezone
+        start = self.start
+        if start is None and self.start_id is not None:
+            start = Timestamp.fromnanostamp(self.start_id, tz=tz)
+        end = self.end
+        if end is None and self.end_id is not None:
+            end = Timestamp.fromnanostamp(self.end_id, tz=tz)
+        return {
+            "path": self.path if root is None else self.path.relative_to(root),
+            "shape": self.shape,
+            "axis": self.axis,
+            "start": start,
+            "end": end,
+            "sample_rate": self.sample_rate,
+            "timezone": tz,
+            "start_id": self.start_id,
+            "end_id": self.end_id,
+        }
+
+
 class XLTEKHDF5Map(HDF5EEGMap):
     """A map for XLTEKHDF5 files."""
-    _compression_kwargs = {"compression": "gzip", "compression_opts": 9}
+    _compression_kwargs = COMPRESSION_PROFILES["gzip-9"]
     default_attribute_names = HDF5EEGMap.default_attribute_names | {
         "start_id": "start_id",
         "end_id": "end_id",
+        "compression": "compression",
     }
     default_attributes = HDF5EEGMap.default_attributes | {"age": "", "sex": "U", "species": "Homo Sapien"}
     default_map_names = {"data": "ECoG"}
@@ -62,6 +174,19 @@ class XLTEKHDF5(HDF5EEG):
         FILE_TYPE: The file type name of this class.
         VERSION: The version of this class.
         default_map: The HDF5 map of this object.
+        compression_profiles: The named dataset compression settings which files can be created with.
+        default_compression: The name of the compression profile used when none is given.
+        growth_modes: The ways the data can be preallocated when samples are appended.
+        length_name: The name of the data attribute which holds the number of written samples.
+        default_growth_factor: The default factor which geometric growth multiplies the capacity by.
+
+    Attributes:
+        _compression: The name of the compression profile used to create the datasets.
+        growth: How the data is preallocated when samples are appended, None resizes to fit every append.
+        growth_factor: The factor which geometric growth multiplies the capacity by.
+        growth_increment: The number of samples fixed growth adds, the chunk length of the data if None.
+        compressor: The compressor which compresses the chunks of appended samples in parallel, None to let HDF5.
+        _length: The number of written samples in the length attribute, trimmed to on close, None if it is unset.
     """
 
     _registration: bool = True
@@ -69,6 +194,29 @@ class XLTEKHDF5(HDF5EEG):
     VERSION: Version = TriNumberVersion(0, 0, 0)
     FILE_TYPE: str = "XLTEK_EEG"
     default_map: HDF5Map = XLTEKHDF5Map()
+    compression_profiles: ClassVar[dict[str, dict[str, Any]]] = COMPRESSION_PROFILES
+    default_compression: str = "gzip-9"
+    growth_modes: ClassVar[tuple[str, ...]] = ("geometric", "fixed")
+    length_name: str = "length"
+    default_growth_factor: float = 1.5
+
+    # Class Methods #
+    # Compression
+    @classmethod
+    def get_compression_kwargs(cls, profile: str) -> dict[str, Any]:
+        """Gets the dataset creation keyword arguments of a compression profile.
+
+        Args:
+            profile: The name of the compression profile.
+
+        Returns:
+            The keyword arguments which apply the compression to a dataset.
+        """
+        if profile not in cls.compression_profiles:
+            raise ValueError(
+                f"{profile} is not an available compression profile, choose from {tuple(cls.compression_profiles)}."
+            )
+        return cls.compression_profiles[profile].copy()
 
     # File Validation
     @classmethod
@@ -95,15 +243,10 @@ class XLTEKHDF5(HDF5EEG):
         Returns:
             If this is a valid file type.
         """
-        t_name = cls.default_map.attribute_names["file_type"]
-
         if file.is_file():
             try:
-                with h5py.File(file) as obj:
-                    if t_name in obj.attrs:
-                        return cls.FILE_TYPE == obj.attrs[t_name]
-                    else:
-                        return cls.get_version_class(TriNumberVersion(0, 1, 0)).validate_file_type(obj)
+                with h5py.File(file, mode="r") as obj:
+                    return cls.validate_file_type(obj)
             except OSError:
                 return False
         else:
@@ -120,21 +263,7 @@ class XLTEKHDF5(HDF5EEG):
         Returns:
             If this is a valid file type.
         """
-        t_name = cls.default_map.attribute_names.get["file_type"]
-
-        file = pathlib.Path(file)
-
-        if file.is_file():
-            try:
-                with h5py.File(file) as obj:
-                    if t_name in obj.attrs:
-                        return cls.FILE_TYPE == obj.attrs[t_name]
-                    else:
-                        return cls.get_version_class(TriNumberVersion(0, 1, 0)).validate_file_type(obj)
-            except OSError:
-                return False
-        else:
-            return False
+        return cls.validate_file_type(pathlib.Path(file))
 
     @classmethod
     @validate_file_type.__wrapped__.register
@@ -187,7 +316,7 @@ class XLTEKHDF5(HDF5EEG):
     @classmethod
     @new_validated.__wrapped__.register
     def _new_validated(cls, file: pathlib.Path, **kwargs: Any) -> Any:
-        """Checks if the given path is a valid type and returns the file if valid.
+        """Checks if the given path is a valid type and returns the file if valid, closing the file if it is not.
 
         Args:
             file: The path.
@@ -195,20 +324,23 @@ class XLTEKHDF5(HDF5EEG):
         Returns:
             The file or None.
         """
-        t_name = cls.default_map.attribute_names["file_type"]
+        if not file.is_file():
+            return None
 
-        if file.is_file():
-            try:
-                file = h5py.File(file)
-                if t_name in file.attrs and cls.FILE_TYPE == file.attrs[t_name]:
-                    return cls(file=file, **kwargs)
-                else:
-                    return cls.get_version_class(TriNumberVersion(0, 1, 0)).new_validated(file)
-            except OSError:
-                return None
-        else:
+        try:
+            h5_file = h5py.File(file)
+        except OSError:
             return None
 
+        try:
+            new_file = cls.new_validated(h5_file, **kwargs)
+        except BaseException:
+            h5_file.close()
+            raise
+        if new_file is None:
+            h5_file.close()
+        return new_file
+
     @classmethod
     @new_validated.__wrapped__.register
     def _new_validated(cls, file: str, **kwargs: Any) -> Any:
@@ -220,20 +352,7 @@ class XLTEKHDF5(HDF5EEG):
         Returns:
             The file or None.
         """
-        t_name = cls.default_map.attribute_names["file_type"]
-        file = pathlib.Path(file)
-
-        if file.is_file():
-            try:
-                file = h5py.File(file)
-                if t_name in file.attrs and cls.FILE_TYPE == file.attrs[t_name]:
-                    return cls(file=file, **kwargs)
-                else:
-                    return cls.get_version_class(TriNumberVersion(0, 1, 0)).new_validated(file)
-            except OSError:
-                return None
-        else:
-            return None
+        return cls.new_validated(pathlib.Path(file), **kwargs)
 
     @classmethod
     @new_validated.__wrapped__.register
@@ -270,6 +389,150 @@ class XLTEKHDF5(HDF5EEG):
         else:
             return cls.get_version_class(TriNumberVersion(0, 1, 0)).new_validated(file)
 
+    @classmethod
+    @singlekwargdispatch("file")
+    def probe(cls, file: pathlib.Path | str | HDF5File | h5py.File) -> XLTEKHDF5Header | None:
+        """Reads the header of a file in a single open without constructing the file object.
+
+        Args:
+            file: The path or file object.
+
+        Returns:
+            The header of the file or None if the file is not a valid type.
+        """
+        raise TypeError(f"{type(file)} is not a valid type for probe.")
+
+    @classmethod
+    @probe.__wrapped__.register
+    def _probe(cls, file: pathlib.Path) -> XLTEKHDF5Header | None:
+        """Reads the header of a file in a single open without constructing the file object.
+
+        Args:
+            file: The path.
+
+        Returns:
+            The header of the file or None if the file is not a valid type.
+        """
+        if file.is_file():
+            try:
+                with h5py.File(file, mode="r") as obj:
+                    return cls.probe(obj)
+            except OSError:
+                return None
+        else:
+            return None
+
+    @classmethod
+    @probe.__wrapped__.register
+    def _probe(cls, file: str) -> XLTEKHDF5Header | None:
+        """Reads the header of a file in a single open without constructing the file object.
+
+        Args:
+            file: The path.
+
+        Returns:
+            The header of the file or None if the file is not a valid type.
+        """
+        return cls.probe(pathlib.Path(file))
+
+    @classmethod
+    @probe.__wrapped__.register
+    def _probe(cls, file: HDF5File) -> XLTEKHDF5Header | None:
+        """Reads the header of a file without constructing a new file object.
+
+        Args:
+            file: The file object.
+
+        Returns:
+            The header of the file or None if the file is not a valid type.
+        """
+        return cls.probe(file._file)
+
+    @classmethod
+    @probe.__wrapped__.register
+    def _probe(cls, file: h5py.File) -> XLTEKHDF5Header | None:
+        """Reads the header of an open HDF5 file.
+
+        Args:
+            file: The file object.
+
+        Returns:
+            The header of the file or None if the file is not a valid type.
+        """
+        t_name = cls.default_map.attribute_names["file_type"]
+        v_name = cls.default_map.attribute_names["file_version"]
+        if t_name in file.attrs:
+            if cls.FILE_TYPE != file.attrs[t_name]:
+                return None
+            elif v_name in file.attrs:
+                return cls.get_version_class(TriNumberVersion(file.attrs[v_name])).read_header(file)
+            else:
+                return cls.read_header(file)
+        else:
+            return cls.get_version_class(TriNumberVersion(0, 1, 0)).read_header(file)
+
+    @classmethod
+    def read_header(cls, file: h5py.File) -> XLTEKHDF5Header | None:
+        """Reads the header from the attributes and axes of an open HDF5 file of this type.
+
+        Only the first and last samples of the time axis are read, and only when the attributes lack the times.
+
+        Args:
+            file: The open HDF5 file.
+
+        Returns:
+            The header of the file or None if the file has no data.
+        """
+        attributes = file.attrs
+        names = cls.default_map.attribute_names
+        v_name = names["file_version"]
+        version = TriNumberVersion(attributes[v_name]) if v_name in attributes else cls.VERSION
+
+        data_map = cls.default_map["data"]
+        data = file.get(cls.default_map.map_names["data"], None)
+        if data is None:
+            return None
+        axis = int(_attribute_value(data.attrs, data_map.attribute_names["t_axis"]) or 0)
+        length = _attribute_value(data.attrs, cls.length_name)
+        shape = tuple(int(length) if i == axis and length is not None else n for i, n in enumerate(data.shape))
+        time_axis = data.dims[axis][0] if len(data.dims[axis]) > 0 else None
+
+        sample_rate = None if time_axis is None else _attribute_value(time_axis.attrs, "sample_rate")
+        if sample_rate is None and (r_name := data_map.attribute_names.get("sample_rate", None)) is not None:
+            sample_rate = _attribute_value(data.attrs, r_name)
+        timezone = None if time_axis is None else _read_time_zone(time_axis.attrs)
+
+        start_ns = _attribute_value(attributes, names["start"])
+        end_ns = None
+        if shape[axis] > 0 and time_axis is not None:
+            if start_ns is None:
+                start_ns = time_axis[0]
+            end_ns = time_axis[shape[axis] - 1]
+        if end_ns is None:
+            end_ns = _attribute_value(attributes, names["end"])
+
+        start_id = _attribute_value(attributes, names["start_id"])
+        if start_id is None:
+            start_id = start_ns
+        if sample_rate is not None and start_id is not None:
+            end_id = int(start_id) + nanostamp(max(shape[axis] - 1, 0) / float(sample_rate))
+        else:
+            end_id = _attribute_value(attributes, names["end_id"])
+
+        tz = datetime.timezone.utc if timezone is None else timezone
+        return XLTEKHDF5Header(
+            path=pathlib.Path(file.filename),
+            version=version,
+            start_id=None if start_id is None else int(start_id),
+            end_id=None if end_id is None else int(end_id),
+            start=None if start_ns is None else Timestamp.fromnanostamp(int(start_ns), tz=tz),
+            end=None if end_ns is None else Timestamp.fromnanostamp(int(end_ns), tz=tz),
+            sample_rate=None if sample_rate is None else float(sample_rate),
+            shape=shape,
+            axis=axis,
+            timezone=timezone,
+        )
+
     @classmethod
     def get_version_from_file(cls, file: pathlib.Path | str | h5py.File) -> tuple[Version, h5py.File]:
         """Return a version from a file.
@@ -292,3 +555,314 @@ class XLTEKHDF5(HDF5EEG):
             return TriNumberVersion(file.attrs[v_name]), file
         elif cls.get_version_class(TriNumberVersion(0, 1, 0)).validate_file_type(file):
             return TriNumberVersion(0, 1, 0), file
+
+    # Magic Methods #
+    # Construction/Destruction
+    def __init__(
+        self,
+        file: str | pathlib.Path | h5py.File | None = None,
+        s_id: str | None = None,
+        start: datetime.datetime | float | None = None,
+        compression: str | None = None,
+        chunks: tuple[int, int] | None = None,
+        growth: str | None = None,
+        compress_workers: int | None = None,
+        init: bool = True,
+        **kwargs: Any,
+    ) -> None:
+        # New Attributes #
+        self._compression: str = self.default_compression
+
+        self.growth: str | None = None
+        self.growth_factor: float = self.default_growth_factor
+        self.growth_increment: int | None = None
+        self.compressor: XLTEKChunkCompressor | None = None
+        self._length: int | None = None
+
+        # Parent Attributes #
+        super().__init__(init=False)
+
+        # Object Construction #
+        if init:
+            self.construct(
+                file=file,
+                s_id=s_id,
+                start=start,
+                compression=compression,
+                chunks=chunks,
+                growth=growth,
+                compress_workers=compress_workers,
+                **kwargs,
+            )
+
+    @property
+    def compression(self) -> str | None:
+        """The name of the compression profile of this file, None if the file did not record one."""
+        if self.is_open:
+            return self.attributes.get("compression", None)
+        else:
+            return self._compression
+
+    # Instance Methods #
+    # Constructors/Destructors
+    def construct(
+        self,
+        file: str | pathlib.Path | h5py.File | None = None,
+        s_id: str | None = None,
+        start: datetime.datetime | float | None = None,
+        compression: str | None = None,
+        chunks: tuple[int, int] | None = None,
+        growth: str | None = None,
+        compress_workers: int | None = None,
+        **kwargs: Any,
+    ) -> "XLTEKHDF5":
+        """Constructs this object.
+
+        Args:
+            file: Either the file object or the path to the file.
+            s_id: The subject id.
+            start: The start time of the data, if creating.
+            compression: The name of the compression profile to create the datasets with.
+            chunks: The chunk shape to create the data with, the time axis is chunked along the same samples.
+            growth: How the data is preallocated when samples are appended, see growth_modes.
+            compress_workers: The number of threads which compress the chunks of appended samples, None for HDF5.
+            **kwargs: The keyword arguments for the open method.
+
+        Returns:
+            This object.
+        """
+        if compression is not None:
+            self.set_compression(compression)
+
+        if chunks is not None:
+            self.set_chunks(chunks)
+
+        if growth is not None:
+            self.set_growth(growth)
+
+        if compress_workers is not None:
+            self.compressor = XLTEKChunkCompressor(workers=compress_workers)
+
+        return super().construct(file=file, s_id=s_id, start=start, **kwargs)
+
+    def construct_file_attributes(
+        self,
+        start: datetime.datetime | float | None = None,
+        map_: HDF5Map = None,
+        load: bool = False,
+        require: bool = False,
+    ) -> None:
+        """Creates the attributes for this group.
+
+        Args:
+            start: The start time of the data, if creating.
+            map_: The map to use to create the attributes.
+            load: Determines if this object will load the attribute values from the file on construction.
+            require: Determines if this object will create and fill the attributes in the file on construction.
+        """
+        super().construct_file_attributes(start=start, map_=map_, load=load, require=require)
+        if require and self.attributes.get("compression", None) is None:
+            self.attributes["compression"] = self._compression
+
+    # Compression
+    def set_compression(self, profile: str) -> None:
+        """Sets the compression profile which new datasets in this file will be created with.
+
+        Datasets which already exist in the file keep the compression they were created with.
+
+        Args:
+            profile: The name of the compression profile.
+        """
+        kwargs = self.get_compression_kwargs(profile)
+        data_map = self.map["data"]
+        for map_ in (data_map, *(m for axis_maps in data_map.axis_maps for m in axis_maps.values())):
+            for key in COMPRESSION_KEYS:
+                map_.kwargs.pop(key, None)
+            map_.kwargs.update(kwargs)
+        self._compression = profile
+
+    # Chunking
+    def set_chunks(self, chunks: tuple[int, int]) -> None:
+        """Sets the chunk shape which the data and time axis will be created with.
+
+        Datasets which already exist in the file keep the chunk shape they were created with.
+
+        Args:
+            chunks: The chunk shape of the data, the time axis is chunked along the same samples.
+        """
+        data_map = self.map["data"]
+        data_map.kwargs["chunks"] = tuple(chunks)
+        for axis_map in data_map.axis_maps[0].values():
+            axis_map.kwargs["chunks"] = tuple(chunks[:1])
+
+    # Preallocation
+    @property
+    def length(self) -> int:
+        """The number of written samples in the data, which can be less than its preallocated shape."""
+        return self.get_length()
+
+    def get_length(self) -> int:
+        """Gets the number of written samples in the data.
+
+        Returns:
+            The number of written samples.
+        """
+        if self._length is not None:
+            return self._length
+        data = self.data
+        with data:
+            length = _attribute_value(data._dataset.attrs, self.length_name)
+        return data.shape[0] if length is None else int(length)
+
+    def set_growth(self, growth: str | None, factor: float | None = None, increment: int | None = None) -> None:
+        """Sets how the data is preallocated when samples are appended.
+
+        Args:
+            growth: The growth mode, see growth_modes, or None to resize the data to fit every append.
+            factor: The factor which geometric growth multiplies the capacity by.
+            increment: The number of samples fixed growth adds, the chunk length of the data if None.
+        """
+        if growth is not None and growth not in self.growth_modes:
+            raise ValueError(f"{growth} is not a growth mode, choose from {self.growth_modes}.")
+        self.growth = growth
+
+        if factor is not None:
+            if factor <= 1:
+                raise ValueError("The growth factor must be greater than one.")
+            self.growth_factor = factor
+
+        if increment is not None:
+            self.growth_increment = increment
+
+    def plan_capacity(self, needed: int, capacity: int) -> int:
+        """Plans the preallocated number of samples which fits a number of samples.
+
+        Geometric growth adds at least one sample each step, so small capacities still reach the needed size.
+
+        Args:
+            needed: The number of samples which must fit.
+            capacity: The current preallocated number of samples.
+
+        Returns:
+            The new preallocated number of samples.
+        """
+        if needed <= capacity:
+            return capacity
+
+        chunks = self.data._dataset.chunks
+        increment = self.growth_increment or (1 if chunks is None else chunks[0])
+        if self.growth == "geometric":
+            capacity = max(capacity, increment)
+            while capacity < needed:
+                capacity = max(capacity + 1, math.ceil(capacity * self.growth_factor))
+            return capacity
+        elif self.growth == "fixed":
+            return -(-needed // increment) * increment
+        else:
+            return needed
+
+    def _resize_samples(self, capacity: int) -> None:
+        """Resizes the data and the time axis along their samples.
+
+        Args:
+            capacity: The new number of samples.
+        """
+        data = self.data
+        with data:
+            data._dataset.resize(capacity, axis=0)
+            time_axis = self.time_axis
+            time_axis._dataset.resize(capacity, axis=0)
+        data.clear_all_caches()
+        time_axis.clear_all_caches()
+
+    def _write_nanostamps(self, nanostamps: np.ndarray, start: int) -> None:
+        """Writes nanostamps into the preallocated time axis.
+
+        Args:
+            nanostamps: The nanostamps to write.
+            start: The index of the first sample to write.
+        """
+        time_axis = self.time_axis
+        with time_axis:
+            time_axis._dataset[start:start + nanostamps.shape[0]] = nanostamps
+        time_axis.clear_all_caches()
+
+    def reserve(self, capacity: int) -> None:
+        """Preallocates the data and time axis for a number of samples without changing the written samples.
+
+        Args:
+            capacity: The number of samples to preallocate.
+        """
+        length = self.get_length()
+        data = self.data
+        if capacity > data.shape[0]:
+            self._resize_samples(capacity)
+        self._set_length(length)
+
+    def append_samples(self, data: np.ndarray, nanostamps: np.ndarray) -> None:
+        """Appends samples, growing the data and time axis by the growth mode instead of for every append.
+
+        When this file has a compressor, the chunks of the samples are compressed in parallel and written directly.
+
+        Args:
+            data: The data of the samples.
+            nanostamps: The nanostamps of the samples.
+        """
+        dataset = self.data
+        length = self.get_length()
+        stop = length + data.shape[0]
+        capacity = dataset.shape[0]
+        if capacity == 0 and dataset.shape[1:] != data.shape[1:]:
+            with dataset:
+                dataset._dataset.resize((0, *data.shape[1:]))
+
+        if stop > capacity:
+            self._resize_samples(self.plan_capacity(stop, capacity))
+
+        with dataset:
+            if self.compressor is None:
+                dataset._dataset[length:stop] = data
+            else:
+                self.compressor.write(dataset._dataset, data, length)
+        dataset.clear_all_caches()
+        self._write_nanostamps(nanostamps, start=length)
+        self._set_length(stop)
+
+    def _set_length(self, length: int | None) -> None:
+        """Sets or removes the length attribute of the data.
+
+        Args:
+            length: The number of written samples or None to remove the attribute.
+        """
+        data = self.data
+        with data:
+            attributes = data._dataset.attrs
+            if length is not None:
+                attributes.modify(self.length_name, np.int64(length))
+            elif self.length_name in attributes:
+                del attributes[self.length_name]
+        data.attributes._attributes_dict.pop(self.length_name, None)
+        self._length = length
+
+    def trim(self) -> None:
+        """Resizes the data and time axis to their written samples, removing the preallocation and length attribute."""
+        length = self.get_length()
+        self._length = None
+        if self.data.shape[0] != length:
+            self._resize_samples(length)
+        self._set_length(None)
+
+    def close(self) -> bool:
+        """Trims the unused preallocation and closes the HDF5 file.
+
+        In SWMR mode, the file is closed and reopened after its attributes are written, so the preallocation is only
+        trimmed outside of SWMR mode, and SWMR writers must trim before closing.
+
+        Returns:
+            If the file was successfully closed.
+        """
+        if self._length is not None and self.is_open and not self.swmr_mode:
+            self.trim()
+        if self.compressor is not None:
+            self.compressor.close()
+        return super().close()
@@ -69,6 +69,6 @@ class XLTEKHDF5_1(XLTEKHDF5):
             start_id = self.start_id
             if start_id is None:
                 return None
-            end_id = start_id + nanostamp((data.shape[0] - 1) / data.components["timeseries"].sample_rate)
+            end_id = start_id + nanostamp(max(data.shape[0] - 1, 0) / data.components["timeseries"].sample_rate)
         return int(end_id)
 
@@ -0,0 +1,142 @@
+"""xltekhdf5_2.py
+A HDF5 file which contains data for XLTEK EEG data with a time axis computed from its sample rate.
+"""
+# Package Header #
+from ..header import *
+
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+
+# Third-Party Packages #
+from classversioning import TriNumberVersion
+from classversioning import Version
+from dspobjects.time import nanostamp
+import h5py
+from hdf5objects.dataset import ElectricalSeriesMap, LabelAxisMap, CoordinateAxisMap
+from hdf5objects.hdf5bases import HDF5Map
+import numpy as np
+
+# Local Packages #
+from .xltekhdf5 import XLTEKHDF5Header, XLTEKHDF5Map
+from .xltekhdf5_1 import XLTEKHDF5_1
+from .xltekimplicittimeaxis import XLTEKImplicitTimeAxis, XLTEKImplicitTimeSeriesComponent
+
+
+# Definitions #
+# Classes #
+class XLTEKImplicitElectricalSeriesMap(ElectricalSeriesMap):
+    """A map for an electrical series whose time axis is computed instead of stored as a dataset."""
+
+    default_axis_maps = [{}, *ElectricalSeriesMap.default_axis_maps[1:]]
+    default_component_types = ElectricalSeriesMap.default_component_types | {
+        "timeseries": (XLTEKImplicitTimeSeriesComponent, {"scale_name": "time_axis"}),
+    }
+
+
+class XLTEKHDF5_2Map(XLTEKHDF5Map):
+    """A map for XLTEKHDF5 files which have no time axis dataset."""
+    _compression_kwargs = XLTEKHDF5Map._compression_kwargs
+    default_maps = {
+        "data": XLTEKImplicitElectricalSeriesMap(
+            attributes={"units": "microvolts"},
+            axis_maps=[
+                {},
+                {"channellabel_axis": LabelAxisMap(object_kwargs=_compression_kwargs.copy()),
+                 "channelcoord_axis": CoordinateAxisMap(object_kwargs=_compression_kwargs.copy()),
+                 },
+            ],
+            object_kwargs={"shape": (0, 0), "maxshape": (None, None)} | _compression_kwargs,
+        ),
+    }
+
+
+class XLTEKHDF5_2(XLTEKHDF5_1):
+    """A HDF5 file which contains data for XLTEK EEG data with a time axis computed from its sample rate.
+
+    Instead of a dataset with the nanostamp of every sample, the data stores its start nanostamp and sample rate as
+    attributes and a small table of the samples where the recording is discontinuous. A new segment starts where the
+    spacing of the written times is off from the sample period by more than half a period, so sample jitter is not
+    kept. Files are only written in this version when it is chosen, the writers default to XLTEKHDF5_1, and readers
+    of XLTEKHDF5 files open either version.
+
+    Class Attributes:
+        _registration: Determines if this class will be included in class registry.
+        _VERSION_TYPE: The type of versioning to use.
+        FILE_TYPE: The file type name of this class.
+        VERSION: The version of this class.
+        default_map: The HDF5 map of this object.
+    """
+
+    VERSION: Version = TriNumberVersion(2, 0, 0)
+    default_map: HDF5Map = XLTEKHDF5_2Map()
+
+    # Class Methods #
+    # File Validation
+    @classmethod
+    def read_header(cls, file: h5py.File) -> XLTEKHDF5Header | None:
+        """Reads the header from the attributes of an open HDF5 file of this type.
+
+        The start and end are computed from the attributes and discontinuity table of the data.
+
+        Args:
+            file: The open HDF5 file.
+
+        Returns:
+            The header of the file or None if the file has no data.
+        """
+        header = super().read_header(file)
+        if header is None:
+            return None
+
+        time_axis = XLTEKImplicitTimeAxis.from_attributes(file[cls.default_map.map_names["data"]], t_axis=header.axis)
+        sample_rate = time_axis.sample_rate
+        end_id = header.end_id
+        if sample_rate is not None and header.start_id is not None:
+            end_id = header.start_id + int(nanostamp(max(header.shape[header.axis] - 1, 0) / sample_rate))
+        header = header._replace(sample_rate=sample_rate, end_id=end_id, timezone=time_axis.tzinfo)
+        if not time_axis.exists or len(time_axis) == 0:
+            return header
+        return header._replace(start=time_axis.start_datetime, end=time_axis.end_datetime)
+
+    # Properties #
+    @property
+    def time_axis(self) -> XLTEKImplicitTimeAxis:
+        """The time axis of the data, computed from its start, sample rate, and discontinuities."""
+        return self["data"].components["timeseries"].time_axis
+
+    # Instance Methods #
+    # Preallocation
+    def _resize_samples(self, capacity: int) -> None:
+        """Resizes the data along its samples, the time axis has no dataset to resize.
+
+        Args:
+            capacity: The new number of samples.
+        """
+        data = self.data
+        with data:
+            data._dataset.resize(capacity, axis=0)
+        data.clear_all_caches()
+
+    def _write_nanostamps(self, nanostamps: np.ndarray, start: int) -> None:
+        """Adds nanostamps to the time axis, which only stores the discontinuities among them.
+
+        Args:
+            nanostamps: The nanostamps to write.
+            start: The index of the first sample to write.
+        """
+        time_axis = self.time_axis
+        time_axis.append_nanostamps(nanostamps, offset=start)
+        time_axis.logical_length = start + nanostamps.shape[0]
+
+    def trim(self) -> None:
+        """Resizes the data to its written samples, removing the preallocation and length attribute."""
+        super().trim()
+        self.time_axis.logical_length = None
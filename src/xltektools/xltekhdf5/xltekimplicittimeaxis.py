@@ -0,0 +1,949 @@
+"""xltekimplicittimeaxis.py
+A time axis which computes the time of each sample from a start, a sample rate, and a sparse discontinuity table.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import datetime
+from decimal import Decimal
+from typing import Any
+import zoneinfo
+
+# Third-Party Packages #
+from baseobjects import BaseObject
+from dspobjects.dataclasses import IndexDateTime
+from dspobjects.time import Timestamp, nanostamp
+import h5py
+from hdf5objects.dataset import TimeSeriesComponent
+from hdf5objects.hdf5bases import HDF5Dataset
+import numpy as np
+
+# Local Packages #
+from .xltekhdf5 import _attribute_value, _read_time_zone
+
+
+# Definitions #
+# Classes #
+class XLTEKImplicitTimeAxis(BaseObject):
+    """A time axis which computes the time of each sample instead of storing it.
+
+    The samples are split into segments which are each evenly spaced at the sample rate. The first segment begins at
+    the start nanostamp and every following segment begins at a row of the discontinuity table, which holds the index
+    and nanostamp of the first sample of the segment. When nanostamps are written, a new segment is started wherever
+    the spacing between consecutive nanostamps differs from the sample period by more than the tolerance, so the
+    jitter of individual samples does not split segments but gaps and overlaps do.
+
+    The start, sample rate, and time zone are stored as attributes of the data and the discontinuity table is a small
+    dataset next to the data, which is only created when there are discontinuities.
+
+    Class Attributes:
+        start_name: The name of the data attribute which holds the start nanostamp.
+        length_name: The name of the data attribute which holds the number of written samples when preallocated.
+        table_suffix: The suffix added to the name of the data to name the discontinuity table.
+        default_tolerance: The default largest difference, in sample periods, between a spacing and the period.
+
+    Attributes:
+        dataset: The data which this axis stores its information in, None if it is only in memory.
+        t_axis: The axis of the data which this time axis describes.
+        tolerance: The largest difference, in sample periods, between a spacing and the period.
+        discontinuities: The index and nanostamp of the first sample of each segment after the first, shaped (n, 2).
+        logical_length: The number of written samples when the data is preallocated past them, otherwise None.
+        _start: The nanostamp of the first sample.
+        _sample_rate: The sample rate of the samples.
+        _tzinfo: The time zone of the samples.
+        _length: The number of samples when there is no dataset.
+
+    Args:
+        dataset: The data which this axis stores its information in.
+        start: The nanostamp of the first sample.
+        sample_rate: The sample rate of the samples.
+        tzinfo: The time zone of the samples.
+        discontinuities: The index and nanostamp of the first sample of each segment after the first.
+        length: The number of samples when there is no dataset.
+        t_axis: The axis of the data which this time axis describes.
+        tolerance: The largest difference, in sample periods, between a spacing and the period.
+        init: Determines if this object will construct.
+        **kwargs: Keyword arguments for inheritance.
+    """
+
+    start_name: str = "start_nanostamp"
+    length_name: str = "length"
+    table_suffix: str = "_time_discontinuities"
+    default_tolerance: float = 0.5
+
+    # Class Methods #
+    @classmethod
+    def from_attributes(cls, dataset: h5py.Dataset, t_axis: int = 0) -> "XLTEKImplicitTimeAxis":
+        """Creates an in-memory time axis from the attributes of an h5py dataset, without a file object.
+
+        Args:
+            dataset: The h5py dataset of the data.
+            t_axis: The axis of the data which this time axis describes.
+
+        Returns:
+            The time axis of the data.
+        """
+        table = dataset.file.get(f"{dataset.name}{cls.table_suffix}", None)
+        length = _attribute_value(dataset.attrs, cls.length_name)
+        attributes = dataset.attrs
+        return cls(
+            start=_attribute_value(attributes, cls.start_name),
+            sample_rate=_attribute_value(attributes, "sample_rate"),
+            tzinfo=_read_time_zone(attributes),
+            discontinuities=None if table is None else table[...],
+            length=dataset.shape[t_axis] if length is None else int(length),
+            t_axis=t_axis,
+        )
+
+    # Magic Methods #
+    # Construction/Destruction
+    def __init__(
+        self,
+        dataset: HDF5Dataset | None = None,
+        start: int | None = None,
+        sample_rate: float | str | Decimal | None = None,
+        tzinfo: datetime.tzinfo | None = None,
+        discontinuities: np.ndarray | None = None,
+        length: int | None = None,
+        t_axis: int = 0,
+        tolerance: float | None = None,
+        *,
+        init: bool = True,
+        **kwargs: Any,
+    ) -> None:
+        # New Attributes #
+        self.dataset: HDF5Dataset | None = None
+        self.t_axis: int = 0
+        self.tolerance: float = self.default_tolerance
+        self.discontinuities: np.ndarray = np.empty((0, 2), dtype=np.int64)
+        self.logical_length: int | None = None
+
+        self._start: int | None = None
+        self._sample_rate: Decimal | None = None
+        self._tzinfo: datetime.tzinfo | None = None
+        self._length: int = 0
+
+        # Parent Attributes #
+        super().__init__(init=False, **kwargs)
+
+        # Object Construction #
+        if init:
+            self.construct(
+                dataset=dataset,
+                start=start,
+                sample_rate=sample_rate,
+                tzinfo=tzinfo,
+                discontinuities=discontinuities,
+                length=length,
+                t_axis=t_axis,
+                tolerance=tolerance,
+                **kwargs,
+            )
+
+    def __len__(self) -> int:
+        """The number of samples in this axis."""
+        return self.get_length()
+
+    def __array__(self, dtype: Any = None, copy: bool | None = None) -> np.ndarray:
+        """Returns the nanostamps of this axis as an array."""
+        nanostamps = self.get_nanostamps()
+        return nanostamps if dtype is None else nanostamps.astype(dtype)
+
+    def __getitem__(self, item: int | slice | np.ndarray | tuple) -> int | np.ndarray:
+        """Gets the nanostamps of samples of this axis, computing only the requested samples."""
+        if isinstance(item, tuple) and len(item) == 1:
+            item = item[0]
+        if isinstance(item, (int, np.integer)):
+            return self.get_nanostamp(item)
+
+        length = self.get_length()
+        if item is Ellipsis:
+            indices = np.arange(length, dtype=np.int64)
+        elif isinstance(item, slice):
+            indices = np.arange(*item.indices(length), dtype=np.int64)
+        else:
+            indices = np.asarray(item)
+            if indices.dtype == np.bool_:
+                if indices.shape != (length,):
+                    raise IndexError(f"boolean index of shape {indices.shape} does not match axis of length {length}")
+                indices = np.flatnonzero(indices)
+            indices = indices.astype(np.int64)
+            if ((indices < -length) | (indices >= length)).any():
+                raise IndexError(f"index out of range for axis of length {length}")
+            indices = np.where(indices < 0, indices + length, indices)
+        return self._compute_nanostamps(indices)
+
+    # Properties #
+    @property
+    def components(self) -> dict[str, "XLTEKImplicitTimeAxis"]:
+        """The axis component, which is this object, for the same access as a time axis dataset."""
+        return {"axis": self}
+
+    @property
+    def exists(self) -> bool:
+        """Determines if this axis has a start to compute times from."""
+        return self._start is not None
+
+    @property
+    def axis(self) -> int:
+        """The axis of the data which this time axis describes."""
+        return self.t_axis
+
+    @property
+    def shape(self) -> tuple[int]:
+        """The shape of this axis."""
+        return (self.get_length(),)
+
+    @property
+    def nanostamps(self) -> np.ndarray:
+        """The nanostamps of all the samples."""
+        return self.get_nanostamps()
+
+    @property
+    def sample_rate(self) -> float | None:
+        """The sample rate of the samples."""
+        return None if self._sample_rate is None else float(self._sample_rate)
+
+    @sample_rate.setter
+    def sample_rate(self, value: float | str | Decimal | None) -> None:
+        self.set_sample_rate(value)
+
+    @property
+    def sample_rate_decimal(self) -> Decimal | None:
+        """The sample rate of the samples as a Decimal."""
+        return self._sample_rate
+
+    @property
+    def sample_period(self) -> float | None:
+        """The sample period of the samples in seconds."""
+        return None if self._sample_rate is None else float(1 / self._sample_rate)
+
+    @property
+    def tzinfo(self) -> datetime.tzinfo | None:
+        """The time zone of the samples."""
+        return self._tzinfo
+
+    @tzinfo.setter
+    def tzinfo(self, value: datetime.tzinfo | str | None) -> None:
+        self.set_time_zone(value)
+
+    @property
+    def start_nanostamp(self) -> int | None:
+        """The nanostamp of the first sample."""
+        return self._start if self.get_length() > 0 else None
+
+    @property
+    def end_nanostamp(self) -> int | None:
+        """The nanostamp of the last sample."""
+        return self.get_nanostamp(-1) if self.get_length() > 0 else None
+
+    @property
+    def start_datetime(self) -> Timestamp | None:
+        """The datetime of the first sample."""
+        return self.get_datetime(0) if self.get_length() > 0 else None
+
+    @property
+    def end_datetime(self) -> Timestamp | None:
+        """The datetime of the last sample."""
+        return self.get_datetime(-1) if self.get_length() > 0 else None
+
+    @property
+    def start_timestamp(self) -> float | None:
+        """The timestamp of the first sample in seconds."""
+        return self.get_timestamp(0) if self.get_length() > 0 else None
+
+    @property
+    def end_timestamp(self) -> float | None:
+        """The timestamp of the last sample in seconds."""
+        return self.get_timestamp(-1) if self.get_length() > 0 else None
+
+    # Instance Methods #
+    # Constructors/Destructors
+    def construct(
+        self,
+        dataset: HDF5Dataset | None = None,
+        start: int | None = None,
+        sample_rate: float | str | Decimal | None = None,
+        tzinfo: datetime.tzinfo | None = None,
+        discontinuities: np.ndarray | None = None,
+        length: int | None = None,
+        t_axis: int | None = None,
+        tolerance: float | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Constructs this object.
+
+        Args:
+            dataset: The data which this axis stores its information in.
+            start: The nanostamp of the first sample.
+            sample_rate: The sample rate of the samples.
+            tzinfo: The time zone of the samples.
+            discontinuities: The index and nanostamp of the first sample of each segment after the first.
+            length: The number of samples when there is no dataset.
+            t_axis: The axis of the data which this time axis describes.
+            tolerance: The largest difference, in sample periods, between a spacing and the period.
+            **kwargs: Keyword arguments for inheritance.
+        """
+        if t_axis is not None:
+            self.t_axis = t_axis
+
+        if tolerance is not None:
+            self.tolerance = tolerance
+
+        if dataset is not None:
+            self.dataset = dataset
+            self.load()
+
+        if start is not None:
+            self._start = int(start)
+
+        if sample_rate is not None:
+            self._sample_rate = Decimal(str(sample_rate)) if isinstance(sample_rate, float) else Decimal(sample_rate)
+
+        if tzinfo is not None:
+            self._tzinfo = tzinfo
+
+        if discontinuities is not None:
+            self.discontinuities = np.asarray(discontinuities, dtype=np.int64).reshape((-1, 2))
+
+        if length is not None:
+            self._length = length
+
+        super().construct(**kwargs)
+
+    # File
+    @property
+    def _table_name(self) -> str:
+        """The name of the discontinuity table in the file."""
+        return f"{self.dataset._full_name}{self.table_suffix}"
+
+    def load(self) -> None:
+        """Loads the start, sample rate, time zone, and discontinuities from the data."""
+        if not self.dataset.exists:
+            return
+        with self.dataset:
+            loaded = self.from_attributes(self.dataset._dataset, t_axis=self.t_axis)
+        self._start = loaded._start
+        self._sample_rate = loaded._sample_rate
+        self._tzinfo = loaded._tzinfo
+        self.discontinuities = loaded.discontinuities
+        with self.dataset:
+            length = _attribute_value(self.dataset._dataset.attrs, self.length_name)
+        self.logical_length = None if length is None else int(length)
+
+    def _write_attributes(self) -> None:
+        """Writes the start, sample rate, and time zone to the attributes of the data."""
+        if self.dataset is None:
+            return
+        attributes = self.dataset.attributes
+        attributes.set_attribute(self.start_name, h5py.Empty("i8") if self._start is None else self._start)
+        attributes.set_attribute(
+            "sample_rate",
+            h5py.Empty("f8") if self._sample_rate is None else float(self._sample_rate),
+        )
+        if self._tzinfo is None:
+            attributes.set_attribute("time_zone", "")
+            attributes.set_attribute("time_zone_offset", h5py.Empty("f8"))
+        else:
+            offset = self._tzinfo.utcoffset(datetime.datetime.now()).total_seconds()
+            attributes.set_attribute("time_zone", str(self._tzinfo))
+            attributes.set_attribute("time_zone_offset", offset)
+
+    def _write_discontinuities(self, start: int = 0) -> None:
+        """Writes the discontinuity table to the file, only creating it when there are discontinuities.
+
+        Args:
+            start: The first row of the table which has changed.
+        """
+        if self.dataset is None:
+            return
+        with self.dataset:
+            h5_file = self.dataset.file._file
+            table = h5_file.get(self._table_name, None)
+            n_rows = self.discontinuities.shape[0]
+            if table is None:
+                if n_rows > 0:
+                    h5_file.create_dataset(
+                        self._table_name,
+                        data=self.discontinuities,
+                        maxshape=(None, 2),
+                        chunks=(256, 2),
+                    )
+            else:
+                table.resize((n_rows, 2))
+                table[start:] = self.discontinuities[start:]
+
+    # Getters and Setters
+    def get_length(self) -> int:
+        """Gets the number of samples in this axis.
+
+        Returns:
+            The number of samples.
+        """
+        if self.dataset is None or self.dataset._dataset is None:
+            return self._length
+        elif self.logical_length is not None:
+            return self.logical_length
+        return self.dataset.shape[self.t_axis]
+
+    def set_sample_rate(self, value: float | str | Decimal | None) -> None:
+        """Sets the sample rate of the samples.
+
+        Args:
+            value: The sample rate.
+        """
+        if value is None:
+            self._sample_rate = None
+        else:
+            self._sample_rate = Decimal(str(value)) if isinstance(value, float) else Decimal(value)
+        self._write_attributes()
+
+    def get_sample_rate(self) -> float | None:
+        """Gets the sample rate of the samples.
+
+        Returns:
+            The sample rate.
+        """
+        return self.sample_rate
+
+    def get_sample_rate_decimal(self) -> Decimal | None:
+        """Gets the sample rate of the samples as a Decimal.
+
+        Returns:
+            The sample rate.
+        """
+        return self._sample_rate
+
+    def get_sample_period(self) -> float | None:
+        """Gets the sample period of the samples in seconds.
+
+        Returns:
+            The sample period.
+        """
+        return self.sample_period
+
+    def get_sample_period_decimal(self) -> Decimal | None:
+        """Gets the sample period of the samples in seconds as a Decimal.
+
+        Returns:
+            The sample period.
+        """
+        return None if self._sample_rate is None else 1 / self._sample_rate
+
+    def set_time_zone(self, value: datetime.tzinfo | str | None = None, offset: float | None = None) -> None:
+        """Sets the time zone of the samples.
+
+        Args:
+            value: The time zone or the name of the time zone.
+            offset: The offset of the time zone from UTC in seconds, used when there is no time zone.
+        """
+        if isinstance(value, str):
+            value = zoneinfo.ZoneInfo(value) if value else None
+        if value is None and offset is not None:
+            value = datetime.timezone(datetime.timedelta(seconds=offset))
+        self._tzinfo = value
+        self._write_attributes()
+
+    # Times
+    def _segment_starts(self) -> tuple[np.ndarray, np.ndarray]:
+        """Gets the first index and nanostamp of every segment, including the first segment.
+
+        Returns:
+            The first index and the first nanostamp of each segment.
+        """
+        indices = np.concatenate(([0], self.discontinuities[:, 0]))
+        nanostamps = np.concatenate(([self._start], self.discontinuities[:, 1]))
+        return indices, nanostamps
+
+    def _compute_nanostamps(self, indices: np.ndarray) -> np.ndarray:
+        """Computes the nanostamps of samples from their segments.
+
+        Args:
+            indices: The non-negative indices of the samples.
+
+        Returns:
+            The nanostamps of the samples.
+        """
+        if self._start is None or self._sample_rate is None:
+            raise ValueError("The start and sample rate must be set to compute times.")
+        starts, start_nanostamps = self._segment_starts()
+        segments = np.searchsorted(starts, indices, side="right") - 1
+        offsets = (indices - starts[segments]) * (10**9 / float(self._sample_rate))
+        return start_nanostamps[segments] + np.round(offsets).astype(np.int64)
+
+    def get_nanostamps(self) -> np.ndarray:
+        """Gets the nanostamps of all the samples.
+
+        Returns:
+            The nanostamps of the samples.
+        """
+        return self._compute_nanostamps(np.arange(self.get_length(), dtype=np.int64))
+
+    def get_timestamps(self) -> np.ndarray:
+        """Gets the timestamps of all the samples in seconds.
+
+        Returns:
+            The timestamps of the samples.
+        """
+        return self.get_nanostamps() / 10**9
+
+    def get_datetimes(self) -> tuple[Timestamp, ...]:
+        """Gets the datetimes of all the samples.
+
+        Returns:
+            The datetimes of the samples.
+        """
+        tz = datetime.timezone.utc if self._tzinfo is None else self._tzinfo
+        return tuple(Timestamp.fromnanostamp(int(n), tz=tz) for n in self.get_nanostamps())
+
+    def get_nanostamp(self, super_index: int) -> int:
+        """Gets the nanostamp of a sample.
+
+        Args:
+            super_index: The index of the sample.
+
+        Returns:
+            The nanostamp of the sample.
+        """
+        length = self.get_length()
+        if super_index < 0:
+            super_index += length
+        if not 0 <= super_index < length:
+            raise IndexError("Index out of range.")
+        if self._start is None or self._sample_rate is None:
+            raise ValueError("The start and sample rate must be set to compute times.")
+        segment = int(np.searchsorted(self.discontinuities[:, 0], super_index, side="right"))
+        if segment == 0:
+            first_index, first_nanostamp = 0, self._start
+        else:
+            first_index, first_nanostamp = (int(i) for i in self.discontinuities[segment - 1])
+        return first_nanostamp + round((super_index - first_index) * (10**9 / float(self._sample_rate)))
+
+    def fill_nanostamps_array(
+        self,
+        data_array: np.ndarray,
+        array_slice: slice | None = None,
+        slice_: slice | None = None,
+    ) -> np.ndarray:
+        """Fills a given array with the nanostamps of samples.
+
+        Args:
+            data_array: The numpy array to fill.
+            array_slice: The slices to fill within the data_array.
+            slice_: The slices of the samples to get the nanostamps of.
+
+        Returns:
+            The original array but filled.
+        """
+        data_array[array_slice] = self[slice(None) if slice_ is None else slice_]
+        return data_array
+
+    def nanostamp_slice(
+        self,
+        start: int | None = None,
+        stop: int | None = None,
+        step: int | None = None,
+        proxy: bool = False,
+    ) -> np.ndarray:
+        """Get a range of nanostamps with indices.
+
+        Args:
+            start: The start index.
+            stop: The stop index.
+            step: The interval between indices to get nanostamps.
+            proxy: Unused, the nanostamps are always returned as an array.
+
+        Returns:
+            The requested range of nanostamps.
+        """
+        return self[start:stop:step]
+
+    def fill_timestamps_array(
+        self,
+        data_array: np.ndarray,
+        array_slice: slice | None = None,
+        slice_: slice | None = None,
+    ) -> np.ndarray:
+        """Fills a given array with the timestamps of samples in seconds.
+
+        Args:
+            data_array: The numpy array to fill.
+            array_slice: The slices to fill within the data_array.
+            slice_: The slices of the samples to get the timestamps of.
+
+        Returns:
+            The original array but filled.
+        """
+        data_array[array_slice] = self[slice(None) if slice_ is None else slice_] / 10**9
+        return data_array
+
+    def timestamp_slice(
+        self,
+        start: int | None = None,
+        stop: int | None = None,
+        step: int | None = None,
+        proxy: bool = False,
+    ) -> np.ndarray:
+        """Get a range of timestamps in seconds with indices.
+
+        Args:
+            start: The start index.
+            stop: The stop index.
+            step: The interval between indices to get timestamps.
+            proxy: Unused, the timestamps are always returned as an array.
+
+        Returns:
+            The requested range of timestamps.
+        """
+        return self[start:stop:step] / 10**9
+
+    def get_timestamp(self, super_index: int) -> float:
+        """Gets the timestamp of a sample in seconds.
+
+        Args:
+            super_index: The index of the sample.
+
+        Returns:
+            The timestamp of the sample.
+        """
+        return self.get_nanostamp(super_index) / 10**9
+
+    def get_datetime(self, index: int) -> Timestamp:
+        """Gets the datetime of a sample.
+
+        Args:
+            index: The index of the sample.
+
+        Returns:
+            The datetime of the sample.
+        """
+        tz = datetime.timezone.utc if self._tzinfo is None else self._tzinfo
+        return Timestamp.fromnanostamp(self.get_nanostamp(index), tz=tz)
+
+    def find_time_index(
+        self,
+        timestamp: datetime.datetime | float | int | np.dtype,
+        approx: bool = True,
+        tails: bool = False,
+    ) -> IndexDateTime:
+        """Finds the index with given time, can give approximate values.
+
+        Args:
+            timestamp: The timestamp to find the index for.
+            approx: Determines if an approximate index will be given if the time is not present.
+            tails: Determines if the first or last index will be give the requested time is outside the axis.
+
+        Returns:
+            The requested closest index and the value at that index.
+        """
+        nano_ts = int(nanostamp(timestamp))
+        length = self.get_length()
+        if length > 0 and nano_ts < self._start:
+            if tails:
+                return IndexDateTime(0, self.get_datetime(0))
+        elif length > 0 and nano_ts > self.end_nanostamp:
+            if tails:
+                return IndexDateTime(length, self.get_datetime(-1))
+        elif length > 0:
+            starts, start_nanostamps = self._segment_starts()
+            segment = int(np.searchsorted(start_nanostamps, nano_ts, side="right") - 1)
+            segment_end = starts[segment + 1] - 1 if segment + 1 < starts.shape[0] else length - 1
+            offset = (nano_ts - int(start_nanostamps[segment])) * float(self._sample_rate) // 10**9
+            index = min(int(starts[segment]) + int(offset), int(segment_end))
+            if index < segment_end and self.get_nanostamp(index + 1) <= nano_ts:
+                index += 1
+            true_timestamp = self.get_nanostamp(index)
+            if true_timestamp > nano_ts:
+                index -= 1
+                true_timestamp = self.get_nanostamp(index)
+            if approx or nano_ts == true_timestamp:
+                return IndexDateTime(index, self.get_datetime(index))
+
+        raise IndexError("Timestamp out of range.")
+
+    def find_time_index_slice(
+        self,
+        start: datetime.datetime | float | int | np.dtype | None = None,
+        stop: datetime.datetime | float | int | np.dtype | None = None,
+        step: int | float | datetime.timedelta | None = None,
+        approx: bool = True,
+        tails: bool = False,
+    ) -> tuple[IndexDateTime, IndexDateTime, int | float | datetime.timedelta | None]:
+        """Finds the indices for a slice inbetween two times, can give approximate values.
+
+        Args:
+            start: The first time to find for the slice.
+            stop: The last time to find for the slice.
+            step: The step between elements in the slice.
+            approx: Determines if an approximate indices will be given if the time is not present.
+            tails: Determines if the first or last times will be give the requested item is outside the axis.
+
+        Returns:
+            The slice indices.
+        """
+        samples = self.get_length()
+        if start is None:
+            start_index = IndexDateTime(0, self.start_datetime)
+        else:
+            try:
+                start_index = self.find_time_index(start, approx=approx, tails=tails)
+            except IndexError:
+                raise IndexError("Start out of range.")
+
+        if stop is None:
+            stop_index = IndexDateTime(samples, self.end_datetime)
+        else:
+            stop_ns = int(nanostamp(stop))
+            if stop_ns < self._start or stop_ns > self.end_nanostamp:
+                if not tails:
+                    raise IndexError("Stop out of range.")
+                stop_index = self.find_time_index(stop, tails=True)
+            else:
+                index = self.find_time_index(stop).index
+                index = index if self.get_nanostamp(index) == stop_ns else index + 1
+                true_index = index - 1 if index != 0 else 0
+                if not approx and stop_ns != self.get_nanostamp(true_index):
+                    raise IndexError("Stop out of range.")
+                stop_index = IndexDateTime(index, self.get_datetime(true_index))
+
+        return start_index, stop_index, step
+
+    def where_discontinuous(self, tolerance: float | None = None) -> np.ndarray:
+        """Gets the indices of the samples which begin discontinuous segments.
+
+        Args:
+            tolerance: Unused, the discontinuities are found when the times are written.
+
+        Returns:
+            The indices of the samples which begin discontinuous segments.
+        """
+        return self.discontinuities[:, 0].copy()
+
+    def validate_continuous(self, tolerance: float | None = None) -> bool:
+        """Checks if the samples are evenly spaced for the whole axis.
+
+        Args:
+            tolerance: Unused, the discontinuities are found when the times are written.
+
+        Returns:
+            If the samples are continuous.
+        """
+        return self.discontinuities.shape[0] == 0
+
+    # Writing
+    def _find_discontinuities(self, nanostamps: np.ndarray, offset: int, start: int) -> list[tuple[int, int]]:
+        """Finds the segments which the written nanostamps are split into.
+
+        A segment starts at each nanostamp whose spacing from the previous one differs from the sample period by more
+        than the tolerance, which is found for every nanostamp at once from their differences.
+
+        Args:
+            nanostamps: The written nanostamps.
+            offset: The index of the first written nanostamp in this axis.
+            start: The nanostamp which the segment of the first written nanostamp predicts for it.
+
+        Returns:
+            The index and nanostamp of the first sample of each new segment.
+        """
+        if nanostamps.shape[0] == 0:
+            return []
+
+        period = 10**9 / float(self._sample_rate)
+        errors = np.empty(nanostamps.shape[0], dtype=np.float64)
+        errors[0] = int(nanostamps[0]) - start
+        errors[1:] = np.diff(nanostamps) - period
+        breaks = np.flatnonzero(np.abs(errors) > self.tolerance * period)
+        return [(offset + int(i), int(nanostamps[i])) for i in breaks]
+
+    def _infer_sample_rate(self, nanostamps: np.ndarray) -> None:
+        """Sets the sample rate from the median spacing of nanostamps when it is not set.
+
+        Args:
+            nanostamps: The nanostamps to infer the sample rate from.
+        """
+        if self._sample_rate is None:
+            if nanostamps.shape[0] < 2:
+                raise ValueError("The sample rate must be set before writing fewer than two times.")
+            self._sample_rate = Decimal(10**9) / Decimal(int(np.median(np.diff(nanostamps))))
+            self._write_attributes()
+
+    def set_nanostamps(self, nanostamps: np.ndarray) -> None:
+        """Sets the times of all the samples, storing only the start and the discontinuities.
+
+        Args:
+            nanostamps: The nanostamps of all the samples.
+        """
+        nanostamps = np.asarray(nanostamps, dtype=np.int64)
+        if nanostamps.shape[0] == 0:
+            return
+        self._infer_sample_rate(nanostamps)
+        self._start = int(nanostamps[0])
+        new = self._find_discontinuities(nanostamps, offset=0, start=self._start)
+        self.discontinuities = np.array(new, dtype=np.int64).reshape((-1, 2))
+        self._write_attributes()
+        self._write_discontinuities()
+
+    def append_nanostamps(self, nanostamps: np.ndarray, offset: int | None = None) -> None:
+        """Appends the times of samples which were appended to the data.
+
+        Args:
+            nanostamps: The nanostamps of the appended samples.
+            offset: The index of the first appended sample, defaults to the samples before the appended ones.
+        """
+        nanostamps = np.asarray(nanostamps, dtype=np.int64)
+        n_new = nanostamps.shape[0]
+        if n_new == 0:
+            return
+        if offset is None:
+            offset = self.get_length() - n_new if self.dataset is not None else self._length
+        if offset <= 0 or self._start is None:
+            if self.dataset is None:
+                self._length = n_new
+            self.set_nanostamps(nanostamps)
+            return
+
+        self._infer_sample_rate(nanostamps)
+        starts, start_nanostamps = self._segment_starts()
+        predicted = start_nanostamps[-1] + round((offset - starts[-1]) * 10**9 / float(self._sample_rate))
+        new = self._find_discontinuities(nanostamps, offset=offset, start=int(predicted))
+        if self.dataset is None:
+            self._length = offset + n_new
+        if new:
+            n_rows = self.discontinuities.shape[0]
+            self.discontinuities = np.concatenate((self.discontinuities, np.array(new, dtype=np.int64)))
+            self._write_discontinuities(start=n_rows)
+
+
+class XLTEKImplicitTimeSeriesComponent(TimeSeriesComponent):
+    """A time series component whose time axis is computed instead of stored as a per-sample dataset.
+
+    Attributes:
+        _implicit_axis: The implicit time axis of the data.
+    """
+
+    # Magic Methods #
+    # Construction/Destruction
+    def __init__(self, composite: Any = None, *args: Any, init: bool = True, **kwargs: Any) -> None:
+        # New Attributes #
+        self._implicit_axis: XLTEKImplicitTimeAxis | None = None
+
+        # Parent Attributes #
+        super().__init__(composite, *args, init=init, **kwargs)
+
+    @property
+    def _sample_rate(self) -> Decimal | None:
+        """The sample rate of this timeseries."""
+        time_axis = self.time_axis
+        return self._sample_rate_ if time_axis is None else time_axis.sample_rate_decimal
+
+    @_sample_rate.setter
+    def _sample_rate(self, value: Decimal | int | float | None) -> None:
+        self._sample_rate_ = value
+        time_axis = self.time_axis
+        if time_axis is not None and value is not None:
+            time_axis.sample_rate = value
+
+    @property
+    def time_axis(self) -> XLTEKImplicitTimeAxis | None:
+        """Loads and returns the implicit time axis."""
+        if self._implicit_axis is None:
+            if self.composite is None:
+                return None
+            self._implicit_axis = XLTEKImplicitTimeAxis(dataset=self.composite, t_axis=self.t_axis)
+            if self._implicit_axis.sample_rate is None and self._sample_rate_ is not None:
+                self._implicit_axis.sample_rate = self._sample_rate_
+        return self._implicit_axis
+
+    @time_axis.setter
+    def time_axis(self, value: XLTEKImplicitTimeAxis | None) -> None:
+        self._implicit_axis = value
+
+    # Instance Methods #
+    # Axes
+    def set_time_axis(self, t_axis: int | None = None, scale_name: str | None = None) -> None:
+        """Sets the axis of the data which the time axis describes.
+
+        Args:
+            t_axis: The dim number of the time axis.
+            scale_name: Unused, the implicit time axis has no scale.
+        """
+        if t_axis is not None:
+            self._t_axis = t_axis
+        self._implicit_axis = None
+
+    def create_time_axis(
+        self,
+        t_axis: int | None = None,
+        scale_name: str | None = None,
+        start: datetime.datetime | float | None = None,
+        rate: int | float | None = None,
+        datetimes: np.ndarray | None = None,
+        data: np.ndarray | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Sets up the implicit time axis.
+
+        Args:
+            t_axis: The dim number of the time axis.
+            scale_name: Unused, the implicit time axis has no scale.
+            start: The start of the time axis.
+            rate: The sample rate of the time axis.
+            datetimes: The nanostamps of the samples.
+            data: The nanostamps of the samples, used when datetimes is not given.
+            **kwargs: Unused keyword arguments of time axis datasets.
+        """
+        self.set_time_axis(t_axis=t_axis)
+        time_axis = self.time_axis
+        datetimes = data if datetimes is None else datetimes
+        if rate is not None:
+            time_axis.sample_rate = rate
+        if datetimes is not None:
+            time_axis.set_nanostamps(datetimes)
+        elif start is not None:
+            time_axis._start = int(nanostamp(start))
+            time_axis._write_attributes()
+
+    def require_time_axis(self, t_axis: int | None = None, **kwargs: Any) -> None:
+        """Sets up the implicit time axis if it is not already.
+
+        Args:
+            t_axis: The dim number of the time axis.
+            **kwargs: The keyword arguments for creating the time axis.
+        """
+        if t_axis is not None and t_axis != self._t_axis:
+            self.set_time_axis(t_axis=t_axis)
+        if not self.time_axis.exists:
+            self.create_time_axis(**kwargs)
+
+    # Data
+    def set_data_component(self, data: np.ndarray | None = None, **kwargs: Any) -> None:
+        """Sets the times of the samples.
+
+        Args:
+            data: The nanostamps of all the samples.
+            **kwargs: The keyword arguments for creating the component.
+        """
+        if data is None:
+            self.require_component(**kwargs)
+        else:
+            self.time_axis.set_nanostamps(data)
+
+    def append_component(self, data: np.ndarray | None = None, **kwargs: Any) -> None:
+        """Appends the times of appended samples.
+
+        Args:
+            data: The nanostamps of the appended samples.
+            **kwargs: Unused keyword arguments of time axis datasets.
+        """
+        if data is not None:
+            self.time_axis.append_nanostamps(data)
+
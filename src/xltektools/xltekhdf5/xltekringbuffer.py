@@ -0,0 +1,274 @@
+"""xltekringbuffer.py
+A ring buffer of XLTEK samples in shared memory which passes blocks between processes without copying them.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects import BaseObject
+import numpy as np
+
+# Local Packages #
+
+
+# Definitions #
+# Classes #
+class XLTEKSharedRingBuffer(BaseObject):
+    """A ring buffer of samples and their nanostamps in shared memory for passing blocks between processes.
+
+    A producer puts a block into the buffer and sends only its position and length to the consumer, which gets the
+    block as views of the shared memory and releases it once it is done with it. Blocks never wrap around the end of
+    the buffer, the space at the end which a block does not fit in is skipped, so every block is a single contiguous
+    view. Positions count the samples since the buffer was created, so they also order the blocks. When the buffer is
+    full, the producer waits for the consumer to release blocks. The buffer supports one producer and one consumer.
+
+    The buffer can be passed to another process when the process is created, the other process attaches to the same
+    shared memory. Only the object which created the shared memory unlinks it when closed.
+
+    Class Attributes:
+        counters_dtype: The dtype of the written and released counters at the start of the shared memory.
+
+    Attributes:
+        capacity: The number of samples the buffer holds.
+        n_channels: The number of channels of each sample.
+        dtype: The dtype of the samples.
+        name: The name of the shared memory.
+        is_owner: Determines if this object created the shared memory and unlinks it when closed.
+        data: The samples in the shared memory, shaped (capacity, n_channels).
+        nanostamps: The nanostamps of the samples in the shared memory.
+        _memory: The shared memory which holds the counters, nanostamps, and samples.
+        _counters: The position after the last written block and after the last released block.
+        _condition: The condition which the producer waits on until the consumer releases space.
+
+    Args:
+        capacity: The number of samples the buffer holds.
+        n_channels: The number of channels of each sample.
+        dtype: The dtype of the samples.
+        name: The name of existing shared memory to attach to, None to create the shared memory.
+        init: Determines if this object will construct.
+        **kwargs: Keyword arguments for inheritance.
+    """
+
+    counters_dtype: np.dtype = np.dtype(np.int64)
+
+    # Magic Methods #
+    # Construction/Destruction
+    def __init__(
+        self,
+        capacity: int | None = None,
+        n_channels: int | None = None,
+        dtype: np.dtype | str = np.float32,
+        name: str | None = None,
+        *,
+        init: bool = True,
+        **kwargs: Any,
+    ) -> None:
+        # New Attributes #
+        self.capacity: int = 0
+        self.n_channels: int = 0
+        self.dtype: np.dtype = np.dtype(np.float32)
+        self.name: str | None = None
+        self.is_owner: bool = False
+
+        self.data: np.ndarray | None = None
+        self.nanostamps: np.ndarray | None = None
+
+        self._memory: SharedMemory | None = None
+        self._counters: np.ndarray | None = None
+        self._condition: Any = None
+
+        # Parent Attributes #
+        super().__init__(init=False, **kwargs)
+
+        # Object Construction #
+        if init:
+            self.construct(capacity=capacity, n_channels=n_channels, dtype=dtype, name=name, **kwargs)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Creates the state which attaches to the same shared memory, only picklable when creating a process."""
+        return {
+            "capacity": self.capacity,
+            "n_channels": self.n_channels,
+            "dtype": self.dtype.str,
+            "name": self.name,
+            "condition": self._condition,
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Attaches to the shared memory of the state."""
+        self.__init__(init=False)
+        self._condition = state["condition"]
+        self.construct(
+            capacity=state["capacity"],
+            n_channels=state["n_channels"],
+            dtype=state["dtype"],
+            name=state["name"],
+        )
+
+    def __len__(self) -> int:
+        """The number of samples which are written and not released."""
+        return int(self._counters[0] - self._counters[1])
+
+    def __del__(self) -> None:
+        """Closes the shared memory when this object is deleted."""
+        self.close()
+
+    # Instance Methods #
+    # Constructors/Destructors
+    def construct(
+        self,
+        capacity: int | None = None,
+        n_channels: int | None = None,
+        dtype: np.dtype | str | None = None,
+        name: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Constructs this object.
+
+        Args:
+            capacity: The number of samples the buffer holds.
+            n_channels: The number of channels of each sample.
+            dtype: The dtype of the samples.
+            name: The name of existing shared memory to attach to, None to create the shared memory.
+            **kwargs: Keyword arguments for inheritance.
+        """
+        if capacity is not None:
+            self.capacity = capacity
+
+        if n_channels is not None:
+            self.n_channels = n_channels
+
+        if dtype is not None:
+            self.dtype = np.dtype(dtype)
+
+        if name is not None:
+            self.attach(name)
+        elif self.capacity > 0 and self.n_channels > 0:
+            self.create()
+
+        super().construct(**kwargs)
+
+    @property
+    def nbytes(self) -> int:
+        """The size of the shared memory in bytes."""
+        counters_bytes = 2 * self.counters_dtype.itemsize
+        return counters_bytes + self.capacity * (np.dtype(np.int64).itemsize + self.n_channels * self.dtype.itemsize)
+
+    def create(self) -> None:
+        """Creates the shared memory of the buffer."""
+        self._memory = SharedMemory(create=True, size=self.nbytes)
+        self.name = self._memory.name
+        self.is_owner = True
+        self._condition = multiprocessing.Condition()
+        self._map_arrays()
+        self._counters[:] = 0
+
+    def attach(self, name: str) -> None:
+        """Attaches to existing shared memory of a buffer with the same shape.
+
+        Args:
+            name: The name of the shared memory.
+        """
+        self._memory = SharedMemory(name=name)
+        self.name = name
+        self.is_owner = False
+        self._map_arrays()
+
+    def _map_arrays(self) -> None:
+        """Creates the arrays which view the counters, nanostamps, and samples in the shared memory."""
+        buffer = self._memory.buf
+        offset = 2 * self.counters_dtype.itemsize
+        self._counters = np.ndarray((2,), dtype=self.counters_dtype, buffer=buffer)
+        self.nanostamps = np.ndarray((self.capacity,), dtype=np.int64, buffer=buffer, offset=offset)
+        offset += self.capacity * self.nanostamps.itemsize
+        self.data = np.ndarray((self.capacity, self.n_channels), dtype=self.dtype, buffer=buffer, offset=offset)
+
+    def close(self) -> None:
+        """Closes the shared memory, unlinking it if this object created it."""
+        if self._memory is not None:
+            self.data = self.nanostamps = self._counters = None
+            self._memory.close()
+            if self.is_owner:
+                self._memory.unlink()
+            self._memory = None
+
+    # Blocks
+    def _next_position(self, length: int) -> int:
+        """Finds the position of the next block, skipping the end of the buffer if the block does not fit in it.
+
+        Args:
+            length: The number of samples in the block.
+
+        Returns:
+            The position of the block.
+        """
+        position = int(self._counters[0])
+        offset = position % self.capacity
+        if offset + length > self.capacity:
+            position += self.capacity - offset
+        return position
+
+    def put(self, data: np.ndarray, nanostamps: np.ndarray, timeout: float | None = None) -> int:
+        """Copies a block into the buffer, waiting for the consumer to release space if the buffer is full.
+
+        Args:
+            data: The samples of the block, shaped (length, n_channels).
+            nanostamps: The nanostamps of the samples.
+            timeout: The longest time in seconds to wait for space, None to wait indefinitely.
+
+        Returns:
+            The position of the block, which the consumer gets the block with.
+        """
+        length = data.shape[0]
+        if length > self.capacity:
+            raise ValueError(f"A block of {length} samples does not fit in a buffer of {self.capacity} samples.")
+
+        position = self._next_position(length)
+        stop = position + length - self.capacity
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._counters[1] >= stop, timeout):
+                raise TimeoutError("The shared buffer did not have space for the block before the timeout.")
+
+        offset = position % self.capacity
+        self.data[offset:offset + length] = data
+        self.nanostamps[offset:offset + length] = nanostamps
+        with self._condition:
+            self._counters[0] = position + length
+        return position
+
+    def get(self, position: int, length: int) -> tuple[np.ndarray, np.ndarray]:
+        """Gets a block from the buffer as views of the shared memory, which are valid until the block is released.
+
+        Args:
+            position: The position of the block.
+            length: The number of samples in the block.
+
+        Returns:
+            The samples and nanostamps of the block.
+        """
+        offset = position % self.capacity
+        return self.data[offset:offset + length], self.nanostamps[offset:offset + length]
+
+    def release(self, position: int, length: int) -> None:
+        """Releases a block and every block before it, so the producer can reuse their space.
+
+        Args:
+            position: The position of the block.
+            length: The number of samples in the block.
+        """
+        with self._condition:
+            self._counters[1] = position + length
+            self._condition.notify_all()
@@ -0,0 +1,201 @@
+"""xltekrolloverpolicy.py
+Decides when a writer of XLTEK HDF5 files starts a new file.
+"""
+# Package Header #
+from ..header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import datetime
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects import BaseObject
+import numpy as np
+
+# Local Packages #
+
+
+# Definitions #
+# Constants #
+DAY_NANOSECONDS: int = 86400 * 10**9
+
+
+# Classes #
+class XLTEKRolloverPolicy(BaseObject):
+    """Decides when a writer of XLTEK HDF5 files starts a new file, by duration, by day, or by size.
+
+    Durations and days are aligned to the local time of the data, so hourly files start on the hour and daily files
+    start at midnight, which is also where the day directories of the contents change. Because time boundaries are
+    known ahead of time, a writer can open the file which starts at the next boundary before the data reaches it.
+
+    Attributes:
+        duration: The duration in seconds of the files, None for no limit.
+        day: Determines if files end at local midnight.
+        max_bytes: The size in bytes which a file is ended at, None for no limit.
+
+    Args:
+        duration: The duration in seconds of the files, None for no limit.
+        day: Determines if files end at local midnight.
+        max_bytes: The size in bytes which a file is ended at, None for no limit.
+        init: Determines if this object will construct.
+        **kwargs: Keyword arguments for inheritance.
+    """
+
+    # Magic Methods #
+    # Construction/Destruction
+    def __init__(
+        self,
+        duration: float | None = None,
+        day: bool | None = None,
+        max_bytes: int | None = None,
+        *,
+        init: bool = True,
+        **kwargs: Any,
+    ) -> None:
+        # New Attributes #
+        self.duration: float | None = None
+        self.day: bool = False
+        self.max_bytes: int | None = None
+
+        # Parent Attributes #
+        super().__init__(init=False, **kwargs)
+
+        # Object Construction #
+        if init:
+            self.construct(duration=duration, day=day, max_bytes=max_bytes, **kwargs)
+
+    # Instance Methods #
+    # Constructors/Destructors
+    def construct(
+        self,
+        duration: float | None = None,
+        day: bool | None = None,
+        max_bytes: int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Constructs this object.
+
+        Args:
+            duration: The duration in seconds of the files, None for no limit.
+            day: Determines if files end at local midnight.
+            max_bytes: The size in bytes which a file is ended at, None for no limit.
+            **kwargs: Keyword arguments for inheritance.
+        """
+        if duration is not None:
+            if duration <= 0:
+                raise ValueError("The duration of the files must be positive.")
+            self.duration = duration
+
+        if day is not None:
+            self.day = day
+
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+
+        super().construct(**kwargs)
+
+    # Boundaries
+    @property
+    def periods(self) -> list[int]:
+        """The lengths in nanoseconds of the time periods which files are aligned to."""
+        periods = [] if self.duration is None else [int(self.duration * 10**9)]
+        return periods + [DAY_NANOSECONDS] if self.day else periods
+
+    @staticmethod
+    def local_offset(nanostamp: int, tzinfo: datetime.tzinfo | None = None) -> int:
+        """Gets the offset of local time from UTC at a time.
+
+        Args:
+            nanostamp: The time in nanoseconds.
+            tzinfo: The time zone of local time, None for UTC.
+
+        Returns:
+            The offset in nanoseconds.
+        """
+        if tzinfo is None:
+            return 0
+        offset = datetime.datetime.fromtimestamp(nanostamp / 10**9, tzinfo).utcoffset()
+        return 0 if offset is None else int(offset.total_seconds()) * 10**9
+
+    def local_to_utc(self, local: int, tzinfo: datetime.tzinfo | None = None) -> int:
+        """Converts a local time to UTC, using the offset at that time rather than the current one.
+
+        Args:
+            local: The local time in nanoseconds.
+            tzinfo: The time zone of local time, None for UTC.
+
+        Returns:
+            The time in UTC nanoseconds.
+        """
+        nanostamp = local - self.local_offset(local, tzinfo)
+        return local - self.local_offset(nanostamp, tzinfo)
+
+    def next_boundary(self, nanostamp: int, tzinfo: datetime.tzinfo | None = None) -> int | None:
+        """Finds the first time boundary after a time, where the file which contains the time ends.
+
+        Args:
+            nanostamp: The time in nanoseconds.
+            tzinfo: The time zone which boundaries are aligned in, None for UTC.
+
+        Returns:
+            The boundary in nanoseconds or None if files have no time limit.
+        """
+        periods = self.periods
+        if not periods:
+            return None
+        local = nanostamp + self.local_offset(nanostamp, tzinfo)
+        return min(self.local_to_utc((local // p + 1) * p, tzinfo) for p in periods)
+
+    def file_start(self, nanostamp: int, tzinfo: datetime.tzinfo | None = None) -> int:
+        """Finds the last time boundary at or before a time, where the file which contains the time starts.
+
+        Args:
+            nanostamp: The time in nanoseconds.
+            tzinfo: The time zone which boundaries are aligned in, None for UTC.
+
+        Returns:
+            The boundary in nanoseconds or the time itself if files have no time limit.
+        """
+        periods = self.periods
+        if not periods:
+            return nanostamp
+        local = nanostamp + self.local_offset(nanostamp, tzinfo)
+        return max(self.local_to_utc((local // p) * p, tzinfo) for p in periods)
+
+    @staticmethod
+    def split_index(nanostamps: np.ndarray, boundary: int | None) -> int:
+        """Finds the number of samples of a block which are before a boundary.
+
+        Args:
+            nanostamps: The sorted nanostamps of the block.
+            boundary: The boundary in nanoseconds, None for no boundary.
+
+        Returns:
+            The number of samples before the boundary.
+        """
+        if boundary is None:
+            return nanostamps.shape[0]
+        return int(np.searchsorted(nanostamps, boundary, side="left"))
+
+    def should_roll(self, nanostamp: int, boundary: int | None, n_bytes: int) -> bool:
+        """Checks if a sample must be written to a new file.
+
+        Args:
+            nanostamp: The time of the sample in nanoseconds.
+            boundary: The time boundary where the current file ends, None for no time limit.
+            n_bytes: The size of the current file in bytes.
+
+        Returns:
+            If the sample must be written to a new file.
+        """
+        return (boundary is not None and nanostamp >= boundary) or (
+            self.max_bytes is not None and n_bytes >= self.max_bytes
+        )
@@ -0,0 +1,299 @@
+"""xltektaskmetrics.py
+Counters, gauges, and histograms for the acquisition tasks.
+"""
+# Package Header #
+from .header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from collections.abc import Iterator
+from contextlib import contextmanager
+import logging
+import math
+import time
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects import BaseObject
+import numpy as np
+
+# Local Packages #
+
+
+# Definitions #
+# Classes #
+class XLTEKHistogram(BaseObject):
+    """A histogram of values, such as latencies, with buckets which double in width to keep recording constant time.
+
+    Percentiles are the upper edge of the bucket they fall in, so they are within a factor of two above the value.
+
+    Class Attributes:
+        default_minimum: The default upper edge of the first bucket, a microsecond for latencies.
+        n_buckets: The number of buckets, the last holds every value above the others.
+
+    Attributes:
+        minimum: The upper edge of the first bucket.
+        counts: The number of values in each bucket.
+        count: The number of values recorded.
+        total: The sum of the values recorded.
+        maximum: The largest value recorded.
+
+    Args:
+        minimum: The upper edge of the first bucket.
+        init: Determines if this object will construct.
+        **kwargs: Keyword arguments for inheritance.
+    """
+
+    default_minimum: float = 1e-6
+    n_buckets: int = 32
+
+    # Magic Methods #
+    # Construction/Destruction
+    def __init__(self, minimum: float | None = None, *, init: bool = True, **kwargs: Any) -> None:
+        # New Attributes #
+        self.minimum: float = self.default_minimum
+        self.counts: np.ndarray = np.zeros(self.n_buckets, dtype=np.int64)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.maximum: float = 0.0
+
+        # Parent Attributes #
+        super().__init__(init=False, **kwargs)
+
+        # Object Construction #
+        if init:
+            self.construct(minimum=minimum, **kwargs)
+
+    # Instance Methods #
+    # Constructors/Destructors
+    def construct(self, minimum: float | None = None, **kwargs: Any) -> None:
+        """Constructs this object.
+
+        Args:
+            minimum: The upper edge of the first bucket.
+            **kwargs: Keyword arguments for inheritance.
+        """
+        if minimum is not None:
+            self.minimum = minimum
+
+        super().construct(**kwargs)
+
+    # Recording
+    def record(self, value: float) -> None:
+        """Records a value.
+
+        Args:
+            value: The value to record.
+        """
+        index = 0 if value <= self.minimum else math.ceil(math.log2(value / self.minimum))
+        self.counts[min(index, self.n_buckets - 1)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def percentile(self, q: float) -> float:
+        """Gets the upper edge of the bucket which a percentile of the values falls in.
+
+        Args:
+            q: The percentile between 0 and 100.
+
+        Returns:
+            The value, no more than the largest value recorded.
+        """
+        if self.count == 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), math.ceil(self.count * q / 100), side="left"))
+        return min(self.minimum * 2.0**index, self.maximum)
+
+    def snapshot(self) -> dict[str, float]:
+        """Summarizes the values.
+
+        Returns:
+            The count, mean, 50th, 90th, and 99th percentiles, and maximum of the values.
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.maximum,
+        }
+
+
+class XLTEKTaskMetrics(BaseObject):
+    """Counters, gauges, and histograms of a task, readable as a snapshot and optionally logged periodically.
+
+    Counters only increase and are reported with their rates since the metrics started, such as samples per second.
+    Gauges hold the last value set, such as the depth of a queue. Histograms hold the distribution of latencies, such
+    as the time of each append, or of other values, such as the sizes of batches. Logging is checked whenever a value
+    is recorded, so it needs no thread of its own, and it also works for tasks which run in another process, where the
+    snapshot cannot be read directly.
+
+    Class Attributes:
+        default_logger: The default logger to log the snapshots to.
+
+    Attributes:
+        name: The name of the task the metrics are of.
+        log_interval: The time in seconds between logged snapshots, None to not log.
+        logger: The logger to log the snapshots to.
+        counters: The counters by name.
+        gauges: The gauges by name.
+        histograms: The histograms by name.
+        start_time: The time when the metrics started.
+        last_log: The time when the last snapshot was logged.
+
+    Args:
+        name: The name of the task the metrics are of.
+        log_interval: The time in seconds between logged snapshots, None to not log.
+        logger: The logger to log the snapshots to.
+        init: Determines if this object will construct.
+        **kwargs: Keyword arguments for inheritance.
+    """
+
+    default_logger: logging.Logger = logging.getLogger(__name__)
+
+    # Magic Methods #
+    # Construction/Destruction
+    def __init__(
+        self,
+        name: str | None = None,
+        log_interval: float | None = None,
+        logger: logging.Logger | None = None,
+        *,
+        init: bool = True,
+        **kwargs: Any,
+    ) -> None:
+        # New Attributes #
+        self.name: str = ""
+        self.log_interval: float | None = None
+        self.logger: logging.Logger = self.default_logger
+
+        self.counters: dict[str, float] = {}
+        self.gauges: dict[str, float] = {}
+        self.histograms: dict[str, XLTEKHistogram] = {}
+        self.start_time: float = time.perf_counter()
+        self.last_log: float = self.start_time
+
+        # Parent Attributes #
+        super().__init__(init=False, **kwargs)
+
+        # Object Construction #
+        if init:
+            self.construct(name=name, log_interval=log_interval, logger=logger, **kwargs)
+
+    # Instance Methods #
+    # Constructors/Destructors
+    def construct(
+        self,
+        name: str | None = None,
+        log_interval: float | None = None,
+        logger: logging.Logger | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Constructs this object.
+
+        Args:
+            name: The name of the task the metrics are of.
+            log_interval: The time in seconds between logged snapshots, None to not log.
+            logger: The logger to log the snapshots to.
+            **kwargs: Keyword arguments for inheritance.
+        """
+        if name is not None:
+            self.name = name
+
+        if log_interval is not None:
+            self.log_interval = log_interval
+
+        if logger is not None:
+            self.logger = logger
+
+        super().construct(**kwargs)
+
+    def reset(self) -> None:
+        """Clears all the metrics and restarts their rates."""
+        self.counters.clear()
+        self.gauges.clear()
+        self.histograms.clear()
+        self.start_time = self.last_log = time.perf_counter()
+
+    # Recording
+    def count(self, name: str, amount: float = 1) -> None:
+        """Increases a counter.
+
+        Args:
+            name: The name of the counter.
+            amount: The amount to increase the counter by.
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+        self.log_due()
+
+    def gauge(self, name: str, value: float) -> None:
+        """Sets a gauge.
+
+        Args:
+            name: The name of the gauge.
+            value: The value of the gauge.
+        """
+        self.gauges[name] = value
+
+    def record(self, name: str, value: float, minimum: float | None = None) -> None:
+        """Records a value in a histogram, creating the histogram if it does not exist.
+
+        Args:
+            name: The name of the histogram.
+            value: The value to record, latencies are in seconds.
+            minimum: The upper edge of the first bucket when the histogram is created, None for a microsecond.
+        """
+        histogram = self.histograms.get(name, None)
+        if histogram is None:
+            self.histograms[name] = histogram = XLTEKHistogram(minimum=minimum)
+        histogram.record(value)
+        self.log_due()
+
+    @contextmanager
+    def time(self, name: str) -> Iterator[None]:
+        """Records the time the body of a with statement takes in a histogram.
+
+        Args:
+            name: The name of the histogram.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    # Reporting
+    def snapshot(self) -> dict[str, Any]:
+        """Creates a snapshot of the metrics.
+
+        Returns:
+            The elapsed time, counters, rates of the counters per second, gauges, and histogram summaries.
+        """
+        elapsed = time.perf_counter() - self.start_time
+        return {
+            "name": self.name,
+            "elapsed": elapsed,
+            "counters": self.counters.copy(),
+            "rates": {name: value / elapsed if elapsed > 0 else 0.0 for name, value in self.counters.items()},
+            "gauges": self.gauges.copy(),
+            "histograms": {name: histogram.snapshot() for name, histogram in self.histograms.items()},
+        }
+
+    def log_due(self) -> None:
+        """Logs a snapshot if the log interval has passed since the last one."""
+        if self.log_interval is not None and time.perf_counter() - self.last_log >= self.log_interval:
+            self.log()
+
+    def log(self) -> None:
+        """Logs a snapshot of the metrics."""
+        self.last_log = time.perf_counter()
+        self.logger.info("%s metrics: %s", self.name, self.snapshot())
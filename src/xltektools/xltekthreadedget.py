@@ -0,0 +1,88 @@
+"""xltekthreadedget.py
+A get from a blocking queue in a worker thread, which keeps its item when the awaiting task is cancelled.
+"""
+# Package Header #
+from .header import *
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from asyncio import CancelledError
+from asyncio import Future
+from asyncio import ensure_future
+from asyncio import shield
+from asyncio import to_thread
+from typing import Any
+
+# Third-Party Packages #
+from baseobjects import BaseObject
+
+# Local Packages #
+
+
+# Definitions #
+# Classes #
+class XLTEKThreadedGet(BaseObject):
+    """A get from a blocking queue in a worker thread, which keeps its item when the awaiting task is cancelled.
+
+    Cancelling a task which awaits a queue get in a worker thread does not stop the thread, so the thread can still
+    take an item from the queue after the task has stopped waiting for it. The get is awaited through a shield and
+    kept until it returns, so when the task is cancelled the next get awaits the same get and returns its item.
+
+    Attributes:
+        pending: The get which has not returned its item yet, None when there is none.
+
+    Args:
+        init: Determines if this object will construct.
+        **kwargs: Keyword arguments for inheritance.
+    """
+
+    # Magic Methods #
+    # Construction/Destruction
+    def __init__(self, *, init: bool = True, **kwargs: Any) -> None:
+        # New Attributes #
+        self.pending: Future | None = None
+
+        # Parent Attributes #
+        super().__init__(init=False, **kwargs)
+
+        # Object Construction #
+        if init:
+            self.construct(**kwargs)
+
+    # Instance Methods #
+    async def get(self, queue: Any, timeout: float | None = None) -> Any:
+        """Gets an item from a queue in a worker thread, continuing the previous get if it did not return its item.
+
+        Args:
+            queue: The queue to get the item from.
+            timeout: The longest time in seconds to wait for an item when a new get is started.
+
+        Returns:
+            The item from the queue.
+
+        Raises:
+            Empty: If the queue had no item within the timeout.
+        """
+        if self.pending is None or self.pending.cancelled():
+            self.pending = ensure_future(to_thread(queue.get, block=True, timeout=timeout))
+
+        pending = self.pending
+        try:
+            item = await shield(pending)
+        except CancelledError:
+            if pending.cancelled():
+                self.pending = None
+            raise
+        except BaseException:
+            self.pending = None
+            raise
+
+        self.pending = None
+        return item
@@ -0,0 +1,465 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" test_hdf5xltek_performance.py
+Benchmarks the compression profiles and chunk layouts of XLTEKHDF5 files on synthetic iEEG data.
+"""
+# Package Header #
+from src.xltektools.header import *
+
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import datetime
+import multiprocessing
+import pathlib
+import queue
+import threading
+import time
+
+import numpy as np
+import pytest
+
+# Third-Party Packages #
+from dspobjects.time import Timestamp
+import h5py
+
+# Local Packages #
+from src.xltektools.xltekhdf5 import XLTEKHDF5
+from src.xltektools.xltekhdf5 import XLTEKChunkPlanner
+from src.xltektools.xltekhdf5 import XLTEKHDF5_1, XLTEKHDF5_2
+from src.xltektools.xltekhdf5 import XLTEKImplicitTimeAxis
+from src.xltektools.xltekhdf5 import XLTEKSharedRingBuffer
+from src.xltektools.xltekhdf5 import XLTEKBackpressurePolicy
+
+
+# Definitions #
+# Functions #
+@pytest.fixture
+def tmp_dir(tmpdir):
+    """A pytest fixture that turn the tmpdir into a Path object."""
+    return pathlib.Path(tmpdir)
+
+
+def synthetic_ieeg(n_channels: int = 256, sample_rate: int = 1000, seconds: int = 60, seed: int = 0) -> np.ndarray:
+    """Creates iEEG-like data: integer microvolt values of a low-passed random walk with line noise."""
+    rng = np.random.default_rng(seed)
+    n_samples = sample_rate * seconds
+    walk = np.cumsum(rng.normal(0.0, 2.0, (n_samples, n_channels)), axis=0)
+    walk -= np.linspace(walk[0], walk[-1], n_samples)
+    line = 20.0 * np.sin(2 * np.pi * 60.0 * np.arange(n_samples) / sample_rate)[:, None]
+    return np.round(walk + line + rng.normal(0.0, 5.0, (n_samples, n_channels)))
+
+
+def produce_blocks(queue, blocks: int, block: np.ndarray, ring: XLTEKSharedRingBuffer | None = None) -> None:
+    """Sends blocks to a queue, through a shared ring buffer if one is given."""
+    nanostamps = np.arange(block.shape[0], dtype=np.int64)
+    for i in range(blocks):
+        data = block.copy()
+        data[0, 0] = i
+        if ring is None:
+            queue.put((data, nanostamps + i))
+        else:
+            queue.put((ring.put(data, nanostamps + i), data.shape[0]))
+    queue.put(None)
+
+
+# Classes #
+
+
+class TestXLTEKHDF5Compression:
+    class_ = XLTEKHDF5.get_latest_version_class()
+    n_channels = 256
+    sample_rate = 1000
+    seconds = 60
+    start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+    @pytest.fixture(scope="class")
+    def data(self):
+        return synthetic_ieeg(self.n_channels, self.sample_rate, self.seconds)
+
+    @pytest.mark.parametrize("profile", tuple(XLTEKHDF5.compression_profiles))
+    def test_compression_profile(self, tmp_dir, data, profile):
+        path = tmp_dir / f"{profile}.h5"
+        start_ns = int(self.start.timestamp() * 10**9)
+        nanostamps = start_ns + np.arange(data.shape[0], dtype=np.int64) * (10**9 // self.sample_rate)
+
+        write_start = time.perf_counter()
+        f_obj = self.class_(file=path, s_id="EC_test", mode="a", create=True, construct=True, compression=profile)
+        f_obj.time_axis.components["axis"].sample_rate = self.sample_rate
+        f_obj.attributes["start_id"] = start_ns
+        f_obj.data.set_data(data, component_kwargs={"timeseries": {"data": nanostamps}})
+        f_obj.close()
+        write_time = time.perf_counter() - write_start
+
+        read_start = time.perf_counter()
+        f_obj = self.class_(file=path)
+        assert f_obj.compression == profile
+        read = f_obj.data[...]
+        f_obj.close()
+        read_time = time.perf_counter() - read_start
+
+        mb = data.nbytes / 1e6
+        ratio = data.nbytes / path.stat().st_size
+        print(
+            f"\n{profile:>14}: write {mb / write_time:8.1f} MB/s, read {mb / read_time:8.1f} MB/s, ratio {ratio:5.2f}"
+        )
+        assert np.array_equal(read, data)
+
+
+class TestXLTEKHDF5Chunking:
+    class_ = XLTEKHDF5_1
+    n_channels = 256
+    sample_rate = 1000
+    seconds = 180
+    compression = "gzip-1"
+    query_seconds = 60
+    query_channels = 50
+
+    @pytest.fixture(scope="class")
+    def data(self):
+        return synthetic_ieeg(self.n_channels, self.sample_rate, self.seconds)
+
+    def create_file(self, path, data, chunks=None):
+        nanostamps = np.arange(data.shape[0], dtype=np.int64) * (10**9 // self.sample_rate)
+        f_obj = self.class_(
+            file=path, s_id="EC_test", mode="a", create=True, construct=True, chunks=chunks, compression=self.compression
+        )
+        f_obj.time_axis.components["axis"].sample_rate = self.sample_rate
+        f_obj.attributes["start_id"] = 0
+        f_obj.data.set_data(data, component_kwargs={"timeseries": {"data": nanostamps}})
+        f_obj.close()
+
+    def query_chunks(self, chunks, start, channel):
+        """Counts the bytes of the chunks which a query decompresses."""
+        n_samples = self.query_seconds * self.sample_rate
+        n_time = (start + n_samples - 1) // chunks[0] - start // chunks[0] + 1
+        n_channel = (channel + self.query_channels - 1) // chunks[1] - channel // chunks[1] + 1
+        return n_time * n_channel * chunks[0] * chunks[1] * 4
+
+    def test_query_layouts(self, tmp_dir, data):
+        planner = XLTEKChunkPlanner()
+        start = 123 * self.sample_rate
+        channel = 100
+        stop = start + self.query_seconds * self.sample_rate
+        for name, chunks in (("guessed", None), ("planned", planner.plan_data_chunks(self.sample_rate, data.shape[1]))):
+            path = tmp_dir / f"{name}.h5"
+            self.create_file(path, data, chunks)
+
+            f_obj = self.class_(file=path)
+            dataset = f_obj.data._dataset
+            read_start = time.perf_counter()
+            query = dataset[start:stop, channel:channel + self.query_channels]
+            read_time = time.perf_counter() - read_start
+            decompressed = self.query_chunks(dataset.chunks, start, channel)
+            f_obj.close()
+
+            print(
+                f"\n{name:>8}: chunks {dataset.chunks}, "
+                f"{decompressed / 1e6:8.1f} MB decompressed, {read_time * 1000:8.1f} ms per query"
+            )
+            assert np.array_equal(query, data[start:stop, channel:channel + self.query_channels])
+
+
+class TestXLTEKHDF5ImplicitTime:
+    n_channels = 64
+    sample_rate = 1000
+    seconds = 600
+    gap_index = 200_000
+    start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+    def create_file(self, class_, path, data, nanostamps):
+        f_obj = class_(file=path, s_id="EC_test", mode="a", create=True, construct=True, compression="lzf")
+        f_obj.time_axis.components["axis"].sample_rate = self.sample_rate
+        f_obj.time_axis.components["axis"].set_time_zone(self.start.tzinfo)
+        f_obj.attributes["start_id"] = int(nanostamps[0])
+        f_obj.data.set_data(data, component_kwargs={"timeseries": {"data": nanostamps}})
+        f_obj.close()
+
+    def test_time_axis(self, tmp_dir):
+        data = np.zeros((self.seconds * self.sample_rate, self.n_channels), dtype=np.float32)
+        start_ns = int(self.start.timestamp() * 10**9)
+        nanostamps = start_ns + np.arange(data.shape[0], dtype=np.int64) * (10**9 // self.sample_rate)
+        nanostamps[self.gap_index:] += 3 * 10**9
+
+        results = {}
+        for class_ in (XLTEKHDF5_1, XLTEKHDF5_2):
+            path = tmp_dir / f"{class_.__name__}.h5"
+            self.create_file(class_, path, data, nanostamps)
+
+            f_obj = class_(file=path)
+            time_axis = f_obj.time_axis.components["axis"]
+            read_start = time.perf_counter()
+            times = [time_axis.get_nanostamp(i) for i in range(0, data.shape[0], 997)]
+            gap_time = Timestamp.fromnanostamp(int(nanostamps[self.gap_index + 5]))
+            index = time_axis.find_time_index(gap_time, approx=False)
+            read_time = time.perf_counter() - read_start
+            results[class_.__name__] = (path.stat().st_size, read_time, times, index, np.asarray(time_axis[...]))
+            f_obj.close()
+
+        v1, v2 = results["XLTEKHDF5_1"], results["XLTEKHDF5_2"]
+        assert v2[2] == v1[2] and v2[3] == v1[3] and np.array_equal(v2[4], nanostamps)
+        assert v2[0] < v1[0]
+
+        header = XLTEKHDF5.probe(tmp_dir / "XLTEKHDF5_2.h5")
+        assert header.end_id == start_ns + (data.shape[0] - 1) * (10**9 // self.sample_rate)
+        assert header.end == XLTEKHDF5.probe(tmp_dir / "XLTEKHDF5_1.h5").end
+
+        for name, (size, read_time, *_) in results.items():
+            print(f"\n{name}: {size / 1e6:8.2f} MB, {read_time / len(v1[2]) * 10**6:8.2f} us per time")
+
+    def test_jitter(self):
+        period = 10**9 // self.sample_rate
+        rng = np.random.default_rng(0)
+        n_samples = self.seconds * self.sample_rate
+        nanostamps = np.arange(n_samples, dtype=np.int64) * period
+        nanostamps += rng.integers(-period // 4, period // 4, n_samples)
+        nanostamps[self.gap_index:] += 3 * 10**9
+        nanostamps[self.gap_index + 100_000:] -= 2 * period
+
+        time_axis = XLTEKImplicitTimeAxis(sample_rate=self.sample_rate, length=n_samples)
+        find_start = time.perf_counter()
+        time_axis.set_nanostamps(nanostamps)
+        find_time = time.perf_counter() - find_start
+        assert time_axis.discontinuities[:, 0].tolist() == [self.gap_index, self.gap_index + 100_000]
+        assert np.abs(time_axis[...] - nanostamps).max() < period
+
+        print(f"\nfound discontinuities in {find_time * 1000:8.2f} ms for {n_samples} jittered samples")
+
+
+class TestXLTEKHDF5Growth:
+    n_channels = 64
+    sample_rate = 1000
+    block_samples = 100
+    n_blocks = 600
+
+    def append_blocks(self, class_, path, data, nanostamps, growth=None):
+        f_obj = class_(file=path, s_id="EC_test", mode="a", create=True, construct=True, growth=growth)
+        f_obj.time_axis.components["axis"].sample_rate = self.sample_rate
+        f_obj.attributes["start_id"] = int(nanostamps[0])
+        if growth is not None:
+            f_obj.reserve(0)
+        f_obj.swmr_mode = True
+        append_start = time.perf_counter()
+        for i in range(0, data.shape[0], self.block_samples):
+            block = slice(i, i + self.block_samples)
+            if growth is None:
+                f_obj.data.append(data[block], component_kwargs={"timeseries": {"data": nanostamps[block]}})
+            else:
+                f_obj.append_samples(data[block], nanostamps[block])
+            f_obj.flush()
+        append_time = time.perf_counter() - append_start
+        return f_obj, append_time
+
+    @pytest.mark.parametrize("class_", [XLTEKHDF5_1, XLTEKHDF5_2])
+    def test_append(self, tmp_dir, class_):
+        n_samples = self.block_samples * self.n_blocks
+        data = np.random.default_rng(0).normal(size=(n_samples, self.n_channels)).astype(np.float32)
+        nanostamps = np.arange(n_samples, dtype=np.int64) * (10**9 // self.sample_rate)
+        nanostamps[n_samples // 2:] += 10**9
+
+        times = {}
+        for growth in (None, "geometric", "fixed"):
+            path = tmp_dir / f"{growth}.h5"
+            f_obj, times[growth] = self.append_blocks(class_, path, data, nanostamps, growth)
+            assert f_obj.get_length() == n_samples
+            assert XLTEKHDF5.probe(path).shape == (n_samples, self.n_channels)
+            f_obj.trim()
+            f_obj.close()
+
+            f_obj = class_(file=path)
+            assert f_obj.data.shape == (n_samples, self.n_channels) and "length" not in f_obj.data.attributes
+            assert np.array_equal(f_obj.data[...], data)
+            assert np.array_equal(f_obj.time_axis[...], nanostamps)
+            f_obj.close()
+
+        for growth, append_time in times.items():
+            print(f"\n{class_.__name__} {growth}: {append_time / self.n_blocks * 10**6:8.2f} us per append")
+
+
+class TestXLTEKSharedRingBuffer:
+    n_channels = 256
+    block_samples = 1024
+    n_blocks = 2000
+
+    def consume_blocks(self, ring=None):
+        queue = multiprocessing.Queue()
+        block = np.ones((self.block_samples, self.n_channels), dtype=np.float32)
+        producer = multiprocessing.Process(target=produce_blocks, args=(queue, self.n_blocks, block, ring))
+        firsts = []
+        transfer_start = time.perf_counter()
+        producer.start()
+        while (item := queue.get()) is not None:
+            if ring is None:
+                data, nanostamps = item
+                firsts.append((data[0, 0], nanostamps[0]))
+            else:
+                data, nanostamps = ring.get(*item)
+                firsts.append((data[0, 0], nanostamps[0]))
+                ring.release(*item)
+        transfer_time = time.perf_counter() - transfer_start
+        producer.join()
+        assert firsts == [(i, i) for i in range(self.n_blocks)]
+        return transfer_time
+
+    def test_transfer(self):
+        ring = XLTEKSharedRingBuffer(capacity=self.block_samples * 8, n_channels=self.n_channels)
+        queue_time = self.consume_blocks()
+        ring_time = self.consume_blocks(ring)
+        assert len(ring) == 0
+        ring.close()
+
+        block_mb = self.block_samples * self.n_channels * 4 / 1e6
+        print(
+            f"\nqueue {queue_time / self.n_blocks * 10**6:8.2f} us, "
+            f"shared ring buffer {ring_time / self.n_blocks * 10**6:8.2f} us per {block_mb:.2f} MB block"
+        )
+
+
+class TestXLTEKChunkCompressor:
+    class_ = XLTEKHDF5.get_latest_version_class()
+    n_channels = 64
+    sample_rate = 1000
+    seconds = 60
+    block_samples = 5000
+
+    def append_blocks(self, path, data, nanostamps, compress_workers=None):
+        f_obj = self.class_(
+            file=path,
+            s_id="EC_test",
+            mode="a",
+            create=True,
+            construct=True,
+            compression="shuffle-gzip",
+            chunks=(1000, 32),
+            compress_workers=compress_workers,
+        )
+        f_obj.time_axis.components["axis"].sample_rate = self.sample_rate
+        append_start = time.perf_counter()
+        for i in range(0, data.shape[0], self.block_samples):
+            f_obj.append_samples(data[i:i + self.block_samples], nanostamps[i:i + self.block_samples])
+        append_time = time.perf_counter() - append_start
+        f_obj.close()
+        return append_time
+
+    def test_direct_chunks(self, tmp_dir):
+        data = synthetic_ieeg(self.n_channels, self.sample_rate, self.seconds).astype(np.float32)
+        nanostamps = np.arange(data.shape[0], dtype=np.int64) * (10**9 // self.sample_rate)
+
+        hdf5_time = self.append_blocks(tmp_dir / "hdf5.h5", data, nanostamps)
+        workers = multiprocessing.cpu_count()
+        direct_time = self.append_blocks(tmp_dir / "direct.h5", data, nanostamps, compress_workers=workers)
+
+        with h5py.File(tmp_dir / "hdf5.h5", "r") as hdf5_file, h5py.File(tmp_dir / "direct.h5", "r") as direct_file:
+            hdf5_data, direct_data = hdf5_file["ECoG"], direct_file["ECoG"]
+            assert np.array_equal(direct_data[...], data)
+            assert direct_data.id.get_storage_size() == hdf5_data.id.get_storage_size()
+            for offset in ((0, 0), (30000, 32), (59000, 0)):
+                assert direct_data.id.read_direct_chunk(offset) == hdf5_data.id.read_direct_chunk(offset)
+
+        print(f"\nHDF5 filters {hdf5_time:8.2f} s, {workers} compression threads {direct_time:8.2f} s")
+
+
+class TestXLTEKBackpressurePolicy:
+    n_blocks = 200
+    block_samples = 1000
+
+    def consume(self, policy, write_queue, indices, peaks):
+        while (item := write_queue.get())[0] is not None:
+            data, nanostamps, info = item
+            time.sleep(0.001)
+            indices.append(info["index"])
+            peaks.append(policy.queued_bytes)
+            policy.release(data.nbytes + nanostamps.nbytes)
+
+    @pytest.mark.parametrize("mode", ["block", "spill", "drop"])
+    def test_modes(self, tmp_dir, mode):
+        data = np.zeros((self.block_samples, 8), dtype=np.float32)
+        nanostamps = np.zeros(self.block_samples, dtype=np.int64)
+        block_bytes = data.nbytes + nanostamps.nbytes
+        watermarks = []
+        policy = XLTEKBackpressurePolicy(
+            mode=mode,
+            max_bytes=10 * block_bytes,
+            on_high_watermark=watermarks.append,
+            spill_dir=tmp_dir,
+        )
+        write_queue, indices, peaks = queue.Queue(), [], []
+        consumer = threading.Thread(target=self.consume, args=(policy, write_queue, indices, peaks))
+        consumer.start()
+
+        put_start = time.perf_counter()
+        for i in range(self.n_blocks):
+            policy.put(write_queue, data, nanostamps, {"index": i})
+        put_time = time.perf_counter() - put_start
+        policy.drain(write_queue, wait=True)
+        write_queue.put((None, None, None))
+        consumer.join()
+
+        counts = policy.snapshot()
+        assert max(peaks) <= policy.max_bytes
+        assert indices == sorted(indices)
+        assert len(indices) + counts["dropped_blocks"] == self.n_blocks
+        assert len(watermarks) >= 1
+        assert not list(tmp_dir.glob("*.spill"))
+        print(f"\n{mode}: {put_time / self.n_blocks * 1e3:6.3f} ms per put, {counts}")
+
+
+class TestXLTEKHDF5Probe:
+    class_ = XLTEKHDF5.get_latest_version_class()
+    n_channels = 64
+    sample_rate = 1000
+    seconds = 10
+    n_files = 20
+    start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+    @pytest.fixture(scope="class")
+    def paths(self, tmp_path_factory):
+        tmp_dir = tmp_path_factory.mktemp("probe")
+        data = synthetic_ieeg(self.n_channels, self.sample_rate, self.seconds)
+        start_ns = int(self.start.timestamp() * 10**9)
+        paths = []
+        for i in range(self.n_files):
+            path = tmp_dir / f"{i}.h5"
+            file_start = start_ns + i * self.seconds * 10**9
+            nanostamps = file_start + np.arange(data.shape[0], dtype=np.int64) * (10**9 // self.sample_rate)
+            f_obj = self.class_(file=path, s_id="EC_test", mode="a", create=True, construct=True, compression="lzf")
+            f_obj.time_axis.components["axis"].sample_rate = self.sample_rate
+            f_obj.attributes["start_id"] = file_start
+            f_obj.data.set_data(data, component_kwargs={"timeseries": {"data": nanostamps}})
+            f_obj.close()
+            paths.append(path)
+        return paths
+
+    def test_probe(self, paths):
+        probe_start = time.perf_counter()
+        headers = [XLTEKHDF5.probe(path) for path in paths]
+        probe_time = time.perf_counter() - probe_start
+
+        construct_start = time.perf_counter()
+        for path, header in zip(paths, headers):
+            f_obj = XLTEKHDF5.new_validated(path)
+            assert header.start_id == f_obj.start_id
+            assert header.end_id == f_obj.end_id
+            assert header.end == f_obj.end_datetime
+            assert header.shape == f_obj.data.shape
+            assert header.sample_rate == f_obj.sample_rate
+            f_obj.close()
+        construct_time = time.perf_counter() - construct_start
+
+        print(
+            f"\nprobe {probe_time / len(paths) * 1000:8.2f} ms per file, "
+            f"construct {construct_time / len(paths) * 1000:8.2f} ms per file"
+        )
+        assert XLTEKHDF5.probe(paths[0].with_name("missing.h5")) is None
+
+
+# Main #
+if __name__ == "__main__":
+    pytest.main(["-v", "-s"])
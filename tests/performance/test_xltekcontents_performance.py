@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" test_xltekcontents_performance.py
+Benchmarks the in-memory structures built from XLTEK contents tables.
+"""
+# Package Header #
+from src.xltektools.header import *
+
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import time
+import uuid
+
+import numpy as np
+import pytest
+
+# Third-Party Packages #
+from dspobjects.time import Timestamp
+
+# Local Packages #
+from src.xltektools.xltekhdf5 import XLTEKHDF5
+from src.xltektools.xltekcdfs.arrays import XLTEKContentsIndex, XLTEKContentsLeafContainer, XLTEKFilePool
+from tests.test_xltekcontents import HOUR, create_files
+
+
+# Definitions #
+# Classes #
+class TestXLTEKContentsIndex:
+    n_files = 5000
+    sample_rate = 1000.0
+    gap_index = 2500
+    gap_hours = 10
+
+    @pytest.fixture(scope="class")
+    def rows(self):
+        starts = np.arange(self.n_files, dtype=np.int64) * HOUR
+        starts[self.gap_index:] += self.gap_hours * HOUR
+        ends = starts + HOUR - int(10**9 / self.sample_rate)
+        return [
+            (uuid.uuid4(), int(s), int(e), int(s), int(e), self.sample_rate, 0, 0, "3600000, 64", f"{i}.h5", 0)
+            for i, (s, e) in enumerate(zip(starts, ends))
+        ]
+
+    def test_lookup(self, rows):
+        build_start = time.perf_counter()
+        index = XLTEKContentsIndex(rows=reversed(rows))
+        build_time = time.perf_counter() - build_start
+
+        assert list(index.overlapping(int(1.5 * HOUR), 3 * HOUR)) == [1, 2, 3]
+        assert list(index.overlapping_paths(int(2499.5 * HOUR), 2505 * HOUR)) == ["2499.h5"]
+        assert index.find(int(2.5 * HOUR)) == 2
+        assert index.find((self.gap_index + 1) * HOUR) is None
+        assert index.gaps().tolist() == [[self.gap_index * HOUR, (self.gap_index + self.gap_hours) * HOUR]]
+        assert index.covered_duration() == self.n_files * HOUR
+        assert index.covered_duration(0, 10 * HOUR) == 10 * HOUR
+
+        n_lookups = 10000
+        lookup_start = time.perf_counter()
+        for i in range(n_lookups):
+            index.overlapping(i * HOUR, i * HOUR + 600 * 10**9)
+        lookup_time = time.perf_counter() - lookup_start
+
+        print(
+            f"\nbuild {build_time * 1000:8.2f} ms for {self.n_files} files, "
+            f"lookup {lookup_time / n_lookups * 10**6:8.2f} us per window"
+        )
+
+    def test_cache(self, tmp_path, rows):
+        index = XLTEKContentsIndex(rows=rows)
+        path = tmp_path / "contents_index.npz"
+
+        save_start = time.perf_counter()
+        index.save(path)
+        save_time = time.perf_counter() - save_start
+
+        load_start = time.perf_counter()
+        loaded = XLTEKContentsIndex()
+        loaded.load(path)
+        load_time = time.perf_counter() - load_start
+
+        assert list(loaded.ids) == list(index.ids)
+        assert list(loaded.paths) == list(index.paths)
+        assert np.array_equal(loaded.covered_end_ids, index.covered_end_ids)
+        assert loaded.as_entries()[0]["shape"] == (3600000, 64)
+
+        new_row = (rows[0][0], *rows[0][1:9], "replaced.h5", 1)
+        loaded.merge_rows([new_row])
+        assert len(loaded) == self.n_files
+        assert loaded.paths[0] == "replaced.h5"
+        assert loaded.last_update_id == 1
+
+        print(f"\nsave {save_time * 1000:8.2f} ms, load {load_time * 1000:8.2f} ms for {self.n_files} files")
+
+
+class TestXLTEKFilePool:
+    class_ = XLTEKHDF5.get_latest_version_class()
+    n_files = 16
+    capacity = 4
+
+    @pytest.fixture(scope="class")
+    def paths(self, tmp_path_factory):
+        return create_files(tmp_path_factory.mktemp("pool"), self.n_files)
+
+    def test_bounded_scan(self, paths):
+        pool = XLTEKFilePool(capacity=self.capacity)
+        files = []
+        scan_start = time.perf_counter()
+        for _ in range(3):
+            for path in paths:
+                file = pool.get_file(path, self.class_)
+                assert file.data.shape == (1000, 8)
+                assert len(pool) <= self.capacity
+                files.append(file)
+        scan_time = time.perf_counter() - scan_start
+
+        assert not files[0]
+        assert all(pool.is_open(path) for path in paths[-self.capacity:])
+        assert pool.get_file(paths[-1], self.class_) is files[-1]
+
+        pool.close()
+        assert len(pool) == 0 and not files[-1]
+        print(f"\nscan {scan_time / len(files) * 1000:8.2f} ms per file with {self.capacity} open files")
+
+
+class TestXLTEKContentsLeaf:
+    n_samples = 1000
+
+    def test_metadata_without_opening(self, tmp_path):
+        path = create_files(tmp_path, 1, self.n_samples)[0]
+        header = XLTEKHDF5.probe(path)
+        leaf = XLTEKContentsLeafContainer(
+            path=path,
+            shape=header.shape,
+            axis=header.axis,
+            sample_rate=header.sample_rate,
+            start=header.start,
+            end=header.end,
+            tzinfo=header.start.tzinfo,
+        )
+
+        lookup_start = time.perf_counter()
+        indices = [leaf.find_time_index(Timestamp.fromnanostamp(i * 999_999, tz=leaf.tzinfo)) for i in range(1000)]
+        nanostamps = leaf.get_nanostamps()
+        lookup_time = time.perf_counter() - lookup_start
+        assert leaf.is_uniform() and not leaf.is_open
+        assert leaf.shape == header.shape and leaf.end_nanostamp == header.end_id
+
+        time_axis = leaf.time_axis
+        assert leaf.is_open
+        assert indices == [time_axis.find_time_index(Timestamp.fromnanostamp(i * 999_999)) for i in range(1000)]
+        assert np.array_equal(nanostamps, time_axis.nanostamps[...])
+        leaf.close()
+
+        print(f"\nlookup {lookup_time / len(indices) * 10**6:8.2f} us per time without opening the file")
+
+
+# Main #
+if __name__ == "__main__":
+    pytest.main(["-v", "-s"])
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" test_xltekedfexport_performance.py
+Benchmarks exporting XLTEK data to EDF files.
+"""
+# Package Header #
+from src.xltektools.header import *
+
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import time
+
+import numpy as np
+import pytest
+
+# Third-Party Packages #
+from proxyarrays import ContainerProxyArray, ProxyArray
+from pyedflib import FILETYPE_BDFPLUS
+from pyedflib import FILETYPE_EDFPLUS
+from pyedflib import EdfReader
+from pyedflib import EdfWriter
+from pyedflib.highlevel import make_header
+from pyedflib.highlevel import make_signal_headers
+
+# Local Packages #
+from src.xltektools.xltekcdfs.xltekcdfsedfexporter import XLTEKCDFSEDFExporter
+
+
+# Definitions #
+# Functions #
+def write_records(writer, data, start, stop):
+    """Writes records one at a time with a transposed copy of each, the way the exporter used to."""
+    samples_step = writer.get_smp_per_record(0)
+    for i in range(start, stop, samples_step):
+        record = data[i:min(i + samples_step, stop)].astype(np.float64)
+        if record.shape[0] < samples_step:
+            padded = np.zeros((samples_step, record.shape[1]), dtype=np.float64)
+            padded[:record.shape[0]] = record
+            record = padded
+        writer.blockWritePhysicalSamples(record.T.flatten())
+
+
+# Classes #
+class TestXLTEKCDFSEDFExporter:
+    n_channels = 128
+    sample_rate = 1024
+    seconds = 120
+
+    @pytest.fixture
+    def data(self):
+        n_samples = self.sample_rate * self.seconds + self.sample_rate // 3
+        return (np.random.default_rng(0).standard_normal((n_samples, self.n_channels)) * 1000).astype(np.float32)
+
+    def write_edf(self, path, write):
+        signal_headers = make_signal_headers(
+            [f"C{i}" for i in range(self.n_channels)],
+            sample_frequency=self.sample_rate,
+            physical_min=-1000000.0,
+            physical_max=320000.0,
+        )
+        with EdfWriter(path.as_posix(), n_channels=self.n_channels, file_type=FILETYPE_EDFPLUS) as writer:
+            writer.setSignalHeaders(signal_headers)
+            writer.setHeader(make_header())
+            write_start = time.perf_counter()
+            write(writer)
+            return time.perf_counter() - write_start
+
+    def test_block_records(self, tmp_path, data):
+        split = data.shape[0] // 3
+        proxy = ProxyArray(proxies=[ContainerProxyArray(data=data[:split]), ContainerProxyArray(data=data[split:])])
+        exporter = XLTEKCDFSEDFExporter()
+
+        record_time = self.write_edf(tmp_path / "records.edf", lambda w: write_records(w, data, 0, data.shape[0]))
+        block_time = self.write_edf(tmp_path / "blocks.edf", lambda w: exporter._write_proxy_samples(w, proxy))
+
+        with EdfReader((tmp_path / "records.edf").as_posix()) as records, EdfReader(
+            (tmp_path / "blocks.edf").as_posix()
+        ) as blocks:
+            for channel in (0, self.n_channels // 2, self.n_channels - 1):
+                assert np.array_equal(records.readSignal(channel), blocks.readSignal(channel))
+
+        print(f"\nPer record copies {record_time:6.2f} s, reused block buffers {block_time:6.2f} s")
+
+    @pytest.mark.parametrize("suffix", [".edf", ".bdf"])
+    def test_scaled_digital(self, tmp_path, data, suffix):
+        proxy = ProxyArray(proxies=[ContainerProxyArray(data=data)])
+        exporter = XLTEKCDFSEDFExporter()
+        signal_headers = make_signal_headers(
+            [f"C{i}" for i in range(self.n_channels)],
+            sample_frequency=self.sample_rate,
+            physical_min=-1000000.0,
+            physical_max=320000.0,
+        )
+        header = make_header()
+        digital_min, digital_max = exporter.digital_ranges[FILETYPE_BDFPLUS if suffix == ".bdf" else FILETYPE_EDFPLUS]
+
+        times = {}
+        for scale in (False, True):
+            path = tmp_path / f"scale_{scale}{suffix}"
+            write_start = time.perf_counter()
+            exporter.write_edf_proxy(path, proxy, signal_headers, header=header, scale=scale)
+            times[scale] = time.perf_counter() - write_start
+
+        with EdfReader((tmp_path / f"scale_True{suffix}").as_posix()) as scaled:
+            for channel in (0, self.n_channels // 2, self.n_channels - 1):
+                physical = scaled.getPhysicalMaximum(channel) - scaled.getPhysicalMinimum(channel)
+                step = physical / (digital_max - digital_min)
+                assert np.abs(scaled.readSignal(channel)[:data.shape[0]] - data[:, channel]).max() <= step
+
+        print(f"\nPhysical samples {times[False]:6.2f} s, scaled digital samples {times[True]:6.2f} s")
+
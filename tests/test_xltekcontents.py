@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" test_xltekcontents.py
+Tests probing, correcting, and bulk updating XLTEK contents tables.
+"""
+# Package Header #
+from src.xltektools.header import *
+
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import datetime
+import sqlite3
+
+import numpy as np
+import pytest
+
+# Third-Party Packages #
+from dspobjects.time import Timestamp
+
+# Local Packages #
+from src.xltektools.xltekhdf5 import XLTEKHDF5, XLTEKHDF5_1
+from src.xltektools.xltekcdfs import XLTEKCDFS
+
+
+# Definitions #
+# Constants #
+HOUR = 3600 * 10**9
+
+
+# Functions #
+def create_files(tmp_dir, n_files, n_samples=1000, sample_rate=1000):
+    """Creates small XLTEKHDF5 files with consecutive, evenly spaced samples."""
+    class_ = XLTEKHDF5.get_latest_version_class()
+    data = np.zeros((n_samples, 8), dtype=np.float32)
+    period = 10**9 // sample_rate
+    paths = []
+    for i in range(n_files):
+        path = tmp_dir / f"{i}.h5"
+        file_start = i * n_samples * period
+        f_obj = class_(file=path, s_id="EC_test", mode="a", create=True, construct=True)
+        f_obj.time_axis.components["axis"].sample_rate = sample_rate
+        f_obj.attributes["start_id"] = file_start
+        f_obj.data.set_data(data, component_kwargs={"timeseries": {"data": file_start + np.arange(n_samples) * period}})
+        f_obj.close()
+        paths.append(path)
+    return paths
+
+
+def create_empty_file(path, start_id, sample_rate=1000):
+    """Creates an XLTEKHDF5 file which has a start ID but no samples, like a file which was just opened."""
+    f_obj = XLTEKHDF5_1(file=path, s_id="EC_test", mode="a", create=True, construct=True)
+    f_obj.time_axis.components["axis"].sample_rate = sample_rate
+    f_obj.attributes["start_id"] = start_id
+    f_obj.close()
+    return path
+
+
+# Classes #
+class TestXLTEKContentsTable:
+    n_files = 4
+    n_samples = 1000
+
+    def test_empty_file(self, tmp_path):
+        cdfs = XLTEKCDFS(path=tmp_path, name="EC_test", mode="a", create=True)
+        contents = cdfs.components["contents"]
+        assert contents.data_file_type.VERSION == XLTEKHDF5_1.VERSION
+        create_files(tmp_path, self.n_files, self.n_samples)
+        empty_id = self.n_files * self.n_samples * 10**6
+        create_empty_file(tmp_path / "empty.h5", empty_id)
+
+        header = XLTEKHDF5.probe(tmp_path / "empty.h5")
+        assert header.start is None and header.end_id == empty_id
+        assert header.as_entry(root=tmp_path)["start"] == Timestamp.fromnanostamp(empty_id, tz=datetime.timezone.utc)
+
+        contents.correct_contents()
+        start_end_ids = contents.get_start_end_ids()
+        assert len(start_end_ids) == self.n_files + 1
+        assert (empty_id, empty_id) in start_end_ids
+        cdfs.close()
+
+    def test_parallel_probe(self, tmp_path):
+        cdfs = XLTEKCDFS(path=tmp_path, name="EC_test", mode="a", create=True)
+        table = cdfs.components["contents"].table
+        paths = create_files(tmp_path, self.n_files, self.n_samples)
+        paths.append(create_empty_file(tmp_path / "empty.h5", self.n_files * self.n_samples * 10**6))
+        paths.append(tmp_path / "contents.sqlite3")
+
+        sequential = table.probe_files(paths)
+        parallel = table.probe_files(paths, workers=2)
+        assert list(parallel) == list(sequential) == paths
+        assert parallel[paths[-1]] is sequential[paths[-1]] is None
+        for path in paths[:-1]:
+            assert parallel[path].as_entry(root=tmp_path) == sequential[path].as_entry(root=tmp_path)
+        cdfs.close()
+
+    def test_baseline_schema(self, tmp_path):
+        cdfs = XLTEKCDFS(path=tmp_path, name="EC_test", mode="a", create=True)
+        table_name = cdfs.components["contents"].table.__table__.name
+        cdfs.close()
+        with sqlite3.connect(tmp_path / "contents.sqlite3") as connection:
+            connection.execute(f"DROP INDEX ix_{table_name}_start_id")
+            for column in ("file_mtime", "file_size", "file_inode"):
+                connection.execute(f"ALTER TABLE {table_name} DROP COLUMN {column}")
+        create_files(tmp_path, self.n_files, self.n_samples)
+
+        cdfs = XLTEKCDFS(path=tmp_path, mode="a")
+        with cdfs.components["contents"].create_session() as session:
+            assert cdfs.components["contents"].table.has_unique_key(session=session)
+        cdfs.components["contents"].correct_contents(incremental=True)
+        assert len(cdfs.components["contents"].get_start_end_ids()) == self.n_files
+        cdfs.close()
+        with sqlite3.connect(tmp_path / "contents.sqlite3") as connection:
+            columns = {row[1] for row in connection.execute(f"PRAGMA table_info({table_name})")}
+        assert {"file_mtime", "file_size", "file_inode"} <= columns
+
+    def test_baseline_schema_read_only(self, tmp_path):
+        cdfs = XLTEKCDFS(path=tmp_path, name="EC_test", mode="a", create=True)
+        table_name = cdfs.components["contents"].table.__table__.name
+        create_files(tmp_path, self.n_files, self.n_samples)
+        cdfs.components["contents"].correct_contents()
+        cdfs.close()
+        with sqlite3.connect(tmp_path / "contents.sqlite3") as connection:
+            for column in ("file_mtime", "file_size", "file_inode"):
+                connection.execute(f"ALTER TABLE {table_name} DROP COLUMN {column}")
+
+        cdfs = XLTEKCDFS(path=tmp_path, mode="r")
+        contents = cdfs.components["contents"]
+        assert len(contents.get_start_end_ids()) == self.n_files
+        with contents.create_session() as session:
+            assert len(contents.table.get_all(session=session, as_entries=True)) == self.n_files
+        cdfs.close()
+        with sqlite3.connect(tmp_path / "contents.sqlite3") as connection:
+            columns = {row[1] for row in connection.execute(f"PRAGMA table_info({table_name})")}
+        assert not {"file_mtime", "file_size", "file_inode"} & columns
+
+    def test_incremental(self, tmp_path, monkeypatch):
+        cdfs = XLTEKCDFS(path=tmp_path, name="EC_test", mode="a", create=True)
+        contents = cdfs.components["contents"]
+        table = contents.table
+        paths = create_files(tmp_path, self.n_files, self.n_samples)
+        contents.correct_contents()
+
+        probed = []
+        probe_files = table.probe_files
+
+        def record_probe(paths, workers=None):
+            probed.extend(paths)
+            return probe_files(paths)
+
+        monkeypatch.setattr(table, "probe_files", record_probe)
+
+        contents.correct_contents(incremental=True)
+        assert probed == []
+
+        changed = create_files(tmp_path, 1, 2 * self.n_samples)[0]
+        new = create_empty_file(tmp_path / "new.h5", self.n_files * self.n_samples * 10**6)
+        contents.correct_contents(incremental=True)
+        assert sorted(probed) == sorted([changed, new])
+        start_end_ids = contents.get_start_end_ids()
+        assert start_end_ids[0] == (0, (2 * self.n_samples - 1) * 10**6)
+        assert len(start_end_ids) == self.n_files + 1
+
+        probed.clear()
+        contents.correct_contents()
+        assert sorted(probed) == sorted([*paths, new])
+        cdfs.close()
+
+    @pytest.mark.parametrize("native", [True, False])
+    def test_bulk_upsert(self, tmp_path, monkeypatch, native):
+        cdfs = XLTEKCDFS(path=tmp_path, name="EC_test", mode="a", create=True)
+        contents = cdfs.components["contents"]
+        table = contents.table
+        monkeypatch.setattr(table, "native_upsert", native)
+        with contents.create_session() as session:
+            assert table._is_native_upsert(session=session) == native
+        start_ids = np.arange(self.n_files, dtype=np.int64) * HOUR
+        with contents.create_session() as session:
+            table.bulk_upsert(
+                session=session,
+                start_id=start_ids,
+                end_id=start_ids + HOUR - 10**6,
+                path=[f"{i}.h5" for i in range(self.n_files)],
+                shape=[(3600000, 8)] * self.n_files,
+                sample_rate=1000.0,
+                begin=True,
+            )
+
+            new_id = self.n_files * HOUR
+            entries = [
+                {"start_id": 0, "end_id": HOUR - 10**6, "path": "replaced.h5", "update_id": 1},
+                {"start_id": new_id, "end_id": new_id, "path": "first.h5", "update_id": 1},
+                {"start_id": new_id, "end_id": new_id + HOUR - 10**6, "path": "second.h5", "update_id": 1},
+            ]
+            for entry in entries:
+                entry.update(
+                    start=Timestamp.fromnanostamp(entry["start_id"], tz=datetime.timezone.utc),
+                    end=Timestamp.fromnanostamp(entry["end_id"], tz=datetime.timezone.utc),
+                    timezone=datetime.timezone.utc,
+                    sample_rate=1000.0,
+                    shape=(1, 8),
+                )
+            table.bulk_upsert_entries(session=session, entries=entries, begin=True)
+
+            rows = {row.path: row for row in table.get_index_rows(session=session)}
+        assert len(rows) == self.n_files + 1 and "0.h5" not in rows and "first.h5" not in rows
+        assert rows["replaced.h5"].start_id == 0 and rows["replaced.h5"].update_id == 1
+        assert rows["second.h5"].end_id == new_id + HOUR - 10**6
+        cdfs.close()
+
+    @pytest.mark.parametrize("corruption", ["truncated", "garbage", "empty"])
+    def test_corrupt_index_cache(self, tmp_path, corruption):
+        cdfs = XLTEKCDFS(path=tmp_path, name="EC_test", mode="a", create=True)
+        create_files(tmp_path, self.n_files, self.n_samples)
+        cdfs.components["contents"].correct_contents()
+        cache_path = cdfs.components["contents"].index_cache_path
+        index = cdfs.components["contents"].get_contents_index()
+        cdfs.close()
+        assert len(index) == self.n_files
+        assert [p.name for p in tmp_path.glob(".*")] == []
+
+        cache = cache_path.read_bytes()
+        corrupt = {"truncated": cache[: len(cache) // 2], "garbage": b"PK\x03\x04" * 16, "empty": b""}
+        cache_path.write_bytes(corrupt[corruption])
+
+        cdfs = XLTEKCDFS(path=tmp_path, mode="a")
+        index = cdfs.components["contents"].get_contents_index()
+        cdfs.close()
+        assert len(index) == self.n_files
+        assert cache_path.read_bytes() == cache
+
+
+# Main #
+if __name__ == "__main__":
+    pytest.main(["-v", "-s"])
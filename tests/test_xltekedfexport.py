@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" test_xltekedfexport.py
+Tests planning, exporting, and resuming EDF exports of XLTEK data.
+"""
+# Package Header #
+from src.xltektools.header import *
+
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+from types import SimpleNamespace
+import datetime
+import os
+
+import numpy as np
+import pytest
+
+# Third-Party Packages #
+from proxyarrays import ContainerProxyArray, ProxyArray
+from pyedflib import FILETYPE_EDFPLUS
+from pyedflib import EdfReader
+from pyedflib import EdfWriter
+from pyedflib.highlevel import make_header
+from pyedflib.highlevel import make_signal_headers
+
+# Local Packages #
+from src.xltektools.xltekcdfs import XLTEKCDFS
+from src.xltektools.xltekcdfs.xltekcdfsedfexporter import XLTEKCDFSEDFExporter
+from src.xltektools.xltekcdfs.xltekedfexportmanifest import XLTEKEDFExportManifest
+
+
+# Definitions #
+# Classes #
+class TestXLTEKCDFSEDFExporter:
+
+    def test_sample_indices(self):
+        hour = 3600 * 10**9
+        proxies = [SimpleNamespace(start_nanostamp=h * hour, shape=(3600 * 16, 4)) for h in (0, 1, 3)]
+        segment = SimpleNamespace(proxies=proxies, proxy_start_indices=(0, 57600, 115200), sample_rate=16.0)
+
+        # Hours, a time between samples, and a time in the gap between the second and third proxies.
+        nanostamps = np.array([hour, hour + 10**9 // 32, 2 * hour + 10**9, 3 * hour, 3 * hour + 10**9], dtype=np.int64)
+        indices = XLTEKCDFSEDFExporter.find_sample_indices(segment, nanostamps)
+        assert indices.tolist() == [57600, 57601, 115200, 115200, 115216]
+
+
+    def test_channel_major_records(self, tmp_path):
+        n_channels, sample_rate = 4, 16
+        data = np.random.default_rng(0).normal(size=(sample_rate * 10 + 5, n_channels)) * 1000
+        data[: sample_rate * 2, 1] = -1000000.0  # The fill value, which the ranges ignore.
+        split = data.shape[0] // 3
+        proxy = ProxyArray(proxies=[ContainerProxyArray(data=data[:split]), ContainerProxyArray(data=data[split:])])
+        exporter = XLTEKCDFSEDFExporter(records_per_block=3)
+
+        minimums, maximums = exporter.compute_physical_ranges(proxy, samples_per_record=sample_rate)
+        valid = np.ma.masked_equal(data, exporter.fill_value)
+        assert np.all(minimums <= valid.min(axis=0)) and np.all(valid.min(axis=0) - minimums < 1)
+        assert np.all(maximums >= valid.max(axis=0)) and np.all(maximums - valid.max(axis=0) < 1)
+
+        signal_headers = make_signal_headers(
+            [f"C{i}" for i in range(n_channels)],
+            sample_frequency=sample_rate,
+            physical_min=-1000000.0,
+            physical_max=320000.0,
+        )
+        path = tmp_path / "records.edf"
+        with EdfWriter(path.as_posix(), n_channels=n_channels, file_type=FILETYPE_EDFPLUS) as writer:
+            writer.setSignalHeaders(signal_headers)
+            writer.setHeader(make_header())
+            exporter._write_proxy_samples(writer, proxy)
+
+        padded = np.zeros((sample_rate * 11, n_channels))
+        padded[: data.shape[0]] = data
+        with EdfReader(path.as_posix()) as reader:
+            for channel in range(n_channels):
+                step = (reader.getPhysicalMaximum(channel) - reader.getPhysicalMinimum(channel)) / 65535
+                assert np.allclose(reader.readSignal(channel), padded[:, channel], atol=step)
+
+
+class TestXLTEKCDFSEDFExport:
+    n_channels = 4
+    sample_rate = 16
+    start = datetime.datetime(2024, 1, 1, 21, tzinfo=datetime.timezone.utc)
+    hours = (0, 1, 3, 4, 5)  # The third hour is missing, so it is filled.
+
+    @pytest.fixture
+    def cdfs_path(self, tmp_path):
+        """Creates a CDFS of hourly files which crosses midnight."""
+        path = tmp_path / "cdfs"
+        tzinfo = self.start.tzinfo
+        cdfs = XLTEKCDFS(path=path, name="S", mode="a", create=True)
+        component = cdfs.components["contents"]
+        rng = np.random.default_rng(0)
+        start = int(self.start.timestamp()) * 10**9
+        n_samples = 3600 * self.sample_rate
+        offsets = np.arange(n_samples, dtype=np.int64) * (10**9 // self.sample_rate)
+        for hour in self.hours:
+            nanostamps = start + hour * 3600 * 10**9 + offsets
+            full_path, relative_path = component.generate_file_path(start=nanostamps[0], tzinfo=tzinfo)
+            file = component.data_file_type(file=full_path, s_id="S", mode="a", create=True, construct=True)
+            file.time_axis.components["axis"].set_time_zone(tzinfo)
+            file.time_axis.components["axis"].sample_rate = self.sample_rate
+            file.attributes["start_id"] = int(nanostamps[0])
+            file.attributes["end_id"] = int(nanostamps[-1])
+            data = (rng.standard_normal((n_samples, self.n_channels)) * 10000).astype(np.float32)
+            file.data.set_data(data, component_kwargs={"timeseries": {"data": nanostamps}})
+            with component.create_session() as session:
+                component._table.insert(
+                    session=session,
+                    begin=True,
+                    as_entry=True,
+                    update_id=0,
+                    path=relative_path,
+                    shape=file.data.shape,
+                    axis=0,
+                    start=file.start_datetime,
+                    end=file.end_datetime,
+                    timezone=tzinfo,
+                    sample_rate=self.sample_rate,
+                    start_id=int(nanostamps[0]),
+                    end_id=int(nanostamps[-1]),
+                )
+            file.close()
+        cdfs.close()
+        return path
+
+    def export(self, cdfs_path, path, hours=False, workers=None):
+        path.mkdir(exist_ok=True)
+        cdfs = XLTEKCDFS(path=cdfs_path, mode="r")
+        channel_names = [f"C{i}" for i in range(self.n_channels)]
+        exporter = XLTEKCDFSEDFExporter(cdfs=cdfs, new_name="S", channel_names=channel_names)
+        if hours:
+            exporter.export_as_hours(path, workers=workers)
+        else:
+            exporter.export_as_days(path, workers=workers)
+        cdfs.close()
+
+    @staticmethod
+    def read_edfs(path):
+        signals = {}
+        for edf_path in sorted(path.glob("*.edf")):
+            with EdfReader(edf_path.as_posix()) as reader:
+                data = np.stack([reader.readSignal(i) for i in range(reader.signals_in_file)], axis=1)
+                signals[edf_path.name] = (reader.getStartdatetime(), data)
+        return signals
+
+    def test_parallel_days(self, tmp_path, cdfs_path):
+        self.export(cdfs_path, tmp_path / "sequential")
+        self.export(cdfs_path, tmp_path / "parallel", workers=2)
+
+        sequential = self.read_edfs(tmp_path / "sequential")
+        parallel = self.read_edfs(tmp_path / "parallel")
+        assert sorted(sequential) == ["S_task-day1_ieeg.edf", "S_task-day2_ieeg.edf"]
+        assert sorted(parallel) == sorted(sequential)
+        for name, (start, data) in sequential.items():
+            assert parallel[name][0] == start
+            assert np.array_equal(parallel[name][1], data)
+
+    def test_hours_match_days(self, tmp_path, cdfs_path):
+        self.export(cdfs_path, tmp_path / "days")
+        self.export(cdfs_path, tmp_path / "hours", hours=True)
+
+        days = list(self.read_edfs(tmp_path / "days").values())
+        hours = self.read_edfs(tmp_path / "hours")
+        assert len(hours) == self.hours[-1] + 1
+        for name, (start, data) in hours.items():
+            day_start, day_data = next((s, d) for s, d in reversed(days) if s <= start)
+            offset = int((start - day_start).total_seconds()) * self.sample_rate
+            assert data.shape[0] == 3600 * self.sample_rate
+            assert np.array_equal(data, day_data[offset:offset + data.shape[0]]), name
+
+    def test_unchanged_rerun(self, tmp_path, cdfs_path, monkeypatch):
+        path = tmp_path / "days"
+        self.export(cdfs_path, path)
+        mtimes = {edf_path.name: edf_path.stat().st_mtime_ns for edf_path in path.glob("*.edf")}
+
+        def fail(*args, **kwargs):
+            raise AssertionError("An unchanged export should not read or write any periods.")
+
+        monkeypatch.setattr(XLTEKCDFSEDFExporter, "create_segments", fail)
+        monkeypatch.setattr(XLTEKCDFSEDFExporter, "write_period", fail)
+        self.export(cdfs_path, path)
+        assert {edf_path.name: edf_path.stat().st_mtime_ns for edf_path in path.glob("*.edf")} == mtimes
+
+
+class TestXLTEKEDFExportManifest:
+    def test_resume(self, tmp_path):
+        plans = [
+            {
+                "path": tmp_path / f"S_task-day{d}_ieeg.edf",
+                "segment": 0,
+                "start": d * 10,
+                "stop": d * 10 + 10,
+                "start_time": f"2024-01-0{d}",
+                "stop_time": f"2024-01-0{d + 1}",
+            }
+            for d in range(1, 4)
+        ]
+        source = {"contents": {"count": 3, "update_id": 1}, "settings": {"fill": True}}
+        manifest = XLTEKEDFExportManifest(path=tmp_path / "manifest.json")
+        assert manifest.set_plans(plans, source) == plans
+
+        for plan in plans:
+            plan["path"].write_bytes(b"0" * 256)
+            manifest.mark_complete(plan["path"].name, manifest.file_record(plan["path"]))
+        assert XLTEKEDFExportManifest(path=tmp_path / "manifest.json").is_finished(source)
+
+        # A truncated file and a day with more data are exported again, as is everything when the settings change.
+        plans[1]["path"].write_bytes(b"0" * 100)
+        plans[2]["stop"] += 5
+        source["contents"]["count"] = 4
+        manifest = XLTEKEDFExportManifest(path=tmp_path / "manifest.json")
+        assert not manifest.is_finished(source)
+        assert manifest.set_plans(plans, source) == plans[1:]
+        assert manifest.set_plans(plans, {**source, "settings": {"fill": False}}) == plans
+
+    def test_verify(self, tmp_path, monkeypatch):
+        path = tmp_path / "S_task-day1_ieeg.edf"
+        path.write_bytes(b"0" * 256)
+        checksums = []
+        file_checksum = XLTEKEDFExportManifest.file_checksum
+        monkeypatch.setattr(
+            XLTEKEDFExportManifest,
+            "file_checksum",
+            classmethod(lambda cls, p: checksums.append(p) or file_checksum(p)),
+        )
+        record = XLTEKEDFExportManifest.file_record(path)
+        assert record["size"] == 256 and record["mtime_ns"] == path.stat().st_mtime_ns and record["sha256"] is None
+        assert checksums == []
+        assert XLTEKEDFExportManifest.file_record(path, checksum=True)["sha256"] is not None and checksums == [path]
+
+        # Files recorded without a checksum are verified by their modification time.
+        manifest = XLTEKEDFExportManifest(path=tmp_path / "manifest.json", verify=True)
+        manifest.files[path.name] = {"complete": True, **record}
+        assert manifest.is_complete(path.name)
+        path.write_bytes(b"1" * 256)
+        os.utime(path, ns=(record["mtime_ns"], record["mtime_ns"] + 10**9))
+        assert not manifest.is_complete(path.name)
+
+
+# Main #
+if __name__ == "__main__":
+    pytest.main(["-v", "-s"])
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" test_xltekhdf5.py
+Tests the chunk planner, implicit time axis, growth, and rollover policy of XLTEKHDF5 files.
+"""
+# Package Header #
+from src.xltektools.header import *
+
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import datetime
+import pathlib
+import zoneinfo
+
+import numpy as np
+import pytest
+
+# Third-Party Packages #
+from dspobjects.time import Timestamp
+import h5py
+
+# Local Packages #
+from src.xltektools.xltekhdf5 import XLTEKHDF5
+from src.xltektools.xltekhdf5 import XLTEKChunkPlanner
+from src.xltektools.xltekhdf5 import XLTEKHDF5_1, XLTEKHDF5_2
+from src.xltektools.xltekhdf5 import XLTEKImplicitTimeAxis
+from src.xltektools.xltekhdf5 import XLTEKRolloverPolicy
+
+
+# Definitions #
+# Functions #
+@pytest.fixture
+def tmp_dir(tmpdir):
+    """A pytest fixture that turn the tmpdir into a Path object."""
+    return pathlib.Path(tmpdir)
+
+
+# Classes #
+
+
+class TestXLTEKChunkPlanner:
+    class_ = XLTEKHDF5_1
+    n_channels = 256
+    sample_rate = 1000
+    seconds = 30
+    compression = "gzip-1"
+
+    @pytest.fixture(scope="class")
+    def data(self):
+        shape = (self.seconds * self.sample_rate, self.n_channels)
+        return np.round(np.random.default_rng(0).normal(0.0, 100.0, shape))
+
+    def create_file(self, path, data, chunks=None):
+        nanostamps = np.arange(data.shape[0], dtype=np.int64) * (10**9 // self.sample_rate)
+        f_obj = self.class_(
+            file=path, s_id="EC_test", mode="a", create=True, construct=True, chunks=chunks, compression=self.compression
+        )
+        f_obj.time_axis.components["axis"].sample_rate = self.sample_rate
+        f_obj.attributes["start_id"] = 0
+        f_obj.data.set_data(data, component_kwargs={"timeseries": {"data": nanostamps}})
+        f_obj.close()
+
+    def test_plan(self):
+        planner = XLTEKChunkPlanner()
+        plan = planner.plan(sample_rate=self.sample_rate, n_channels=self.n_channels)
+        assert plan["data"][0] == plan["time_axis"][0] == planner.seconds * self.sample_rate
+        assert plan["data"][0] * plan["data"][1] * 4 <= planner.max_chunk_bytes
+
+    def test_cache(self, tmp_dir, data):
+        planner = XLTEKChunkPlanner(max_cache_bytes=8 * 2**20)
+        chunks = planner.plan_data_chunks(self.sample_rate, self.n_channels)
+        row_bytes = chunks[0] * self.n_channels * 4
+        cache_bytes = planner.plan_cache_bytes(self.sample_rate, self.n_channels)
+        assert row_bytes < cache_bytes <= planner.max_cache_bytes
+        assert chunks[0] < planner.seconds * self.sample_rate
+
+        path = tmp_dir / "cache.h5"
+        with self.class_(file=path, s_id="EC_test", mode="a", create=True, rdcc_nbytes=cache_bytes) as f_obj:
+            assert f_obj._file.id.get_access_plist().get_cache()[2] == cache_bytes
+
+    def test_rechunk_failure(self, tmp_dir, data):
+        path = tmp_dir / "rechunk_failure.h5"
+        self.create_file(path, data[: 10 * self.sample_rate])
+        size = path.stat().st_size
+
+        def fail(source, temp_path, **kwargs):
+            temp_path.write_bytes(b"partial")
+            raise OSError("disk full")
+
+        planner = XLTEKChunkPlanner()
+        planner._rechunk_file = fail
+        with pytest.raises(OSError):
+            planner.rechunk(path)
+        assert path.stat().st_size == size
+        assert list(tmp_dir.glob(".*.rechunk")) == []
+
+    def test_rechunk(self, tmp_dir, data):
+        path = tmp_dir / "rechunk.h5"
+        self.create_file(path, data[: 30 * self.sample_rate])
+
+        with h5py.File(path, "r") as file:
+            libver = file.libver
+
+        planner = XLTEKChunkPlanner()
+        planner.rechunk(path)
+
+        with h5py.File(path, "r") as file:
+            assert file.libver == libver
+        with self.class_(file=path) as f_obj:
+            assert f_obj.data._dataset.chunks == planner.plan_data_chunks(self.sample_rate, data.shape[1])
+            assert f_obj.time_axis._dataset.chunks == planner.plan_time_chunks(self.sample_rate, 4, data.shape[1])
+            assert np.array_equal(f_obj.data[...], data[: 30 * self.sample_rate])
+            assert f_obj.end_id == (30 * self.sample_rate - 1) * (10**9 // self.sample_rate)
+
+
+class TestXLTEKImplicitTimeAxis:
+    sample_rate = 1000
+    gap_index = 200_000
+    start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+    def test_indexing(self):
+        period = 10**9 // self.sample_rate
+        length = 10**9
+        time_axis = XLTEKImplicitTimeAxis(
+            start=0,
+            sample_rate=self.sample_rate,
+            length=length,
+            discontinuities=np.array([[self.gap_index, self.gap_index * period + 3 * 10**9]], dtype=np.int64),
+        )
+        gap_start = self.gap_index * period + 3 * 10**9
+
+        assert np.array_equal(time_axis[5:10], np.arange(5, 10) * period)
+        gap_slice = slice(self.gap_index - 1, self.gap_index + 1)
+        assert np.array_equal(time_axis[gap_slice], [(self.gap_index - 1) * period, gap_start])
+        assert np.array_equal(time_axis[-2:], gap_start + (length - 2 - self.gap_index + np.arange(2)) * period)
+        assert np.array_equal(time_axis[np.array([0, -1])], [0, gap_start + (length - 1 - self.gap_index) * period])
+        assert time_axis[10:5].shape == (0,)
+        with pytest.raises(IndexError):
+            time_axis[np.array([length])]
+
+        mask = np.zeros(self.gap_index * 2, dtype=bool)
+        mask[[3, self.gap_index + 1]] = True
+        small_axis = XLTEKImplicitTimeAxis(start=0, sample_rate=self.sample_rate, length=mask.shape[0])
+        assert np.array_equal(small_axis[mask], [3 * period, (self.gap_index + 1) * period])
+
+    @pytest.mark.parametrize("class_", [XLTEKHDF5_1, XLTEKHDF5_2])
+    def test_empty_header(self, tmp_dir, class_):
+        path = tmp_dir / "empty.h5"
+        start_ns = int(self.start.timestamp() * 10**9)
+        f_obj = class_(file=path, s_id="EC_test", mode="a", create=True, construct=True)
+        f_obj.time_axis.components["axis"].sample_rate = self.sample_rate
+        f_obj.attributes["start_id"] = start_ns
+        f_obj.close()
+
+        header = XLTEKHDF5.probe(path)
+        assert header.shape[header.axis] == 0
+        assert header.start_id == header.end_id == start_ns
+
+
+class TestXLTEKHDF5Growth:
+
+    def test_plan_capacity(self, tmp_dir):
+        f_obj = XLTEKHDF5_1(file=tmp_dir / "capacity.h5", s_id="EC_test", mode="a", create=True, construct=True)
+        f_obj.set_growth("geometric", factor=1.01, increment=1)
+        assert f_obj.plan_capacity(needed=10, capacity=1) == 10
+        assert f_obj.plan_capacity(needed=10, capacity=0) == 10
+        assert f_obj.plan_capacity(needed=1000, capacity=500) >= 1000
+        for factor in (1, 0.5):
+            with pytest.raises(ValueError):
+                f_obj.set_growth("geometric", factor=factor)
+        f_obj.close()
+
+
+class TestXLTEKRolloverPolicy:
+    tzinfo = zoneinfo.ZoneInfo("America/New_York")
+
+    def test_boundaries(self):
+        policy = XLTEKRolloverPolicy(duration=3600, day=True)
+        start = Timestamp(datetime.datetime(2023, 11, 4, 23, 30, tzinfo=self.tzinfo))
+        nanostamp = int(start.timestamp()) * 10**9
+        boundary = policy.next_boundary(nanostamp, self.tzinfo)
+        assert boundary == nanostamp + 1800 * 10**9
+        assert policy.file_start(nanostamp, self.tzinfo) == nanostamp - 1800 * 10**9
+
+        # Daylight saving time ends during the next day, so it is 25 hours long.
+        day_policy = XLTEKRolloverPolicy(day=True)
+        next_day = day_policy.next_boundary(boundary, self.tzinfo)
+        assert next_day == boundary + 25 * 3600 * 10**9
+        assert datetime.datetime.fromtimestamp(next_day / 10**9, self.tzinfo).hour == 0
+        assert day_policy.file_start(next_day - 1, self.tzinfo) == boundary
+
+        nanostamps = nanostamp + np.arange(7200, dtype=np.int64) * 10**9
+        assert policy.split_index(nanostamps, boundary) == 1800
+        assert not policy.should_roll(int(nanostamps[1799]), boundary, 0)
+        assert policy.should_roll(int(nanostamps[1800]), boundary, 0)
+        assert XLTEKRolloverPolicy(max_bytes=100).should_roll(nanostamp, None, 100)
+
+
+# Main #
+if __name__ == "__main__":
+    pytest.main(["-v", "-s"])
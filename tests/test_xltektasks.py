@@ -0,0 +1,507 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" test_xltektasks.py
+Tests the writer and contents update tasks with stub queues in place of the task block queues.
+"""
+# Package Header #
+from src.xltektools.header import *
+
+
+# Header #
+__author__ = __author__
+__credits__ = __credits__
+__maintainer__ = __maintainer__
+__email__ = __email__
+
+
+# Imports #
+# Standard Libraries #
+import asyncio
+import datetime
+import pathlib
+import queue
+import threading
+import time
+
+import numpy as np
+import pytest
+
+# Third-Party Packages #
+from dspobjects.time import Timestamp
+
+# Local Packages #
+from src.xltektools.xltekcdfs import XLTEKCDFS
+from src.xltektools.xltekhdf5 import XLTEKHDF5_1, XLTEKBackpressurePolicy, XLTEKRolloverPolicy
+from src.xltektools.xltekthreadedget import XLTEKThreadedGet
+from tests.test_xltekcontents import create_files
+
+
+# Definitions #
+# Classes #
+class StubQueue(queue.Queue):
+    """A thread-safe queue with the awaitable put of the task block queues."""
+
+    def __init__(self):
+        super().__init__()
+        self.put_times = []
+
+    async def put_async(self, item):
+        self.put_times.append(time.perf_counter())
+        self.put(item)
+
+
+class StubContentsComponent:
+    """A contents component which records the bulk upserts instead of committing them."""
+
+    def __init__(self):
+        self.upserts = []
+
+    async def bulk_upsert_entries_async(self, entries, key, begin):
+        self.upserts.append(([entry.copy() for entry in entries], key, begin))
+
+
+# Functions #
+@pytest.fixture
+def tmp_dir(tmpdir):
+    """A pytest fixture that turn the tmpdir into a Path object."""
+    return pathlib.Path(tmpdir)
+
+
+@pytest.fixture
+def writer_task():
+    """A writer task whose queues and events are stubs, skipped when taskblocks is not installed."""
+    pytest.importorskip("taskblocks")
+    from src.xltektools.xltekhdf5.tasks import XLTEKHDF5WriterTask
+
+    task = XLTEKHDF5WriterTask(wait_timeout=0.05)
+    task.write_queue = StubQueue()
+    task.contents_info_queue = StubQueue()
+    task.inputs.events["writing_done"] = threading.Event()
+    task.outputs.events["done"] = threading.Event()
+    task.loop_event.set()
+    yield task
+    task.teardown()
+
+
+@pytest.fixture
+def update_task():
+    """A contents update task whose queues and events are stubs, skipped when taskblocks is not installed."""
+    pytest.importorskip("taskblocks")
+    from src.xltektools.xltekcdfs.tasks import XLTEKContentsUpdateTask
+
+    task = XLTEKContentsUpdateTask()
+    task.wait_timeout = 0.05
+    task.contents_entry_queue = StubQueue()
+    task.inputs.events["entries_done"] = threading.Event()
+    task.outputs.events["done"] = threading.Event()
+    task.loop_event.set()
+    return task
+
+
+def put_later(queue_, item, delay=0.05):
+    """Puts an item on a queue from another thread after a delay."""
+    timer = threading.Timer(delay, queue_.put, args=(item,))
+    timer.start()
+    return timer
+
+
+async def cancel_get(get, queue_, item):
+    """Cancels a get while it waits, then puts an item which the worker thread of the cancelled get takes."""
+    waiting = asyncio.ensure_future(get())
+    await asyncio.sleep(0.01)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    queue_.put(item)
+    deadline = time.perf_counter() + 1.0
+    while not queue_.empty() and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+    assert queue_.empty()
+    return await asyncio.wait_for(get(), 2.0)
+
+
+# Classes #
+class TestXLTEKThreadedGet:
+
+    def test_cancelled_get(self):
+        getter = XLTEKThreadedGet()
+        queue_ = StubQueue()
+
+        async def run():
+            item = await cancel_get(lambda: getter.get(queue_, timeout=1.0), queue_, "item")
+            with pytest.raises(queue.Empty):
+                await getter.get(queue_, timeout=0.01)
+            return item
+
+        assert asyncio.run(run()) == "item"
+        assert getter.pending is None
+
+
+class TestXLTEKHDF5WriterTask:
+    n_channels = 8
+    sample_rate = 1000
+    block_samples = 500
+    n_blocks = 10
+
+    def create_blocks(self, path):
+        """Creates the items a producer queues, each holding all the samples of the file so far."""
+        n_samples = self.block_samples * self.n_blocks
+        data = np.random.default_rng(0).normal(size=(n_samples, self.n_channels)).astype(np.float32)
+        nanostamps = np.arange(n_samples, dtype=np.int64) * (10**9 // self.sample_rate)
+        items = []
+        for n in range(self.block_samples, n_samples + 1, self.block_samples):
+            contents = {
+                "sample_rate": self.sample_rate,
+                "timezone": datetime.timezone.utc,
+                "start_id": int(nanostamps[0]),
+                "end_id": int(nanostamps[n - 1]),
+            }
+            info = {"file": {"file": path, "s_id": "EC_test"}, "contents_insert": contents}
+            items.append((data[:n], nanostamps[:n], info))
+        return data, nanostamps, items
+
+    def test_batches(self, writer_task, tmp_dir):
+        path = tmp_dir / "batches.h5"
+        data, nanostamps, items = self.create_blocks(path)
+        writer_task.batch_samples = 4 * self.block_samples
+        writer_task.batch_interval = 100.0
+        for item in items:
+            writer_task.write_queue.put(item)
+
+        async def run():
+            states = []
+            for _ in items:
+                await writer_task.task()
+                states.append(
+                    (writer_task.file.get_length(), writer_task._buffer_length, writer_task.contents_info_queue.qsize())
+                )
+            writer_task.inputs.events["writing_done"].set()
+            await writer_task.task()
+            return states
+
+        states = asyncio.run(run())
+        assert states[:4] == [(0, 500, 0), (0, 1000, 0), (0, 1500, 0), (2000, 0, 4)]
+        assert states[-1] == (4000, 1000, 8)
+        writer_task.teardown()
+
+        infos = list(writer_task.contents_info_queue.queue)
+        assert len(infos) == self.n_blocks
+        assert [info["end_id"] for info in infos] == [int(nanostamps[n - 1]) for n in range(500, 5001, 500)]
+        with XLTEKHDF5_1(file=path) as f_obj:
+            assert np.array_equal(f_obj.data[...], data)
+            assert np.array_equal(f_obj.time_axis[...], nanostamps)
+
+    def test_batch_interval(self, writer_task, tmp_dir):
+        path = tmp_dir / "interval.h5"
+        _, _, items = self.create_blocks(path)
+        writer_task.batch_samples = 100 * self.block_samples
+        writer_task.batch_interval = 0.1
+        writer_task.write_queue.put(items[0])
+
+        async def run():
+            await writer_task.task()
+            assert writer_task._buffer_length == self.block_samples
+            threading.Timer(0.5, writer_task.inputs.events["writing_done"].set).start()
+            start = time.perf_counter()
+            await writer_task.task()
+            return start
+
+        start = asyncio.run(run())
+        put_times = writer_task.contents_info_queue.put_times
+        assert len(put_times) == 1 and put_times[0] - start < 0.4
+        assert writer_task.file.get_length() == self.block_samples
+
+    def test_backpressure_spill(self, writer_task, tmp_dir):
+        path = tmp_dir / "spill.h5"
+        data, nanostamps, items = self.create_blocks(path)
+        items = items[:3]
+        first_bytes = items[0][0].nbytes + items[0][1].nbytes
+        writer_task.backpressure = XLTEKBackpressurePolicy(mode="spill", max_bytes=first_bytes, spill_dir=tmp_dir)
+        for item in items:
+            assert writer_task.put_block(*item)
+        assert writer_task.write_queue.qsize() == 1 and writer_task.backpressure.pending_spills == 2
+
+        async def run():
+            queued = []
+            for _ in items:
+                await writer_task.task()
+                queued.append(writer_task.backpressure.queued_bytes)
+                writer_task.backpressure.drain(writer_task.write_queue)
+            return queued
+
+        assert asyncio.run(run()) == [0, 0, 0]
+        assert writer_task.write_queue.empty() and writer_task.backpressure.pending_spills == 0
+        assert not list(tmp_dir.glob("*.spill"))
+        writer_task.teardown()
+
+        n_samples = 3 * self.block_samples
+        with XLTEKHDF5_1(file=path) as f_obj:
+            assert np.array_equal(f_obj.data[...], data[:n_samples])
+            assert np.array_equal(f_obj.time_axis[...], nanostamps[:n_samples])
+
+    def test_rollover_start_ids(self, writer_task, tmp_dir):
+        base = 1_700_000_000 * 10**9
+        nanostamps = base + 250_000_000 + np.arange(2500, dtype=np.int64) * (10**9 // self.sample_rate)
+        gap = (nanostamps >= base + 10**9) & (nanostamps < base + 1_300_000_000)
+        nanostamps = nanostamps[~gap]  # The second file starts after its boundary.
+        data = np.random.default_rng(0).normal(size=(nanostamps.shape[0], self.n_channels)).astype(np.float32)
+
+        def entry_factory(shape, sample_rate, start, tzinfo, start_id, update_id):
+            return {
+                "file": {"file": tmp_dir / f"{int(start.timestamp())}.h5", "s_id": "EC_test"},
+                "contents_insert": {
+                    "sample_rate": sample_rate,
+                    "timezone": tzinfo,
+                    "start_id": start_id,
+                    "update_id": update_id,
+                },
+            }
+
+        writer_task.rollover = XLTEKRolloverPolicy(duration=1.0)
+        writer_task.entry_factory = entry_factory
+        contents = {"sample_rate": self.sample_rate, "timezone": datetime.timezone.utc, "update_id": 0}
+        for i in range(0, nanostamps.shape[0], self.block_samples):
+            block = slice(i, i + self.block_samples)
+            writer_task.write_queue.put((data[block], nanostamps[block], {"file": {}, "contents_insert": contents}))
+
+        async def run():
+            while not writer_task.write_queue.empty():
+                await writer_task.task()
+            writer_task.inputs.events["writing_done"].set()
+            await writer_task.task()
+
+        asyncio.run(run())
+        writer_task.teardown()
+
+        periods = (nanostamps - base) // 10**9
+        first_samples = [int(nanostamps[periods == p][0]) for p in np.unique(periods)]
+        infos = list(writer_task.contents_info_queue.queue)
+        assert sorted({info["start_id"] for info in infos}) == first_samples
+        assert all(info["start"].value == info["start_id"] for info in infos)
+
+        paths = sorted(tmp_dir.glob("*.h5"))
+        assert [path.stem for path in paths] == [str(base // 10**9 + p) for p in np.unique(periods)]
+        written = []
+        for path, first in zip(paths, first_samples):
+            with XLTEKHDF5_1(file=path) as f_obj:
+                assert f_obj.attributes["start_id"] == first
+                assert f_obj.time_axis[0] == first
+                written.append(f_obj.data[...])
+        assert np.array_equal(np.concatenate(written), data)
+
+    def test_rollover_max_bytes(self, writer_task, tmp_dir):
+        base = 1_700_000_000 * 10**9
+        nanostamps = base + 250_000_000 + np.arange(2500, dtype=np.int64) * (10**9 // self.sample_rate)
+        data = np.random.default_rng(0).normal(size=(nanostamps.shape[0], self.n_channels)).astype(np.float32)
+
+        def entry_factory(shape, sample_rate, start, tzinfo, start_id, update_id):
+            return {
+                "file": {"file": tmp_dir / f"{start.value - base}.h5", "s_id": "EC_test"},
+                "contents_insert": {
+                    "sample_rate": sample_rate,
+                    "timezone": tzinfo,
+                    "start_id": start_id,
+                    "update_id": update_id,
+                },
+            }
+
+        discarded = []
+        discard_file = writer_task.discard_file
+        writer_task.discard_file = lambda future: discarded.append(future) or discard_file(future)
+        writer_task.rollover = XLTEKRolloverPolicy(duration=1.0, max_bytes=1)
+        writer_task.entry_factory = entry_factory
+        contents = {"sample_rate": self.sample_rate, "timezone": datetime.timezone.utc, "update_id": 0}
+        for i in range(0, nanostamps.shape[0], self.block_samples):
+            block = slice(i, i + self.block_samples)
+            writer_task.write_queue.put((data[block], nanostamps[block], {"file": {}, "contents_insert": contents}))
+
+        async def run():
+            while not writer_task.write_queue.empty():
+                await writer_task.task()
+            writer_task.inputs.events["writing_done"].set()
+            await writer_task.task()
+
+        asyncio.run(run())
+        assert discarded == []
+        writer_task.teardown()
+        assert len(discarded) == 1
+
+        # Every block ends its file by size, and the boundary files are the ones which were opened ahead of time.
+        offsets = [0, 750, 1000, 1250, 1750, 2000, 2250]
+        firsts = [250] + offsets[1:]
+        paths = sorted(tmp_dir.glob("*.h5"), key=lambda path: int(path.stem))
+        assert [int(path.stem) for path in paths] == [offset * 10**6 for offset in offsets]
+        infos = list(writer_task.contents_info_queue.queue)
+        assert sorted({info["start_id"] - base for info in infos}) == [first * 10**6 for first in firsts]
+        written = []
+        for path, first in zip(paths, firsts):
+            with XLTEKHDF5_1(file=path) as f_obj:
+                assert f_obj.attributes["start_id"] == base + first * 10**6
+                written.append(f_obj.data[...])
+        assert np.array_equal(np.concatenate(written), data)
+
+    def test_rollover_entry_factory(self, writer_task):
+        with pytest.raises(ValueError):
+            type(writer_task)(rollover=XLTEKRolloverPolicy(duration=1.0))
+
+    def test_write_queue_get(self, writer_task):
+        async def run():
+            put_later(writer_task.write_queue, ("data", "nanostamps", "info"))
+            first = await writer_task.write_queue_get()
+
+            writer_task.wait_timeout = 1.0
+            second = await cancel_get(writer_task.write_queue_get, writer_task.write_queue, ("a", "b", "c"))
+
+            writer_task.wait_timeout = 0.01
+            writer_task.inputs.events["writing_done"].set()
+            return first, second, await writer_task.write_queue_get()
+
+        first, second, last = asyncio.run(run())
+        assert first == ("data", "nanostamps", "info")
+        assert second == ("a", "b", "c")
+        assert last == (None, None, None)
+        assert not writer_task.outputs.events["done"].is_set() and not writer_task.loop_event.is_set()
+
+    def test_done_after_flush(self, writer_task, tmp_dir):
+        _, _, items = self.create_blocks(tmp_dir / "done.h5")
+        writer_task.batch_samples = 100 * self.block_samples
+        writer_task.batch_interval = 100.0
+        for item in items[:2]:
+            writer_task.write_queue.put(item)
+        done = writer_task.outputs.events["done"]
+        done_at_put = []
+        put_async = writer_task.contents_info_queue.put_async
+
+        async def record_put(item):
+            done_at_put.append(done.is_set())
+            await put_async(item)
+
+        writer_task.contents_info_queue.put_async = record_put
+
+        async def run():
+            await writer_task.task()
+            await writer_task.task()
+            writer_task.inputs.events["writing_done"].set()
+            await writer_task.task()
+
+        asyncio.run(run())
+        assert done_at_put == [False, False] and done.is_set()
+
+    def test_teardown_infos(self, writer_task, tmp_dir):
+        path = tmp_dir / "teardown.h5"
+        data, _, items = self.create_blocks(path)
+        writer_task.batch_samples = 100 * self.block_samples
+        writer_task.batch_interval = 100.0
+        for item in items[:2]:
+            writer_task.write_queue.put(item)
+
+        async def run():
+            await writer_task.task()
+            await writer_task.task()
+
+        asyncio.run(run())
+        assert writer_task.contents_info_queue.empty()
+        writer_task.teardown()
+
+        infos = list(writer_task.contents_info_queue.queue)
+        assert [info["end_id"] for info in infos] == [item[2]["contents_insert"]["end_id"] for item in items[:2]]
+        with XLTEKHDF5_1(file=path) as f_obj:
+            assert np.array_equal(f_obj.data[...], data[:2 * self.block_samples])
+
+
+class TestXLTEKContentsUpdateTask:
+
+    def test_coalesce(self, update_task):
+        queue_ = update_task.contents_entry_queue
+        component = StubContentsComponent()
+        update_task.cdfs_component = component
+        update_task.contents_update_id = 5
+        update_task.commit_interval = 0.2
+
+        async def run():
+            for entry in ({"start_id": 0, "end_id": 1}, {"start_id": 0, "end_id": 2}, {"start_id": 1, "end_id": 3}):
+                queue_.put(entry)
+            await update_task.task()
+            assert component.upserts == []
+
+            start = time.perf_counter()
+            await update_task.task()
+            elapsed = time.perf_counter() - start
+            assert len(component.upserts) == 1
+
+            queue_.put({"start_id": 1, "end_id": 4})
+            update_task.inputs.events["entries_done"].set()
+            await update_task.task()
+            assert len(component.upserts) == 1
+            await update_task.task()
+            return elapsed
+
+        assert asyncio.run(run()) < 0.5
+        first = [{"start_id": 0, "end_id": 2, "update_id": 5}, {"start_id": 1, "end_id": 3, "update_id": 5}]
+        second = [{"start_id": 1, "end_id": 4, "update_id": 6}]
+        assert component.upserts == [(first, "start_id", True), (second, "start_id", True)]
+        assert update_task.contents_update_id == 7
+        assert update_task.outputs.events["done"].is_set()
+
+    def test_metrics_interval(self, update_task):
+        assert update_task.metrics.log_interval is None
+        assert type(update_task)(metrics_interval=5.0).metrics.log_interval == 5.0
+
+    def test_restart_update_id(self, update_task, tmp_dir):
+        cdfs = XLTEKCDFS(path=tmp_dir, name="EC_test", mode="a", create=True)
+        create_files(tmp_dir, 2)
+        cdfs.components["contents"].correct_contents()
+        assert list(cdfs.components["contents"].get_contents_index().paths) == ["0.h5", "1.h5"]
+        cdfs.close()
+
+        update_task.cdfs = XLTEKCDFS(path=tmp_dir, mode="a")
+        entry = {
+            "start_id": 0,
+            "end_id": 10**9 - 10**6,
+            "start": Timestamp.fromnanostamp(0, tz=datetime.timezone.utc),
+            "end": Timestamp.fromnanostamp(10**9 - 10**6, tz=datetime.timezone.utc),
+            "timezone": datetime.timezone.utc,
+            "sample_rate": 1000.0,
+            "shape": (1000, 8),
+            "path": "renamed.h5",
+        }
+
+        async def run():
+            await update_task.setup()
+            assert update_task.contents_update_id == 1
+            update_task.contents_entry_queue.put(entry)
+            update_task.inputs.events["entries_done"].set()
+            await update_task.task()
+            await update_task.task()
+            await update_task.teardown()
+
+        asyncio.run(run())
+        cdfs = XLTEKCDFS(path=tmp_dir, mode="a")
+        index = cdfs.components["contents"].get_contents_index()
+        cdfs.close()
+        assert list(index.paths) == ["renamed.h5", "1.h5"]
+
+    def test_entry_queue_get(self, update_task):
+        queue_ = update_task.contents_entry_queue
+
+        async def run():
+            queue_.put({"start_id": 0})
+            queue_.put({"start_id": 1})
+            first = await update_task.entry_queue_get()
+
+            update_task.wait_timeout = 1.0
+            second = await cancel_get(update_task.entry_queue_get, queue_, {"start_id": 2})
+
+            update_task.wait_timeout = 0.01
+            update_task.inputs.events["entries_done"].set()
+            return first, second, await update_task.entry_queue_get()
+
+        first, second, last = asyncio.run(run())
+        assert first == [{"start_id": 0}, {"start_id": 1}]
+        assert second == [{"start_id": 2}]
+        assert last is None
+
+
+# Main #
+if __name__ == "__main__":
+    pytest.main(["-v", "-s"])